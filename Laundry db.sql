@@ -12,4 +12,45 @@ SHOW COLUMNS FROM pickups_deliveries LIKE 'status';
 
 ALTER TABLE pickups_deliveries 
 ADD COLUMN created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-ADD COLUMN updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP;
\ No newline at end of file
+ADD COLUMN updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP;
+-- order_history / order_item_history are created by the app; partition them
+-- by month once (add a partition per year ahead, p_future catches the rest)
+ALTER TABLE order_history PARTITION BY RANGE (history_month) (
+    PARTITION p2024 VALUES LESS THAN (202501),
+    PARTITION p2025 VALUES LESS THAN (202601),
+    PARTITION p2026 VALUES LESS THAN (202701),
+    PARTITION p_future VALUES LESS THAN MAXVALUE
+);
+ALTER TABLE order_item_history PARTITION BY RANGE (history_month) (
+    PARTITION p2024 VALUES LESS THAN (202501),
+    PARTITION p2025 VALUES LESS THAN (202601),
+    PARTITION p2026 VALUES LESS THAN (202701),
+    PARTITION p_future VALUES LESS THAN MAXVALUE
+);
+
+-- Compressed archive payloads (services/archive_payload_service.py); existing
+-- rows are converted by `python manage.py migrate-archive-payloads`
+ALTER TABLE order_archive
+ADD COLUMN payload MEDIUMBLOB NULL,
+ADD COLUMN payload_version INT NULL,
+MODIFY order_data JSON NULL,
+MODIFY order_items_data JSON NULL;
+ALTER TABLE order_items_archive MODIFY item_data JSON NULL;
+
+-- Stored order totals (services/order_totals_service.py); NULL until the
+-- startup repair fills them in from order_items. order_history gets them from
+-- its model when the app creates it; only a history table created before
+-- this change needs the same three columns added.
+ALTER TABLE orders
+ADD COLUMN total_amount DOUBLE NULL,
+ADD COLUMN item_count INT NULL,
+ADD COLUMN total_quantity INT NULL;
+
+-- Row versions for optimistic concurrency on order and item edits.
+-- order_history / order_item_history get version from their models when the
+-- app creates them; only history tables created before this change need it.
+ALTER TABLE orders ADD COLUMN version INT NOT NULL DEFAULT 1;
+ALTER TABLE order_items ADD COLUMN version INT NOT NULL DEFAULT 1;
+
+-- Guest orders and customer lookups go by mobile number
+CREATE INDEX ix_users_mobile_no ON users (mobile_no);
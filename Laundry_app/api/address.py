@@ -30,7 +30,6 @@ def create_address(
     db_address = Address(**address.dict(), user_id=current_user.user_id)
     db.add(db_address)
     db.commit()
-    db.refresh(db_address)
     return db_address
 
 @router.get("/", response_model=List[AddressResponse])
@@ -152,7 +151,6 @@ def create_address_for_user(
         db_address = Address(**address_data)
         db.add(db_address)
         db.commit()
-        db.refresh(db_address)
         
         print(f" Address created successfully: {db_address.address_id}")
         return db_address
@@ -228,7 +226,6 @@ def update_address_for_user(
         
         db.add(db_address)
         db.commit()
-        db.refresh(db_address)
         
         print(f" Address updated successfully: {address_id}")
         return db_address
@@ -294,16 +291,16 @@ def create_bulk_addresses_for_user(
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
+        # Existing address lines for the user, fetched once for the whole batch
+        seen_lines = {
+            line for (line,) in db.query(Address.address_line1).filter(Address.user_id == user_id).all()
+        }
+
         created_addresses = []
         for address in addresses:
-            # Check for duplicates using db.query()
-            existing = db.query(Address).filter(
-                Address.user_id == user_id,
-                Address.address_line1 == address.address_line1
-            ).first()
-
-            if existing:
+            if address.address_line1 in seen_lines:
                 continue  # Skip duplicates
+            seen_lines.add(address.address_line1)
 
             # Create address
             address_data = address.dict()
@@ -315,10 +312,6 @@ def create_bulk_addresses_for_user(
         
         db.commit()
         
-        # Refresh all created addresses
-        for address in created_addresses:
-            db.refresh(address)
-        
         print(f" Created {len(created_addresses)} addresses for user {user_id}")
         return created_addresses
         
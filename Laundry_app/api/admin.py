@@ -3,6 +3,7 @@ from sqlmodel import Session, select
 from db.session import get_db
 from models.user import User
 from core.security import get_password_hash
+from services.refresh_token_service import revoke_user_tokens
 from typing import List
 
 router = APIRouter()
@@ -22,6 +23,8 @@ def reset_all_passwords(
     for user in users:
         user.password = get_password_hash(new_password)
         reset_count += 1
+    # Sessions started with the old passwords end with them
+    revoke_user_tokens(db)
     
     db.commit()
     
@@ -47,6 +50,7 @@ def reset_user_password(
         )
     
     user.password = get_password_hash(new_password)
+    revoke_user_tokens(db, user.user_id)
     db.commit()
     
     return {
@@ -3,7 +3,7 @@ from sqlmodel import Session, select
 from datetime import datetime, timedelta
 
 from db.session import get_db
-from schemas.user import UserLogin, staffLogin, Token, UserCreate, UserResponse, OTPVerify, PasswordReset
+from schemas.user import UserLogin, staffLogin, Token, TokenRefresh, UserCreate, UserResponse, OTPVerify, PasswordReset
 from Laundry_app.crud.crud_user import crud_user
 from core.security import create_access_token, verify_password, generate_otp, verify_token, get_password_hash
 from core.config import settings
@@ -11,6 +11,7 @@ from core.config import settings
 from utils.otp_utils import generate_otp, store_otp_in_db, verify_otp_in_db, send_otp_via_sms, clear_otp_from_db
 from models.user import User
 from core.security import create_access_token
+from services.refresh_token_service import issue_refresh_token, revoke_refresh_token, rotate_refresh_token
 
 router = APIRouter()
 
@@ -45,7 +46,6 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
             )
             db.add(db_user)
             db.commit()
-            db.refresh(db_user)
             user = db_user
             print(f"New user created: {user.user_id}, Name: {user.name}")             
         else:
@@ -65,9 +65,12 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
                 access_token = create_access_token(
                     subject=user.user_id, expires_delta=access_token_expires
                 )
+                refresh_token = issue_refresh_token(db, user.user_id)
+                db.commit()
                 
                 return {
                     "access_token": access_token, 
+                    "refresh_token": refresh_token,
                     "token_type": "bearer",
                     "message": "Auto-login successful",
                     "user_id": user.user_id,
@@ -125,8 +128,11 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
         access_token = create_access_token(
             subject=user.user_id, expires_delta=access_token_expires
         )
+        refresh_token = issue_refresh_token(db, user.user_id)
+        db.commit()
         return {
             "access_token": access_token, 
+            "refresh_token": refresh_token,
             "token_type": "bearer",
             "message": "Login successful",
             "user_id": user.user_id,
@@ -445,6 +451,7 @@ def verify_otp(
         user.otp_expires_at = None
 
         db.add(user)
+        refresh_token = issue_refresh_token(db, user.user_id)
         db.commit()
         
        
@@ -462,6 +469,7 @@ def verify_otp(
         print(f" Access token generated: {access_token[:50]}...")
         return {
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "token_type": "bearer",
             "message": "Login successful",
             "user_id": user.user_id,
@@ -478,6 +486,52 @@ def verify_otp(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="OTP verification failed")
 
+@router.post("/token/refresh", response_model=dict)
+def refresh_access_token(
+    token_data: TokenRefresh,
+    db: Session = Depends(get_db)
+):
+    """Exchange a refresh token for a new access token and refresh token"""
+    try:
+        user, refresh_token = rotate_refresh_token(db, token_data.refresh_token)
+        access_token = create_access_token(
+            subject=user.user_id,
+            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        )
+        print(f" Access token refreshed for user: {user.user_id}")
+        return {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "token_type": "bearer",
+            "user_id": user.user_id,
+            "name": user.name,
+            "mobile_no": user.mobile_no,
+            "role": user.role
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        print(f" Token refresh error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Token refresh failed")
+
+@router.post("/token/revoke", response_model=dict)
+def revoke_refresh_token_route(
+    token_data: TokenRefresh,
+    db: Session = Depends(get_db)
+):
+    """Log out: revoke the refresh token and every token rotated from it"""
+    try:
+        revoked = revoke_refresh_token(db, token_data.refresh_token)
+        print(f" Logout: revoked {revoked} refresh tokens")
+        return {"message": "Logged out"}
+
+    except Exception as e:
+        db.rollback()
+        print(f" Token revoke error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Logout failed")
+
 # @router.post("/resend-otp", response_model=dict)
 # def resend_otp(user_data: UserLogin, db: Session = Depends(get_db)):
 #     """Resend OTP with enhanced rate limiting"""
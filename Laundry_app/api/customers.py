@@ -3,7 +3,7 @@ from sqlmodel import Session
 from sqlalchemy.orm import joinedload
 from typing import List
 
-from db.session import get_db
+from db.session import get_db, get_read_db
 from schemas.customer import CustomerCreate, CustomerResponse, CustomerUpdate, CustomerLogin
 from Laundry_app.crud.crud_user import crud_user
 from core.security import get_password_hash, verify_password, create_access_token
@@ -12,6 +12,7 @@ from core.config import settings
 from schemas.address import AddressCreate, AddressUpdate, AddressResponse
 from Laundry_app.crud.crud_address import crud_address
 from models.user import User
+from services.customer_search_service import get_customer_page
 
 router = APIRouter()
 
@@ -124,43 +125,15 @@ def get_customers(
     skip: int = 0, 
     limit: int = 100,
     search: str = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     try:
-        from models.user import User
-        from models.address import Address 
-        
         print(f" Fetching customers - skip: {skip}, limit: {limit}, search: {search}")
         
-        
-        query = db.query(User).filter(User.role == "customer").options(
-            joinedload(User.addresses)  
-        )
-        
-       
-        if search and search.strip():
-            search_term = f"%{search.strip()}%"
-            query = query.filter(
-                (User.name.ilike(search_term)) | 
-                (User.mobile_no.ilike(search_term)) |
-                (User.email.ilike(search_term))
-            )
-        
-        
-        total = query.count()
-        
-        
-        customers = query.offset(skip).limit(limit).all()
+        customers = get_customer_page(db, search, skip, limit)
         
         print(f" Found {len(customers)} customers with addresses")
         
-        for customer in customers:
-            for address in customer.addresses:
-                if address.pincode and len(str(address.pincode)) != 6:
-                    print(f" Fixing pincode for customer {customer.user_id}, address {address.address_id}: {address.pincode}")
-                   
-                    address.pincode = str(address.pincode).zfill(6)
-
         return customers
         
     except Exception as e:
@@ -132,7 +132,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session
 from typing import Dict, Any
 
-from db.session import get_db
+from db.session import get_db, get_read_db
 from services.dashboard_service import DashboardService
 from schemas.dashboard import DashboardResponse
 from dependencies.auth import get_current_user, get_current_staff_user
@@ -145,7 +145,7 @@ router = APIRouter()
 @router.get("/", response_model=DashboardResponse)
 def get_dashboard(
     period_days: int = Query(30, description="Period for analytics in days"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_staff_user)  
 ):
     """
@@ -160,7 +160,7 @@ def get_dashboard(
 @router.get("/stats")
 def get_dashboard_stats(
     period_days: int = Query(30, description="Period for analytics in days"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_staff_user)
 ):
     """
@@ -218,7 +218,7 @@ def get_dashboard_stats(
 @router.get("/recent-orders")
 def get_recent_orders(
     limit: int = Query(10, description="Number of recent orders to fetch"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_staff_user)
 ):
     """
@@ -238,11 +238,6 @@ def get_recent_orders(
                 # Get user details
                 user = db.get(User, order.user_id)
                 
-                # Get order items count and total quantity
-                order_items = db.query(OrderItem).filter(OrderItem.order_id == order.order_id).all()
-                total_items = len(order_items)
-                total_quantity = sum(item.quantity for item in order_items)
-                
                 order_data = {
                     "order_id": order.order_id,
                     "Token_no": order.Token_no,
@@ -250,8 +245,8 @@ def get_recent_orders(
                     "customer_mobile": user.mobile_no if user else "Unknown",
                     "service": order.service,
                     "status": order.status,
-                    "total_items": total_items,
-                    "total_quantity": total_quantity,
+                    "total_items": order.item_count or 0,
+                    "total_quantity": order.total_quantity or 0,
                     "created_at": order.created_at.isoformat() if order.created_at else None,
                     "user_id": order.user_id
                 }
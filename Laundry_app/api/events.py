@@ -0,0 +1,95 @@
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Tuple
+
+from core.config import settings
+from core.event_hub import STAFF_CHANNEL, event_hub, user_channel
+from core.responses import dumps
+from db.session import SessionLocal
+from dependencies.auth import get_current_user
+
+router = APIRouter()
+
+
+def _load_user(token: Optional[str]) -> Tuple[int, str]:
+    """(user_id, role) for a bearer token; the DB session is closed before streaming starts"""
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required - No token provided")
+    with SessionLocal() as db:
+        user = get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db)
+        return user.user_id, (user.role or "").lower()
+
+
+def _channels(user_id: int, role: str, scope: Optional[str]) -> List[str]:
+    if role in ("staff", "admin") and scope != "user":
+        return [STAFF_CHANNEL]
+    return [user_channel(user_id)]
+
+
+def _bearer(request_token: Optional[str], authorization: Optional[str]) -> Optional[str]:
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:].strip()
+    return request_token
+
+
+@router.websocket("/ws")
+async def order_events_ws(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None),
+    scope: Optional[str] = Query(None, description="'user' to receive only your own orders (staff)")
+):
+    """Order status events over WebSocket (token as ?token=)"""
+    try:
+        user_id, role = await run_in_threadpool(
+            _load_user, _bearer(token, websocket.headers.get("authorization"))
+        )
+    except HTTPException:
+        await websocket.close(code=4401)
+        return
+
+    await websocket.accept()
+    subscription = event_hub.subscribe(_channels(user_id, role, scope))
+    print(f" Event subscriber connected (WebSocket): user {user_id}, channels {subscription.channels}")
+    try:
+        while True:
+            event = await subscription.get(timeout=settings.EVENT_HEARTBEAT_SECONDS)
+            await websocket.send_text(dumps(event or {"type": "ping"}).decode("utf-8"))
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        event_hub.unsubscribe(subscription)
+        print(f" Event subscriber disconnected (WebSocket): user {user_id}")
+
+
+@router.get("/stream")
+async def order_events_stream(
+    request: Request,
+    token: Optional[str] = Query(None, description="Bearer token (EventSource cannot send headers)"),
+    scope: Optional[str] = Query(None, description="'user' to receive only your own orders (staff)")
+):
+    """Order status events as Server-Sent Events"""
+    user_id, role = await run_in_threadpool(
+        _load_user, _bearer(token, request.headers.get("authorization"))
+    )
+    subscription = event_hub.subscribe(_channels(user_id, role, scope))
+    print(f" Event subscriber connected (SSE): user {user_id}, channels {subscription.channels}")
+
+    async def event_stream():
+        try:
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=settings.EVENT_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {dumps(event).decode('utf-8')}\n\n"
+        finally:
+            event_hub.unsubscribe(subscription)
+            print(f" Event subscriber disconnected (SSE): user {user_id}")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
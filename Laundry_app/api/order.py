@@ -1,8 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlmodel import Session, select
 from typing import List, Optional
-import random
-import string
 from datetime import datetime
 
 from db.session import get_db
@@ -12,20 +10,30 @@ from schemas.order import OrderCreate, OrderResponse, OrderUpdate, UserOrdersRes
 from dependencies.auth import get_current_user, get_or_create_guest_user
 from models.user import User
 from models.address import Address
+from utils.normalization import FRONTEND_TO_DB_ORDER_STATUS
+from services.order_serializer import serialize_orders, serialize_order, build_order_dict, CUSTOMER
+from services.order_creation_service import OrderCreationService
+from services.order_item_service import reconcile_items
+from services.customer_summary_service import get_customer_summary, get_order_history
+from core.responses import FastJSONResponse
+from core.event_hub import event_hub
+from core.concurrency import conflict_response, expected_version, version_etag
+from core.idempotency import idempotent_request
+from sqlalchemy.orm.exc import StaleDataError
+from services.token_service import generate_token_no
 # from models.address import Address
 import test_order as test_order
 
 router = APIRouter()
 
-def generate_Token_no():
-    date_str = datetime.now().strftime("%Y%m%d")
-    random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    return f"ORD{date_str}-{random_str}"
+def generate_Token_no(db: Session) -> str:
+    """Generate unique Token_no from the per-day token counter"""
+    return generate_token_no(db)
     
 
-def calculate_order_total(items: List) -> float:
-    """Calculate total order amount"""
-    return sum(item.quantity * item.unit_price for item in items)
+def calculate_order_total(order: Order) -> float:
+    """Calculate total order amount (stored on the order, kept in step with its items)"""
+    return order.total_amount or 0.0
 
 # def get_user_identifier(user: User) -> str:
 #     """Get user identifier (mobile_no) for created_by/updated_by fields"""
@@ -66,8 +74,16 @@ def get_created_by_identifier(current_user: User, order_data: OrderCreate) -> st
 def create_order(
     order: OrderCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None)
 ):
+    # A retried request with the same Idempotency-Key gets the first response back
+    idempotent = idempotent_request(f"orders:user:{current_user.user_id}", idempotency_key, order.dict())
+    if idempotent:
+        replay = idempotent.begin()
+        if replay is not None:
+            return replay
+
     try:
         print(f" Creating order for user: {current_user.user_id}, Name: {current_user.name}")
         print(f" Request data: {order.dict()}")
@@ -125,8 +141,7 @@ def create_order(
                         updated_at=datetime.utcnow()
                     )
                     db.add(new_customer_user)
-                    db.commit()
-                    db.refresh(new_customer_user)
+                    db.flush()
                     target_user = new_customer_user
                     print(f" Created new customer: {new_customer_user.name} (ID: {new_customer_user.user_id})")
             else:
@@ -151,121 +166,54 @@ def create_order(
                     detail=f"Item {index+1}: Product name is required"
                 )
         
-        new_address = Address(
-            user_id=target_user.user_id, 
+        creator = OrderCreationService(db)
+        new_address = creator.find_or_create_address(
+            user_id=target_user.user_id,
             name=order.customer_name or target_user.name,
             mobile_no=order.customer_mobile or target_user.mobile_no,
-            address_line1=order.address_line1.strip(),
-            address_line2=order.address_line2.strip() if order.address_line2 else "",
-            city=order.city.strip(),
-            state=order.state.strip(),
-            pincode=order.pincode.strip(),
-            # landmark=order.landmark.strip() if order.landmark else ""
+            address_line1=order.address_line1,
+            address_line2=order.address_line2,
+            city=order.city,
+            state=order.state,
+            pincode=order.pincode
         )
-        db.add(new_address)
-        db.commit()
-        db.refresh(new_address)
         
-        print(f" New address created with ID: {new_address.address_id}")
-        
-        db_order = Order(
-            user_id=target_user.user_id, 
+        item_status = "confirmed" if initial_status == "confirmed" else "pending"
+        db_order, created_items = creator.create_order(
+            user_id=target_user.user_id,
             address_id=new_address.address_id,
-            Token_no=generate_Token_no(),
             service=order.service,
             status=initial_status,
-            created_by=created_by_identifier,  
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            created_by=created_by_identifier,
+            items=[
+                {
+                    "category_name": item.category_name,
+                    "product_name": item.product_name,
+                    "quantity": item.quantity,
+                    "service": item.service,
+                    "unit_price": 10.0,
+                    "status": item_status,
+                }
+                for item in order.items
+            ]
         )
-        db.add(db_order)
-        db.commit()
-        db.refresh(db_order)
-        
-        print(f" Order created: {db_order.Token_no}")
-        
-        created_items = [] 
-        for item in order.items:
-            item_status = "pending"
-            if initial_status == "confirmed":
-                item_status = "confirmed"
-            db_item = OrderItem(
-                order_id=db_order.order_id,
-                category_name=item.category_name,
-                product_name=item.product_name,
-                quantity=item.quantity,
-                service=item.service,
-                unit_price=10.0,
-                status=item_status,
-                created_by=created_by_identifier,  
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
-            )
-            db.add(db_item)
-            created_items.append(db_item)
         
+        response_data = build_order_dict(db_order, target_user, new_address, created_items)
+        if idempotent:
+            idempotent.complete(db, response_data)
         db.commit()
-        # db.refresh(db_order)
- 
-        for item in created_items:
-            db.refresh(item)
-        
-        items_response = []
-        for item in created_items:
-            items_response.append({
-                "order_item_id": item.order_item_id,
-                "order_id": item.order_id,
-                "category_name": item.category_name,
-                "product_name": item.product_name,
-                "quantity": item.quantity,
-                "service": item.service,
-                "status": item.status,
-                "created_at": item.created_at,
-                "updated_at": item.updated_at,
-                "created_by": item.created_by,
-                "updated_by": item.updated_by
-            })
-        
-        
-        response_data = {
-            "order_id": db_order.order_id,
-            "user_id": target_user.user_id, 
-            "address_id": db_order.address_id,
-            "Token_no": db_order.Token_no,
-            "service": db_order.service,
-            "status": db_order.status,
-            "created_at": db_order.created_at,
-            "updated_at": db_order.updated_at,
-            "created_by": db_order.created_by,
-            "updated_by": db_order.updated_by,
-        
-            "user_name": target_user.name,
-            "user_mobile": target_user.mobile_no,
-            "address_line1": order.address_line1,
-            "address_line2": order.address_line2,
-            "city": order.city,
-            "state": order.state,
-            "pincode": order.pincode,
-            # "landmark": order.landmark,
-            "order_items": items_response,
-            "items": items_response,
-            "address_details": {
-                "address_line1": new_address.address_line1,
-                "address_line2": new_address.address_line2,
-                "city": new_address.city,
-                "state": new_address.state,
-                "pincode": new_address.pincode,
-                # "landmark": new_address.landmark
-            }
-        }
         
         print(" Order creation completed successfully!")
-        print(f" Response items count: {len(items_response)}")
-        print(f" Item Services: {[item.service for item in created_items]}")
-        return OrderResponse(**response_data)
+        print(f" Response items count: {len(created_items)}")
+        print(f" Item Services: {[item['service'] for item in response_data['items']]}")
+        return FastJSONResponse(response_data)
         
     except Exception as e:
         db.rollback()
+        if idempotent:
+            idempotent.release()
+        if isinstance(e, HTTPException):
+            raise
         print(f" Order creation error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Order creation failed: {str(e)}")
 
@@ -483,15 +431,7 @@ def read_orders(
             query = query.filter(Order.service == service)
         if status:
             # Map frontend status to database status
-            status_mapping = {
-                "pending": "pending",
-                "confirmed": "confirmed",      
-                "picked_up": "picked",        
-                "completed": "ready",         
-                "in_progress": "in_progress", 
-                "delivered": "delivered"      
-            }
-            db_status = status_mapping.get(status.value, status.value)
+            db_status = FRONTEND_TO_DB_ORDER_STATUS.get(status.value, status.value)
             query = query.filter(Order.status == db_status)
             
         # Apply pagination and execute
@@ -499,105 +439,10 @@ def read_orders(
         
         print(f"Found {len(orders)} orders")
         
-        # Build response with status mapping
-        response_orders = []
-        for order in orders:
-            try:
-                # Map database status to frontend status
-                status_mapping = {
-                    "pending": "pending",
-                    "confirmed": "confirmed",      
-                    "picked": "picked_up",        
-                    "ready": "completed",         
-                    "in_progress": "in_progress", 
-                    "delivered": "delivered",
-                    "cancelled": "cancelled"
-                }
-                frontend_status = status_mapping.get(order.status, order.status)
-                
-                print(f" Mapped status: {order.status} -> {frontend_status}")
-                
-                # Get order items with error handling
-                try:
-                    order_items = db.query(OrderItem).filter(OrderItem.order_id == order.order_id).all()
-                except Exception as e:
-                    print(f"Error fetching items for order {order.order_id}: {e}")
-                    order_items = []  # Empty list if error
-                
-                # Map item statuses with error handling
-                order_items_dicts = []
-                for item in order_items:
-                    try:
-                        item_status_mapping = {
-                            "pending": "pending",
-                            "confirmed": "confirmed",
-                            "processed": "processed",  # Add this mapping
-                            "picked": "picked_up",
-                            "ready": "completed",
-                            "in_progress": "in_progress",
-                            "delivered": "delivered"
-                        }
-                        item_frontend_status = item_status_mapping.get(item.status, "pending")  # Default to pending
-                        
-                        order_items_dicts.append({
-                            "order_item_id": item.order_item_id,
-                            "order_id": item.order_id,
-                            "category_name": item.category_name,
-                            "product_name": item.product_name,
-                            "quantity": item.quantity,
-                            "service": item.service,
-                            "status": item_frontend_status,
-                            "created_at": item.created_at,
-                            "updated_at": item.updated_at,
-                            "created_by": item.created_by,
-                            "updated_by": item.updated_by
-                        })
-                    except Exception as e:
-                        print(f"Error processing item {getattr(item, 'order_item_id', 'unknown')}: {e}")
-                        continue  # Skip this item
-                
-                # Load address and user
-                address = db.query(Address).filter(Address.address_id == order.address_id).first()
-                user = db.query(User).filter(User.user_id == order.user_id).first()
-
-                order_data = {
-                    "order_id": order.order_id,
-                    "user_id": order.user_id,
-                    "address_id": order.address_id,
-                    "Token_no": order.Token_no,
-                    "service": order.service,
-                    "status": frontend_status,
-                    "created_at": order.created_at,
-                    "updated_at": order.updated_at,
-                    "created_by": order.created_by,
-                    "updated_by": order.updated_by,
-                    "address_line1": address.address_line1 if address else None,
-                    "address_line2": address.address_line2 if address else None,
-                    "city": address.city if address else None,
-                    "state": address.state if address else None,
-                    "pincode": address.pincode if address else None,
-                    "user_name": user.name if user else None,
-                    "user_mobile": user.mobile_no if user else None,
-                    "address_details": {
-                        "address_line1": address.address_line1 if address else None,
-                        "address_line2": address.address_line2 if address else None,
-                        "city": address.city if address else None,
-                        "state": address.state if address else None,
-                        "pincode": address.pincode if address else None,
-                    } if address else None,
-                    "items": order_items_dicts,
-                    "order_items": order_items_dicts
-                }
-                    
-                print(f" Order {order.order_id} data prepared with status: {frontend_status}")
-                response_orders.append(OrderResponse(**order_data))
-                
-            except Exception as order_error:
-                print(f"Error processing order {order.order_id}: {order_error}")
-                continue  # Skip this order and continue with others
+        response_orders = serialize_orders(db, orders, CUSTOMER)
         
         print(f" Successfully processed {len(response_orders)} orders")
-        return response_orders
+        return FastJSONResponse(response_orders)
         
     except Exception as e:
         print(f"Error in read_orders: {str(e)}")
@@ -624,67 +469,7 @@ def read_order(
         if current_user.role.lower() not in ["staff", "admin"] and order.user_id != current_user.user_id:
             raise HTTPException(status_code=403, detail="Not enough permissions")
         
-        order_status = order.status
-        if order_status == "picked":
-            order_status = "picked_up"
-
-        
-        order_items = db.query(OrderItem).filter(OrderItem.order_id == order.order_id).all()
-        
-        
-        order_items_dicts = []
-        for item in order_items:
-            item_status = item.status
-            if item_status == "picked":
-                item_status = "picked_up"
-            order_items_dicts.append({
-                "order_item_id": item.order_item_id,
-                "order_id": item.order_id,
-                "category_name": item.category_name,
-                "product_name": item.product_name,
-                "quantity": item.quantity,
-                "service": item.service,
-                "status": item.status,
-                "created_at": item.created_at,
-                "updated_at": item.updated_at,
-                "created_by": item.created_by,
-                "updated_by": item.updated_by
-            })
-        
-        address = db.query(Address).filter(Address.address_id == order.address_id).first()
-        user = db.query(User).filter(User.user_id == order.user_id).first()
-        
-        
-        order_data = {
-            "order_id": order.order_id,
-            "user_id": order.user_id,
-            "address_id": order.address_id,
-            "Token_no": order.Token_no,
-            "service": order.service,
-            "status": order.status,
-            "created_at": order.created_at,
-            "updated_at": order.updated_at,
-            "created_by": order.created_by,
-            "updated_by": order.updated_by,
-            "address_line1": address.address_line1 if address else None,
-            "address_line2": address.address_line2 if address else None,
-            "city": address.city if address else None,
-            "state": address.state if address else None,
-            "pincode": address.pincode if address else None,
-            "user_name": user.name if user else None,
-            "user_mobile": user.mobile_no if user else None,
-            "address_details": {
-                "address_line1": address.address_line1 if address else None,
-                "address_line2": address.address_line2 if address else None,
-                "city": address.city if address else None,
-                "state": address.state if address else None,
-                "pincode": address.pincode if address else None,
-            } if address else None,
-            "items": order_items_dicts,
-            "order_items": order_items_dicts
-        }
-        
-        return OrderResponse(**order_data)
+        return FastJSONResponse(serialize_order(db, order))
         
     except HTTPException:
         raise
@@ -699,9 +484,11 @@ def read_order(
 def update_order(
     order_id: int,
     order_update: OrderUpdate,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    """Update an order and its items; with If-Match (or body/item `version`) stale edits get 409"""
     try:
         print(f" Updating order {order_id} with data: {order_update.dict(exclude_unset=True)}")
         print(f" Requested by user: {current_user.name} (Role: {current_user.role})")
@@ -725,6 +512,11 @@ def update_order(
         update_data = order_update.dict(exclude_unset=True)
         print(f" Update data: {update_data}")
         
+        expected = expected_version(if_match, update_data.pop('version', None))
+        if expected is not None and expected != order.version:
+            print(f" Version conflict on order {order_id}: expected {expected}, current {order.version}")
+            return conflict_response(serialize_order(db, order))
+        
         old_status = order.status
         new_status = update_data.get('status')
         
@@ -752,10 +544,11 @@ def update_order(
             
             order.status = new_status
 
+        item_changes = None
         items_data = update_data.pop('items', None)
         if items_data is not None:
             print(f" Processing {len(items_data)} order items")
-            update_order_items(db, order.order_id, items_data, current_user.name)  
+            item_changes = update_order_items(db, order.order_id, items_data, current_user.name)  
         
         
         order_fields_updated = False
@@ -813,15 +606,24 @@ def update_order(
             db.add(user)
         
         db.commit()
-        db.refresh(order)
         
         print(f"Order {order_id} updated successfully")
         
-        
-        return read_order(order_id, db, current_user)
+        response_data = serialize_order(db, order)
+        if item_changes is not None:
+            response_data["item_changes"] = item_changes
+        return FastJSONResponse(response_data, headers={"ETag": version_etag(order.version)})
         
     except HTTPException:
         raise
+    except StaleDataError as e:
+        # The order or one of its items changed after it was read
+        db.rollback()
+        print(f" Version conflict on order {order_id}: {str(e)}")
+        current = db.get(Order, order_id)
+        if not current:
+            raise HTTPException(status_code=404, detail="Order not found")
+        return conflict_response(serialize_order(db, current))
     except Exception as e:
         db.rollback()
         print(f"Error updating order {order_id}: {str(e)}")
@@ -833,81 +635,11 @@ def update_order(
         )
 
 
-def update_order_items(db: Session, order_id: int, items_data: List[dict], updated_by: str):
-    """Update order items - handles both existing and new items"""
+def update_order_items(db: Session, order_id: int, items_data: List[dict], updated_by: str) -> dict:
+    """Update order items - handles existing, new and removed items in bulk"""
     try:
         print(f" Starting order items update for order {order_id}")
-        
-        
-        existing_items = db.query(OrderItem).filter(OrderItem.order_id == order_id).all()
-        existing_items_dict = {item.order_item_id: item for item in existing_items}
-        
-        print(f" Existing items: {[item.order_item_id for item in existing_items]}")
-        print(f" New items data: {items_data}")
-        
-        updated_items = []
-        new_items = []
-        
-        for item_data in items_data:
-            item_id = item_data.get('order_item_id')
-            
-            if item_id and item_id in existing_items_dict:
-                
-                existing_item = existing_items_dict[item_id]
-                print(f" Updating existing item {item_id}")
-                
-                
-                for field in ['category_name', 'product_name', 'quantity', 'service', 'status']:
-                    if field in item_data and item_data[field] is not None:
-                        old_value = getattr(existing_item, field)
-                        new_value = item_data[field]
-                        setattr(existing_item, field, new_value)
-                        print(f"   {field}: {old_value} → {new_value}")
-                
-                existing_item.updated_at = datetime.utcnow()
-                existing_item.updated_by = updated_by
-                db.add(existing_item)
-                updated_items.append(existing_item)
-                
-                
-                del existing_items_dict[item_id]
-                
-            else:
-                
-                print(f" Creating new item for order {order_id}")
-                new_item = OrderItem(
-                    order_id=order_id,
-                    category_name=item_data['category_name'],
-                    product_name=item_data['product_name'],
-                    quantity=item_data['quantity'],
-                    service=item_data.get('service', 'wash_iron'),
-                    status=item_data.get('status', 'pending'),
-                    created_by=updated_by,
-                    updated_by=updated_by,
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow()
-                )
-                db.add(new_item)
-                new_items.append(new_item)
-        
-        
-        deleted_items = []
-        for item_id, item in existing_items_dict.items():
-            print(f" Deleting item {item_id} that was removed from order")
-            db.delete(item)
-            deleted_items.append(item_id)
-        
-        
-        db.commit()
-        
-        
-        for item in new_items:
-            db.refresh(item)
-        
-        print(f"    Items update completed:")
-        print(f"    Updated: {len(updated_items)} items")
-        print(f"    Created: {len(new_items)} items") 
-        print(f"    Deleted: {len(deleted_items)} items")
+        return reconcile_items(db, order_id, items_data, updated_by)
         
     except Exception as e:
         db.rollback()
@@ -952,13 +684,14 @@ def update_order_status(
         if not new_status:
             raise HTTPException(status_code=400, detail="Status is required")
         
+        previous_status = order.status
         order.status = new_status
         order.updated_at = datetime.utcnow()
         order.updated_by = current_user.email
         
         db.add(order)
         db.commit()
-        db.refresh(order)
+        event_hub.publish_order_status(order, previous_status)
         
         return {"message": "Order status updated successfully", "status": order.status}
         
@@ -973,10 +706,11 @@ def get_orders_by_user(
     limit: int = 100,
     service: Optional[ServiceType] = None,
     status: Optional[OrderStatus] = None,
+    cursor: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all orders for a specific user with total count"""
+    """Get a user's orders, newest first, with their order summary (pass next_cursor to page)"""
     try:
         print(f"Fetching orders for user ID: {user_id} by user: {current_user.user_id}")
         
@@ -996,80 +730,25 @@ def get_orders_by_user(
             )
         
         
-        query = db.query(Order).filter(Order.user_id == user_id)
-        
+        summary = get_customer_summary(db, user_id)
         
+        # Counts come from the summary (history included); it has none per service
         if service:
-            query = query.filter(Order.service == service)
-        if status:
-            query = query.filter(Order.status == status)
-        
-        
-        total_orders = query.count()
+            total_orders = None
+        elif status:
+            total_orders = summary["status_counts"].get(status.value, 0)
+        else:
+            total_orders = summary["order_count"]
         print(f"Total orders for user {user_id}: {total_orders}")
         
-       
-        orders = query.offset(skip).limit(limit).all()
+        orders, next_cursor = get_order_history(
+            db, user_id, limit=limit, cursor=cursor, skip=skip, service=service, status=status
+        )
         
-        print(f"Found {len(orders)} orders for user {user_id} (showing {skip} to {skip + len(orders)})")
+        print(f"Found {len(orders)} orders for user {user_id} (next cursor: {next_cursor})")
         
         
-        response_orders = []
-        for order in orders:
-            
-            order_items = db.query(OrderItem).filter(OrderItem.order_id == order.order_id).all()
-            
-            
-            order_items_dicts = []
-            for item in order_items:
-                order_items_dicts.append({
-                    "order_item_id": item.order_item_id,
-                    "order_id": item.order_id,
-                    "category_name": item.category_name,
-                    "product_name": item.product_name,
-                    "quantity": item.quantity,
-                    "service": item.service,
-                    "status": item.status,
-                    "created_at": item.created_at,
-                    "updated_at": item.updated_at,
-                    "created_by": item.created_by,
-                    "updated_by": item.updated_by
-                })
-            
-           
-            address = db.query(Address).filter(Address.address_id == order.address_id).first()
-            
-            
-            order_data = {
-                "order_id": order.order_id,
-                "user_id": order.user_id,
-                "address_id": order.address_id,
-                "Token_no": order.Token_no,
-                "service": order.service,
-                "status": order.status,
-                "created_at": order.created_at,
-                "updated_at": order.updated_at,
-                "created_by": order.created_by,
-                "updated_by": order.updated_by,
-                "address_line1": address.address_line1 if address else None,
-                "address_line2": address.address_line2 if address else None,
-                "city": address.city if address else None,
-                "state": address.state if address else None,
-                "pincode": address.pincode if address else None,
-                "user_name": user.name if user else None,
-                "user_mobile": user.mobile_no if user else None,
-                "address_details": {
-                    "address_line1": address.address_line1 if address else None,
-                    "address_line2": address.address_line2 if address else None,
-                    "city": address.city if address else None,
-                    "state": address.state if address else None,
-                    "pincode": address.pincode if address else None,
-                } if address else None,
-                "items": order_items_dicts,
-                "order_items": order_items_dicts
-            }
-            
-            response_orders.append(OrderResponse(**order_data))
+        response_orders = serialize_orders(db, orders)
         
         
         user_details = {
@@ -1081,11 +760,13 @@ def get_orders_by_user(
         }
         
         
-        return UserOrdersResponse(
-            orders=response_orders,
-            total_orders=total_orders,
-            user_details=user_details
-        )
+        return FastJSONResponse({
+            "orders": response_orders,
+            "total_orders": total_orders,
+            "user_details": user_details,
+            "summary": summary,
+            "next_cursor": next_cursor
+        })
         
     except HTTPException:
         raise
@@ -1106,8 +787,15 @@ from dependencies.auth import get_current_user_optional
 @router.post("/public/", response_model=OrderResponse)
 def create_public_order(
     order: OrderCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None)
 ):
+    idempotent = idempotent_request("orders:public", idempotency_key, order.dict())
+    if idempotent:
+        replay = idempotent.begin()
+        if replay is not None:
+            return replay
+
     try:
         print(f" Creating PUBLIC order for: {order.customer_name} ({order.customer_mobile})")
         print(f" Request data: {order.dict()}")
@@ -1124,122 +812,61 @@ def create_public_order(
                 raise HTTPException(status_code=400, detail=f"Item {index+1}: Product name is required")
 
         
-        guest_user = get_or_create_guest_user(db, order.customer_name, order.customer_mobile)
+        guest_user = get_or_create_guest_user(db, order.customer_name, order.customer_mobile, commit=False)
         print(f" Guest user: {guest_user.name} (ID: {guest_user.user_id})")
 
         # guest_identifier = f"Guest: {order.customer_mobile}"
 
-        new_address = Address(
+        creator = OrderCreationService(db)
+        new_address = creator.find_or_create_address(
             user_id=guest_user.user_id,
-            name=order.customer_name,        
-            mobile_no=order.customer_mobile, 
-            address_line1=order.address_line1.strip(),
-            address_line2=order.address_line2.strip() if order.address_line2 else "",
-            city=order.city.strip(),
-            state=order.state.strip(),
-            pincode=order.pincode.strip(),
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            name=order.customer_name,
+            mobile_no=order.customer_mobile,
+            address_line1=order.address_line1,
+            address_line2=order.address_line2,
+            city=order.city,
+            state=order.state,
+            pincode=order.pincode
         )
-        db.add(new_address)
-        db.commit()
-        db.refresh(new_address)
-        print(f" Address created: {new_address.address_id}")
 
         initial_status = "pending"
         print(f" Public/Guest order - Status: {initial_status}")
         
-        db_order = Order(
+        db_order, created_items = creator.create_order(
             user_id=guest_user.user_id,
             address_id=new_address.address_id,
-            Token_no=generate_Token_no(),
             service=order.service,
             status=initial_status,
-            created_by=f"Guest: {order.customer_name}",  
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+            created_by=f"Guest: {order.customer_name}",
+            items=[
+                {
+                    "category_name": item.category_name,
+                    "product_name": item.product_name,
+                    "quantity": item.quantity,
+                    "service": order.service,
+                    "unit_price": getattr(item, 'unit_price', 10.0),
+                    "status": "pending",
+                }
+                for item in order.items
+            ]
         )
-        db.add(db_order)
-        db.commit()
-        db.refresh(db_order)
-        print(f" Order created: {db_order.Token_no}")
 
-        
-        created_items = []
-        for item in order.items:
-            db_item = OrderItem(
-                order_id=db_order.order_id,
-                category_name=item.category_name,
-                product_name=item.product_name,
-                quantity=item.quantity,
-                service=order.service,
-                unit_price=getattr(item, 'unit_price', 10.0),
-                status="pending",
-                created_by=f"Guest: {order.customer_name}",  
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
-            )
-            db.add(db_item)
-            created_items.append(db_item)
-        
+        response_data = build_order_dict(db_order, guest_user, new_address, created_items)
+        response_data["user_name"] = order.customer_name
+        response_data["user_mobile"] = order.customer_mobile
+        if idempotent:
+            idempotent.complete(db, response_data)
         db.commit()
 
-        
-        for item in created_items:
-            db.refresh(item)
-
-        
-        items_response = []
-        for item in created_items:
-            items_response.append({
-                "order_item_id": item.order_item_id,
-                "order_id": item.order_id,
-                "category_name": item.category_name,
-                "product_name": item.product_name,
-                "quantity": item.quantity,
-                "service": item.service,
-                "status": item.status,
-                "created_at": item.created_at,
-                "updated_at": item.updated_at,
-                "created_by": item.created_by,
-                "updated_by": item.updated_by
-            })
-
-        
-        response_data = {
-            "order_id": db_order.order_id,
-            "user_id": db_order.user_id,
-            "address_id": db_order.address_id,
-            "Token_no": db_order.Token_no,
-            "service": db_order.service,
-            "status": db_order.status,
-            "created_at": db_order.created_at,
-            "updated_at": db_order.updated_at,
-            "created_by": f"Guest: {order.customer_name}",
-            "updated_by": None,
-            "order_items": items_response,
-            "items": items_response,
-            "user_name": order.customer_name,
-            "user_mobile": order.customer_mobile,
-            "address_line1": order.address_line1,
-            "address_line2": order.address_line2,
-            "city": order.city,
-            "state": order.state,
-            "pincode": order.pincode,
-            "address_details": {
-                "address_line1": order.address_line1,
-                "address_line2": order.address_line2,
-                "city": order.city,
-                "state": order.state,
-                "pincode": order.pincode,
-            }
-        }
-
         print(f" Order {db_order.Token_no} created for {order.customer_name}")
-        return OrderResponse(**response_data)
+        return FastJSONResponse(response_data)
 
     except Exception as e:
         db.rollback()
+        if idempotent:
+            idempotent.release()
+        if isinstance(e, HTTPException):
+            raise
         print(f" Order creation error: {str(e)}")
         import traceback
         traceback.print_exc()
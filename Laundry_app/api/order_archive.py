@@ -3,12 +3,13 @@ from sqlmodel import Session, select
 from typing import List, Optional
 from datetime import datetime
 
-from db.session import get_db
+from db.session import get_db, get_read_db
 from models.order_archive import OrderArchive, DeletionReason
-from schemas.order_archive import OrderArchiveResponse, OrderArchiveSearch
+from schemas.order_archive import OrderArchiveResponse, OrderArchiveSearch, BulkArchiveRequest, BulkRestoreRequest
 from dependencies.auth import get_current_user, get_current_staff_user, get_current_admin_user
 from models.user import User
 from services.order_service import OrderService
+from services.archive_payload_service import archive_details
 
 router = APIRouter(prefix="/order-archive", tags=["order-archive"])
 
@@ -67,7 +68,7 @@ def get_archived_orders(
     date_to: Optional[datetime] = Query(None, description="Filter to date"),
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_staff_user)  
 ):
     """Get archived orders with filtering"""
@@ -83,12 +84,12 @@ def get_archived_orders(
         limit=limit
     )
     
-    return archived_orders
+    return [archive_details(archive) for archive in archived_orders]
 
 @router.get("/{archive_id}", response_model=OrderArchiveResponse)
 def get_archived_order(
     archive_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_staff_user)
 ):
     """Get specific archived order details"""
@@ -96,7 +97,7 @@ def get_archived_order(
     if not archived_order:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archived order not found")
     
-    return archived_order
+    return archive_details(archived_order)
 
 @router.post("/{archive_id}/restore", status_code=status.HTTP_200_OK)
 def restore_archived_order(
@@ -110,7 +111,7 @@ def restore_archived_order(
         
         return {
             "message": "Order restored successfully",
-            "order_id": restored_order.id,
+            "order_id": restored_order.order_id,
             "original_archive_id": archive_id
         }
         
@@ -119,6 +120,53 @@ def restore_archived_order(
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@router.post("/bulk", status_code=status.HTTP_200_OK)
+def bulk_archive_orders(
+    request: BulkArchiveRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Archive many orders by id or by created_at range (Admin only)"""
+    if request.order_ids is None and not (request.date_from or request.date_to):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide order_ids or a date_from/date_to range"
+        )
+
+    try:
+        result = OrderService.archive_orders(
+            db,
+            deletion_reason=request.deletion_reason,
+            deleted_by=current_user,
+            order_ids=request.order_ids,
+            date_from=request.date_from,
+            date_to=request.date_to,
+            status=request.status,
+            notes=request.notes
+        )
+        return {"message": f"{result['archived']} orders archived", **result}
+
+    except Exception as e:
+        db.rollback()
+        print(f"Bulk archive error: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.post("/bulk-restore", status_code=status.HTTP_200_OK)
+def bulk_restore_orders(
+    request: BulkRestoreRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Restore many archived orders (Admin only)"""
+    try:
+        result = OrderService.restore_orders(db, request.archive_ids)
+        return {"message": f"{len(result['restored'])} orders restored", **result}
+
+    except Exception as e:
+        db.rollback()
+        print(f"Bulk restore error: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
 @router.get("/deletion-reasons/enum", response_model=dict)
 def get_deletion_reasons():
     """Get all available deletion reasons for frontend"""
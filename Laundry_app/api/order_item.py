@@ -63,6 +63,5 @@ def update_order_item(
     
     db.add(item)
     db.commit()
-    db.refresh(item)
     return item
 
@@ -20,7 +20,7 @@ class OTPVerify(BaseModel):
 otp_service = Bulk9OTPService()
 
 @router.post("/send")
-async def send_otp(request: OTPRequest):
+def send_otp(request: OTPRequest):
 
     result = otp_service.send_otp(
         mobile_number=request.mobile_number,
@@ -50,6 +50,6 @@ async def verify_otp(request: OTPVerify):
     }
 
 @router.get("/balance")
-async def get_balance():
+def get_balance():
     balance = otp_service.check_balance()
     return balance
\ No newline at end of file
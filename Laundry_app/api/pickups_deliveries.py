@@ -11,12 +11,27 @@ from datetime import datetime
 from crud import crud_pickup_delivery
 from models.order import Order  
 from models.pickup_delivery import PickupDelivery
+from core.event_hub import event_hub
 import logging
 
 router = APIRouter()
 
 logger = logging.getLogger(__name__)
 
+def publish_pickup_event(db: Session, pickup: PickupDelivery, event_type: str):
+    """Push a pickup/delivery status event to the order's customer and staff"""
+    order = db.get(Order, pickup.order_id)
+    event_hub.publish_order_event(
+        event_type,
+        order.user_id if order else None,
+        order_id=pickup.order_id,
+        Token_no=order.Token_no if order else None,
+        pickup_id=pickup.id,
+        service_type=pickup.service_type,
+        status=pickup.status,
+        at=pickup.picked_at or pickup.delivered_at,
+    )
+
 def get_valid_service_types():
     """Get valid service types from database ENUM"""
     
@@ -56,9 +71,6 @@ def create_pickup_delivery(
         db.commit()
         print(f" Transaction committed")
         
-        db.refresh(db_pickup)
-        print(f" Object refreshed from database")
-        
         return {
             "success": True,
             "message": "Pickup/delivery scheduled successfully",
@@ -189,6 +201,8 @@ def mark_as_picked_up(
     pickup = crud_pickup_delivery.mark_picked_up(db, pickup_id)
     if not pickup:
         raise HTTPException(status_code=404, detail="Pickup not found or not a pickup service")
+    if pickup.picked_at:
+        publish_pickup_event(db, pickup, "picked_up")
     return pickup
 
 @router.post("/{delivery_id}/mark-delivered", response_model=PickupDeliveryResponse)
@@ -201,6 +215,8 @@ def mark_as_delivered(
     delivery = crud_pickup_delivery.mark_delivered(db, delivery_id)
     if not delivery:
         raise HTTPException(status_code=404, detail="Delivery not found or not a delivery service")
+    if delivery.delivered_at:
+        publish_pickup_event(db, delivery, "delivered")
     return delivery
 
 @router.get("/order/{order_id}", response_model=List[PickupDeliveryResponse])
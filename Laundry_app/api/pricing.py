@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlmodel import Session, select
 from typing import List, Optional
-from sqlalchemy import text
+from sqlalchemy import text, tuple_
 
-from db.session import get_db
+from db.session import get_db, get_read_db
 from models.pricing import Pricing, ServiceType, CategoryName, ProductName
 from schemas.pricing import PricingCreate, PricingUpdate, PricingResponse, PricingBulkCreate, DynamicEnumCreate, DynamicEnumResponse
 from dependencies.auth import get_current_staff_user
@@ -97,7 +97,6 @@ def create_pricing(
         pricing = Pricing(**pricing_data.dict())
         db.add(pricing)
         db.commit()
-        db.refresh(pricing)
         
         print(f"Pricing created successfully: {pricing.id}")
         return pricing
@@ -121,31 +120,32 @@ def create_bulk_pricing(
     """Create multiple pricing records at once"""
     created_items = []
     
-    for item in bulk_data.items:
-        # Validate lengths
-        if len(item.service_type) > 100 or len(item.category) > 150 or len(item.product) > 150:
-            continue  # Skip invalid items
-            
-        # Check if combination already exists
-        existing = db.exec(
-            select(Pricing).where(
-                Pricing.service_type == item.service_type,
-                Pricing.category == item.category,
-                Pricing.product == item.product
+    # Validate lengths
+    items = [
+        item for item in bulk_data.items
+        if len(item.service_type) <= 100 and len(item.category) <= 150 and len(item.product) <= 150
+    ]
+    
+    # Combinations that already exist, checked with one query for the batch
+    keys = {(item.service_type, item.category, item.product) for item in items}
+    existing = set()
+    if keys:
+        existing = set(db.exec(
+            select(Pricing.service_type, Pricing.category, Pricing.product).where(
+                tuple_(Pricing.service_type, Pricing.category, Pricing.product).in_(list(keys))
             )
-        ).first()
-        
-        if not existing:
+        ).all())
+    
+    for item in items:
+        key = (item.service_type, item.category, item.product)
+        if key not in existing:
+            existing.add(key)
             pricing = Pricing(**item.dict())
             db.add(pricing)
             created_items.append(pricing)
     
     db.commit()
     
-    # Refresh all created items
-    for item in created_items:
-        db.refresh(item)
-    
     return created_items
 
 @router.get("/", response_model=List[PricingResponse])
@@ -155,7 +155,7 @@ def get_all_pricing(
     service_type: Optional[str] = None,
     category: Optional[str] = None,
     product: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all pricing records with optional filtering"""
     query = select(Pricing)
@@ -173,7 +173,7 @@ def get_all_pricing(
 @router.get("/{pricing_id}", response_model=PricingResponse)
 def get_pricing(
     pricing_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific pricing record by ID"""
     pricing = db.get(Pricing, pricing_id)
@@ -189,7 +189,7 @@ def lookup_price(
     service_type: str,
     category: str,
     product: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Look up price by service type, category, and product"""
     pricing = db.exec(
@@ -270,7 +270,6 @@ def update_pricing(
     
     db.add(pricing)
     db.commit()
-    db.refresh(pricing)
     return pricing
 
 @router.delete("/{pricing_id}")
@@ -294,7 +293,7 @@ def delete_pricing(
 # NEW ENDPOINTS FOR DYNAMIC ENUMS
 
 @router.get("/enums/options", response_model=DynamicEnumResponse)
-def get_enum_options(db: Session = Depends(get_db)):
+def get_enum_options(db: Session = Depends(get_read_db)):
     """Get all available enum options from database (dynamic + predefined)"""
     service_types = DynamicEnumManager.get_all_service_types(db)
     categories = DynamicEnumManager.get_all_categories(db)
@@ -354,7 +353,7 @@ def add_enum_option(
 @router.get("/enums/unique-values")
 def get_unique_values(
     field: str = Query(..., description="Field name: service_type, category, or product"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get unique values for a specific field"""
     if field not in ["service_type", "category", "product"]:
@@ -1,9 +1,10 @@
 # routes.py - Complete merged version with ALL CRUD operations
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session, select
-from typing import List, Optional
+from typing import Callable, List, Optional
+from sqlalchemy.exc import IntegrityError
 
-from db.session import get_db
+from db.session import get_db, get_read_db
 from schemas.service import (
     ServiceCreate, ServiceResponse, ServiceUpdate,
     ServiceCategoryCreate, ServiceCategoryResponse, ServiceCategoryUpdate,
@@ -18,6 +19,24 @@ from models.service import Service, ServiceCategory, ServiceProduct
 
 router = APIRouter()
 
+
+def _delete_ids(delete: Callable[[Session, List[int]], List[int]], db: Session, ids: List[int], label: str) -> set:
+    """Run a set-based delete; ids that did not exist are simply absent from the result"""
+    try:
+        return set(delete(db, ids))
+    except IntegrityError as e:
+        print(f" Cannot delete {label} {ids}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{label.capitalize()} still referenced by other records"
+        )
+    except Exception as e:
+        print(f" Error deleting {label} {ids}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to delete {label}: {str(e)}"
+        )
+
 # ========== SERVICE ROUTES ==========
 
 @router.post("/services/", response_model=ServiceResponse, status_code=status.HTTP_201_CREATED)
@@ -44,7 +63,7 @@ def create_service(
 @router.get("/services/{service_id}", response_model=ServiceResponse)
 def get_service(
     service_id: int, 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get service by ID with details"""
     service = ServiceCRUD.get_service_with_details(db, service_id)
@@ -63,7 +82,7 @@ def get_service(
 def get_all_services(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all services with pagination"""
     services = ServiceCRUD.get_all_services(db, skip=skip, limit=limit)
@@ -104,7 +123,7 @@ def delete_service(
     db: Session = Depends(get_db)
 ):
     """Delete a service"""
-    success = ServiceCRUD.delete_service(db, service_id)
+    success = bool(_delete_ids(ServiceCRUD.delete_services, db, [service_id], "services"))
     if not success:
         raise HTTPException(status_code=404, detail="Service not found")
     
@@ -125,7 +144,7 @@ def create_category(
 @router.get("/services/{service_id}/categories/", response_model=List[ServiceCategoryResponse])
 def get_service_categories(
     service_id: int, 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all categories for a service"""
     categories = ServiceCategoryCRUD.get_categories_by_service(db, service_id)
@@ -142,7 +161,7 @@ def get_service_categories(
 @router.get("/categories/{category_id}", response_model=ServiceCategoryResponse)
 def get_category(
     category_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get category by ID"""
     category = ServiceCategoryCRUD.get_category_with_products(db, category_id)
@@ -173,7 +192,7 @@ def delete_category(
     db: Session = Depends(get_db)
 ):
     """Delete a category"""
-    success = ServiceCategoryCRUD.delete_category(db, category_id)
+    success = bool(_delete_ids(ServiceCategoryCRUD.delete_categories, db, [category_id], "categories"))
     if not success:
         raise HTTPException(status_code=404, detail="Category not found")
     
@@ -225,7 +244,7 @@ def create_product_with_verification(
 @router.get("/categories/{category_id}/products/", response_model=List[ServiceProductResponse])
 def get_category_products(
     category_id: int, 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all products in a category"""
     products = ServiceProductCRUD.get_products_by_category(db, category_id)
@@ -235,7 +254,7 @@ def get_category_products(
 def get_service_products(
     service_id: int,
     category_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all products in a service, optionally filtered by category"""
     products = ServiceProductCRUD.get_products_by_service(db, service_id, category_id)
@@ -244,7 +263,7 @@ def get_service_products(
 @router.get("/products/{product_id}", response_model=ServiceProductResponse)
 def get_product(
     product_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get product by ID"""
     product = ServiceProductCRUD.get_product_with_details(db, product_id)
@@ -293,7 +312,7 @@ def delete_product(
     db: Session = Depends(get_db)
 ):
     """Delete a product"""
-    success = ServiceProductCRUD.delete_product(db, product_id)
+    success = bool(_delete_ids(ServiceProductCRUD.delete_products, db, [product_id], "products"))
     if not success:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -368,7 +387,7 @@ def delete_all_categories(
 # ========== SIMPLIFIED DETAILS ROUTES ==========
 
 @router.get("/services/{service_id}/full-details", response_model=ServiceWithCategoriesAndProductsResponse)
-def get_service_full_details(service_id: int, db: Session = Depends(get_db)):
+def get_service_full_details(service_id: int, db: Session = Depends(get_read_db)):
     """Get service with all categories and their products (without counts)"""
     service = ServiceCRUD.get_service(db, service_id)
     if not service:
@@ -411,7 +430,7 @@ def get_service_full_details(service_id: int, db: Session = Depends(get_db)):
     )
 
 @router.get("/services/{service_id}/categories-with-products", response_model=List[CategoryWithProductsResponse])
-def get_service_categories_with_products(service_id: int, db: Session = Depends(get_db)):
+def get_service_categories_with_products(service_id: int, db: Session = Depends(get_read_db)):
     """Get all categories with their products for a service"""
     categories = ServiceCategoryCRUD.get_categories_by_service(db, service_id)
     
@@ -441,7 +460,7 @@ def get_service_categories_with_products(service_id: int, db: Session = Depends(
     return categories_with_products
 
 @router.get("/categories/{category_id}/products-with-details", response_model=CategoryWithProductsResponse)
-def get_category_with_products(category_id: int, db: Session = Depends(get_db)):
+def get_category_with_products(category_id: int, db: Session = Depends(get_read_db)):
     """Get a specific category with all its products"""
     category = ServiceCategoryCRUD.get_category(db, category_id)
     if not category:
@@ -471,7 +490,7 @@ def get_category_with_products(category_id: int, db: Session = Depends(get_db)):
 def get_all_services_with_full_details(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all services with their categories and products"""
     services = ServiceCRUD.get_all_services(db, skip=skip, limit=limit)
@@ -517,7 +536,7 @@ def get_all_services_with_full_details(
 def get_all_products_with_prices(
     service_id: Optional[int] = Query(None),
     category_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all products with their prices (filterable by service/category)"""
     if service_id:
@@ -695,22 +714,15 @@ def bulk_delete_services(
     db: Session = Depends(get_db)
 ):
     """Delete multiple services"""
-    deleted_count = 0
-    failed_ids = []
+    deleted_ids = _delete_ids(ServiceCRUD.delete_services, db, service_ids, "services")
     
-    for service_id in service_ids:
-        try:
-            success = ServiceCRUD.delete_service(db, service_id)
-            if success:
-                deleted_count += 1
-            else:
-                failed_ids.append(service_id)
-        except Exception:
-            failed_ids.append(service_id)
+    deleted_count = len(deleted_ids)
+    failed_ids = [service_id for service_id in service_ids if service_id not in deleted_ids]
     
     return BulkDeleteResponse(
         message=f"Deleted {deleted_count} services",
         deleted_count=deleted_count,
+        failed_count=len(failed_ids),
         failed_ids=failed_ids
     )
 
@@ -720,22 +732,15 @@ def bulk_delete_categories(
     db: Session = Depends(get_db)
 ):
     """Delete multiple categories"""
-    deleted_count = 0
-    failed_ids = []
+    deleted_ids = _delete_ids(ServiceCategoryCRUD.delete_categories, db, category_ids, "categories")
     
-    for category_id in category_ids:
-        try:
-            success = ServiceCategoryCRUD.delete_category(db, category_id)
-            if success:
-                deleted_count += 1
-            else:
-                failed_ids.append(category_id)
-        except Exception:
-            failed_ids.append(category_id)
+    deleted_count = len(deleted_ids)
+    failed_ids = [category_id for category_id in category_ids if category_id not in deleted_ids]
     
     return BulkDeleteResponse(
         message=f"Deleted {deleted_count} categories",
         deleted_count=deleted_count,
+        failed_count=len(failed_ids),
         failed_ids=failed_ids
     )
 
@@ -745,21 +750,14 @@ def bulk_delete_products(
     db: Session = Depends(get_db)
 ):
     """Delete multiple products"""
-    deleted_count = 0
-    failed_ids = []
+    deleted_ids = _delete_ids(ServiceProductCRUD.delete_products, db, product_ids, "products")
     
-    for product_id in product_ids:
-        try:
-            success = ServiceProductCRUD.delete_product(db, product_id)
-            if success:
-                deleted_count += 1
-            else:
-                failed_ids.append(product_id)
-        except Exception:
-            failed_ids.append(product_id)
+    deleted_count = len(deleted_ids)
+    failed_ids = [product_id for product_id in product_ids if product_id not in deleted_ids]
     
     return BulkDeleteResponse(
         message=f"Deleted {deleted_count} products",
         deleted_count=deleted_count,
+        failed_count=len(failed_ids),
         failed_ids=failed_ids
     )
\ No newline at end of file
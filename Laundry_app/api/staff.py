@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
 from sqlmodel import Session, select
 from typing import List, Optional
 import random
@@ -6,14 +6,32 @@ import string
 from datetime import datetime, date
 from sqlalchemy import func  
 
-from db.session import get_db
+from db.session import get_db, get_read_db
 from models.order import Order, OrderStatus
 from models.order_item import OrderItem
-from schemas.order import OrderCreate, OrderUpdate, OrderResponse, OrderItemCreate, StaffOrderCreate
+from schemas.order import OrderCreate, OrderUpdate, OrderResponse, OrderItemCreate, StaffOrderCreate, OrderTransitionsRequest
 from dependencies.auth import get_current_user, get_current_staff_user
 from models.user import User
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.exc import StaleDataError
 from models.address import Address
+from utils.normalization import (
+    normalize_category, normalize_product, normalize_order_status, normalize_service
+)
+from services.order_serializer import serialize_orders, serialize_order, build_order_dict, STAFF
+from services.order_creation_service import OrderCreationService
+from core.responses import FastJSONResponse
+from core.event_hub import event_hub
+from core.concurrency import conflict_response, expected_version, version_etag
+from services.token_service import generate_token_no
+from services.order_transition_service import apply_transitions
+from services.customer_summary_service import get_customer_summary, get_order_history
+from services.order_history_service import get_history_orders
+from services.order_change_service import collapse_changes, current_watermark, oldest_change_id, read_changes
+from models.order_history import OrderItemHistory
+from services.token_lookup_service import (
+    MIN_PARTIAL_LENGTH, index_tokens, lookup_token, normalize_token_query, token_search_filter
+)
 
 router = APIRouter()
 
@@ -24,136 +42,20 @@ def get_user_identifier(user: User) -> str:
 
 def convert_category_name(category):
     """Convert enum category names to display names"""
-    if not category:
-        return "Others"
-    
-    mapping = {
-        'MENS_CLOTHING': "Men's Clothing",
-        'WOMENS_CLOTHING': "Women's Clothing", 
-        'KIDS_CLOTHING': "Kids Clothing",
-        'HOUSE_HOLDS': "House Holds",
-        'OTHERS': "Others",
-        "Men's Clothing": "Men's Clothing",  
-        "Women's Clothing": "Women's Clothing",
-        "Kids Clothing": "Kids Clothing",
-        "House Holds": "House Holds",
-        "Others": "Others"
-    }
-    return mapping.get(category, "Others")
+    return normalize_category(category)
 
 
 def convert_product_name(product):
     """Convert enum product names to display names"""
-    if not product:
-        return "Other"
-    
-    mapping = {
-        
-        'T_SHIRT': "T-Shirt",
-        'SHIRT': "Shirt", 
-        'JEANS': "Jeans",
-        'TROUSERS': "Trousers",
-        'SHORTS': "Shorts",
-        'INNERWEAR': "Innerwear",
-        'FORMAL_SHIRT': "Formal Shirt",
-        'CASUAL_SHIRT': "Casual Shirt",
-        'JACKET': "Jacket",
-        'SWEATER': "Sweater",
-        
-        
-        'SAREE': "Saree",
-        'KURTI': "Kurti",
-        'DRESS': "Dress",
-        'BLOUSE': "Blouse", 
-        'SKIRT': "Skirt",
-        'TOP': "Top",
-        'LEHENGA': "Lehenga",
-        'SALWAR': "Salwar",
-        'DUPATTA': "Dupatta",
-        'NIGHT_DRESS': "Night Dress",
-        
-        
-        'KIDS_TSHIRT': "Kids T-shirt",
-        'KIDS_SHORTS': "Kids Shorts",
-        'SCHOOL_UNIFORM': "School Uniform",
-        'FROCK': "Frock",
-        'PYJAMAS': "Pyjamas",
-        'KIDS_JEANS': "Kids Jeans",
-        'BABY_SUIT': "Baby Suit",
-        'ROMPER': "Romper",
-        'KIDS_JACKET': "Kids Jacket",
-        'KIDS_SWEATER': "Kids Sweater",
-        
-        
-        'BEDSHEET': "Bedsheet",
-        'PILLOW_COVER': "Pillow Cover",
-        'CURTAIN': "Curtain",
-        'TABLE_CLOTH': "Table Cloth",
-        'TOWEL': "Towel",
-        'BLANKET': "Blanket",
-        'CARPET': "Carpet",
-        'BED_COVER': "Bed Cover",
-        'CUSHION_COVER': "Cushion Cover",
-        'MATTRESS_COVER': "Mattress Cover",
-        
-        
-        'BAG': "Bag",
-        'CAP': "Cap",
-        'SCARF': "Scarf",
-        'GLOVES': "Gloves",
-        'SOCKS': "Socks",
-        'HANDKERCHIEF': "Handkerchief",
-        'BELT': "Belt",
-        'TIE': "Tie",
-        'STOLE': "Stole",
-        'MUFFLER': "Muffler"
-    }
-    if product in mapping.values():
-        return product
-    return mapping.get(product, "Other")
+    return normalize_product(product)
 
 def convert_order_status(status):
     """Convert order status to valid enum values - SAFE VERSION"""
-    if not status:
-        return OrderStatus.PENDING
-    
-    status_lower = str(status).lower().strip()
-    print(f"DEBUG: Converting status '{status}' to lowercase '{status_lower}'")
-    
-    if status_lower in ['pending', 'PENDING']:
-        return OrderStatus.PENDING
-    elif status_lower in ['confirmed', 'CONFIRMED']:
-        return OrderStatus.CONFIRMED
-    elif status_lower in ['processed', 'PROCESSED', 'in_progress', 'IN_PROGRESS']:
-        return OrderStatus.PROCESSED  
-    elif status_lower in ['picked_up', 'PICKED_UP', 'picked', 'PICKED']:
-        return OrderStatus.PICKED_UP
-    elif status_lower in ['completed', 'COMPLETED', 'delivered', 'DELIVERED']:
-        return OrderStatus.COMPLETED  
-    elif status_lower in ['cancelled', 'CANCELLED']:
-        return OrderStatus.CANCELLED
-    else:
-        print(f"DEBUG: Unknown status '{status_lower}', defaulting to PENDING")
-        return OrderStatus.PENDING
+    return normalize_order_status(status)
     
 def convert_service_type(service):
     """Convert service type to valid enum values"""
-    if not service:
-        return "wash_iron"
-    
-    service_mapping = {
-        'wash_iron': "wash_iron",
-        'WASH_IRON': "wash_iron",
-        'dry_cleaning': "dry_cleaning", 
-        'DRY_CLEANING': "dry_cleaning",
-        'wash_only': "wash_only",
-        'WASH_ONLY': "wash_only",
-        'iron_only': "iron_only",
-        'IRON_ONLY': "iron_only",
-        'pending': "wash_iron",  
-        'PENDING': "wash_iron",
-    }
-    return service_mapping.get(service, "wash_iron")
+    return normalize_service(service)
 
 def generate_order_number():
     """Generate unique order number"""
@@ -162,23 +64,8 @@ def generate_order_number():
     return f"ORD{date_str}-{random_str}"
 
 def generate_token(db: Session) -> str:
-    """Generate unique Token_no with retry logic"""
-    max_retries = 5
-    for attempt in range(max_retries):
-        date_str = datetime.now().strftime("%Y%m%d")
-        random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-        token_no = f"ORD{date_str}-{random_str}"
-        
-        existing_order = db.query(Order).filter(Order.Token_no == token_no).first()
-        if not existing_order:
-            return token_no
-        
-        print(f" Token_no {token_no} already exists, retrying... (attempt {attempt + 1})")
-    
-
-    fallback_token = f"ORD{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
-    print(f" Using fallback token: {fallback_token}")
-    return fallback_token
+    """Generate unique Token_no from the per-day token counter"""
+    return generate_token_no(db)
 
 def get_created_by_identifier(current_user: User, order_data) -> str:
     """Get created_by identifier - always use customer details"""
@@ -221,8 +108,6 @@ def create_order(
         created_by_identifier = get_created_by_identifier(current_user, order_data)
         print(f" Final created_by identifier: {created_by_identifier}")
 
-        token_no = generate_token(db)
-        
         customer = db.get(User, 99)        
         if not customer:
             
@@ -230,9 +115,8 @@ def create_order(
         
         print(f" Using customer: {customer.name} (ID: {customer.user_id})")
         
-        
-        from models.address import Address
-        customer_address = Address(
+        creator = OrderCreationService(db)
+        customer_address = creator.find_or_create_address(
             user_id=customer.user_id,
             name=customer.name,
             mobile_no=customer.mobile_no,
@@ -240,33 +124,9 @@ def create_order(
             address_line2=order_data.address_line2,
             city=order_data.city,
             state=order_data.state,
-            pincode=order_data.pincode,
-            # landmark=order_data.landmark
-        )
-        db.add(customer_address)
-        db.commit()
-        db.refresh(customer_address)
-        print(f" Created address: {customer_address.address_id}")
-        
-        
-        db_order = Order(
-            user_id=customer.user_id,
-            address_id=customer_address.address_id,
-            Token_no=token_no,
-            service=order_data.service,
-            status=OrderStatus.PENDING,
-            created_by=created_by_identifier,
-            updated_by=created_by_identifier
+            pincode=order_data.pincode
         )
         
-        db.add(db_order)
-        db.commit()
-        db.refresh(db_order)
-        
-        print(f"Order created: {db_order.Token_no}")
-        print(f"Order user_id: {db_order.user_id} (Customer)")
-        print(f"Order created_by: {db_order.created_by} (Customer details)")
-        
         merged_items = {}
         if order_data.items:
             for item_data in order_data.items:
@@ -280,96 +140,32 @@ def create_order(
         
         print(f" Original items: {len(order_data.items)}, Merged items: {len(merged_items)}")
 
+        db_order, created_items = creator.create_order(
+            user_id=customer.user_id,
+            address_id=customer_address.address_id,
+            service=order_data.service,
+            status=OrderStatus.PENDING,
+            created_by=created_by_identifier,
+            updated_by=created_by_identifier,
+            items=[
+                {
+                    "category_name": item_data.category_name,
+                    "product_name": item_data.product_name,
+                    "quantity": item_data.quantity,
+                    "service": order_data.service,
+                    "status": "pending",
+                }
+                for item_data in merged_items.values()
+            ]
+        )
         
-        created_items = []
-        for key, item_data in merged_items.items():
-            db_item = OrderItem(
-                order_id=db_order.order_id,
-                category_name=item_data.category_name,
-                product_name=item_data.product_name,
-                quantity=item_data.quantity,
-                service=order_data.service,
-                status="pending",  
-                created_at=datetime.utcnow(),  
-                updated_at=datetime.utcnow(),  
-                created_by=created_by_identifier,  
-                updated_by=created_by_identifier 
-            )
-            db.add(db_item)
-            created_items.append(db_item)
-            
-            db.commit()
-            
-            for item in created_items:
-                db.refresh(item)
-        
-        
-        user = db.get(User, db_order.user_id)
-        address = db.get(Address, db_order.address_id)
-        
-        
-        order_items = db.exec(
-            select(OrderItem).where(OrderItem.order_id == db_order.order_id)
-        ).all()
-        
+        print(f"Order user_id: {db_order.user_id} (Customer)")
+        print(f"Order created_by: {db_order.created_by} (Customer details)")
         
-        items_response = []
-        for item in order_items:
-            items_response.append({
-                "order_item_id": item.order_item_id,
-                "order_id": item.order_id,
-                "category_name": convert_category_name(item.category_name),
-                "product_name": convert_product_name(item.product_name),
-                "quantity": item.quantity,
-                "service": convert_service_type(item.service),
-                "status": convert_order_status(item.status).value,
-                "created_at": item.created_at,
-                "updated_at": item.updated_at,
-                "created_by": item.created_by,
-                "updated_by": item.updated_by
-            })
-        
-        
-        address_details = None
-        if address:
-            address_details = {
-                "address_line1": address.address_line1,
-                "address_line2": address.address_line2,
-                "city": address.city,
-                "state": address.state,
-                "pincode": address.pincode,
-                # "landmark": address.landmark
-            }
-        
-        
-        response_data = {
-            "order_id": db_order.order_id,
-            "user_id": db_order.user_id,
-            "address_id": db_order.address_id,
-            "Token_no": db_order.Token_no,
-            "service": convert_service_type(db_order.service),
-            "status": convert_order_status(db_order.status).value,
-            "created_at": db_order.created_at,
-            "updated_at": db_order.updated_at,
-            "created_by": db_order.created_by,
-            "updated_by": db_order.updated_by,
-            
-            "address_line1": order_data.address_line1,
-            "address_line2": order_data.address_line2,
-            "city": order_data.city,
-            "state": order_data.state,
-            "pincode": order_data.pincode,
-            # "landmark": order_data.landmark,
-            
-            "user_name": user.name if user else None,
-            "user_mobile": user.mobile_no if user else None,
-            
-            "address_details": address_details,
-            "items": items_response,
-            "order_items": items_response
-        }
+        response_data = build_order_dict(db_order, customer, customer_address, created_items, STAFF)
+        db.commit()
         
-        return OrderResponse(**response_data)
+        return FastJSONResponse(response_data)
         
     except Exception as e:
         db.rollback()
@@ -379,6 +175,111 @@ def create_order(
         raise HTTPException(status_code=500, detail=f"Staff order creation failed: {str(e)}")
 
 
+@router.get("/user/{user_id}/summary")
+def get_customer_order_summary(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_staff_user)
+):
+    """Order count, lifetime spend, last order and status breakdown for a customer"""
+    customer = db.get(User, user_id)
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+
+    try:
+        return FastJSONResponse(get_customer_summary(db, user_id))
+    except Exception as e:
+        print(f"Customer summary error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get customer summary: {str(e)}")
+
+
+@router.get("/lookup")
+def lookup_order_by_token(
+    token: str = Query(..., min_length=1, description="Full or partial Token_no"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_staff_user)
+):
+    """Find orders by scanned/typed Token_no (exact, prefix or partial match)"""
+    try:
+        match, orders = lookup_token(db, token, limit)
+        print(f" Token lookup '{token}': {match} ({len(orders)} orders)")
+
+        return FastJSONResponse({
+            "match": match,
+            "count": len(orders),
+            "orders": serialize_orders(db, orders, STAFF)
+        })
+
+    except Exception as e:
+        print(f"Token lookup error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to look up token: {str(e)}")
+
+
+@router.get("/changes")
+def get_order_changes(
+    since: Optional[int] = Query(None, ge=0, description="`next` from the previous call; omit to get the current watermark"),
+    limit: int = Query(500, ge=1, le=2000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_staff_user)
+):
+    """Orders changed or removed since the client's watermark (delta sync for the staff app)"""
+    try:
+        if since is None:
+            return {"next": current_watermark(db), "has_more": False, "orders": [], "deleted": []}
+
+        oldest = oldest_change_id(db)
+        if since and oldest and since < oldest - 1:
+            raise HTTPException(status_code=410, detail="Change history no longer available; reload the order list")
+
+        rows, next_since, has_more = read_changes(db, since, limit)
+        upserted, deleted = collapse_changes(rows)
+
+        orders = []
+        if upserted:
+            orders = db.exec(select(Order).where(Order.order_id.in_(upserted)).order_by(Order.order_id)).all()
+            # Orders gone by now are reported as deleted
+            deleted.extend(set(upserted) - {order.order_id for order in orders})
+
+        print(f" Order changes since {since}: {len(orders)} changed, {len(deleted)} deleted, next {next_since}")
+        return FastJSONResponse({
+            "next": next_since,
+            "has_more": has_more,
+            "orders": serialize_orders(db, orders, STAFF),
+            "deleted": sorted(deleted),
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Order changes error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get order changes: {str(e)}")
+
+
+@router.get("/history")
+def get_order_history_range(
+    date_from: datetime = Query(..., description="Orders created from this date"),
+    date_to: datetime = Query(..., description="Orders created up to this date"),
+    user_id: Optional[int] = Query(None),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_staff_user)
+):
+    """Finished orders moved to history, for an explicit created_at range"""
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must be before date_to")
+
+    try:
+        orders = get_history_orders(db, date_from, date_to, user_id, skip, limit)
+        print(f" History query {date_from} - {date_to}: {len(orders)} orders")
+        return FastJSONResponse(serialize_orders(db, orders, STAFF, item_model=OrderItemHistory))
+
+    except Exception as e:
+        print(f"Order history error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get order history: {str(e)}")
+
+
 @router.get("/{order_id}", response_model=OrderResponse)
 def get_order(
     order_id: int,
@@ -397,75 +298,7 @@ def get_order(
         print(f"Order found - ID: {order.order_id}, service: {order.service}, status: {order.status}")
         
         
-        user = db.get(User, order.user_id)
-        address = db.get(Address, order.address_id)
-        
-        
-        order_items = db.exec(
-            select(OrderItem).where(OrderItem.order_id == order_id)
-        ).all()
-        
-        
-        items_response = []
-        for item in order_items:
-            items_response.append({
-                "order_item_id": item.order_item_id,
-                "order_id": item.order_id,
-                "category_name": convert_category_name(item.category_name),
-                "product_name": convert_product_name(item.product_name),
-                "quantity": item.quantity,
-                "service": convert_service_type(item.service),
-                "status": convert_order_status(item.status).value,
-                "created_at": item.created_at,
-                "updated_at": item.updated_at,
-                "created_by": item.created_by,
-                "updated_by": item.updated_by
-            })
-        
-        
-        address_details = None
-        if address:
-            address_details = {
-                "address_line1": address.address_line1,
-                "address_line2": address.address_line2,
-                "city": address.city,
-                "state": address.state,
-                "pincode": address.pincode,
-                # "landmark": address.landmark
-            }
-        
-        order_status = convert_order_status(order.status)
-        order_service = convert_service_type(order.service)
-
-        
-        response_data = {
-            "order_id": order.order_id,
-            "user_id": order.user_id,
-            "address_id": order.address_id,
-            "Token_no": order.Token_no,
-            "service": order_service,
-            "status": order_status.value,
-            "created_at": order.created_at,
-            "updated_at": order.updated_at,
-            "created_by": order.created_by,
-            "updated_by": order.updated_by,
-            
-            "address_line1": address.address_line1 if address else "",
-            "address_line2": address.address_line2 if address else "",
-            "city": address.city if address else "",
-            "state": address.state if address else "",
-            "pincode": address.pincode if address else "",
-            # "landmark": address.landmark if address else "",
-            
-            "user_name": user.name if user else None,
-            "user_mobile": user.mobile_no if user else None,
-            
-            "address_details": address_details,
-            "items": items_response,
-            "order_items": items_response
-        }
-        
-        return OrderResponse(**response_data)
+        return FastJSONResponse(serialize_order(db, order, STAFF))
         
     except Exception as e:
         print(f"Get order error: {str(e)}")
@@ -480,7 +313,7 @@ def get_orders(
     limit: int = 100,
     status: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_staff_user)
 ):
     """Get all orders with search and status filters"""
@@ -496,106 +329,21 @@ def get_orders(
         
         
         if search:
-            search = f"%{search}%"
-            statement = statement.where(Order.Token_no.ilike(search))
+            search = normalize_token_query(search)
+            if len(search) >= MIN_PARTIAL_LENGTH:
+                statement = statement.where(token_search_filter(search))
+            else:
+                statement = statement.where(Order.Token_no.ilike(f"%{search}%"))
         
         statement = statement.offset(skip).limit(limit).order_by(Order.created_at.desc())
         orders = db.exec(statement).all()
         
         print(f"Found {len(orders)} orders")
         
-        orders_response = []
-        for order in orders:
-            try:
-                print(f"Processing order {order.order_id}")
-                print(f"  Raw service: '{order.service}' (type: {type(order.service).__name__})")
-                print(f"  Raw status: '{order.status}' (type: {type(order.status).__name__})")
-                
-                
-                user = db.get(User, order.user_id)
-                address = db.get(Address, order.address_id)
-                
-                
-                order_items = db.exec(
-                    select(OrderItem).where(OrderItem.order_id == order.order_id)
-                ).all()
-                
-                
-                items_response = []
-                for item in order_items:
-                    items_response.append({
-                        "order_item_id": item.order_item_id,
-                        "order_id": item.order_id,
-                        "category_name": convert_category_name(item.category_name),
-                        "product_name": convert_product_name(item.product_name),
-                        "quantity": item.quantity,
-                        "service": convert_service_type(item.service),
-                        "status": convert_order_status(item.status).value,
-                        "created_at": item.created_at,
-                        "updated_at": item.updated_at,
-                        "created_by": item.created_by,
-                        "updated_by": item.updated_by
-                    })
-                
-                
-                address_details = None
-                if address:
-                    address_details = {
-                        "address_line1": address.address_line1,
-                        "address_line2": address.address_line2,
-                        "city": address.city,
-                        "state": address.state,
-                        "pincode": address.pincode
-                    }
-                
-                
-                order_service = convert_service_type(order.service)
-                order_status = convert_order_status(order.status)
-                
-                print(f"  Converted service: '{order_service}'")
-                print(f"  Converted status: '{order_status.value}'")
-                
-                
-                response_dict = {
-                    "order_id": order.order_id,
-                    "user_id": order.user_id,
-                    "address_id": order.address_id,
-                    "Token_no": order.Token_no,
-                    "service": order_service,  
-                    "status": order_status.value,  
-                    "created_at": order.created_at,
-                    "updated_at": order.updated_at,
-                    "created_by": order.created_by,
-                    "updated_by": order.updated_by,
-                    "address_line1": address.address_line1 if address else "",
-                    "address_line2": address.address_line2 if address else "",
-                    "city": address.city if address else "",
-                    "state": address.state if address else "",
-                    "pincode": address.pincode if address else "",
-                    "user_name": user.name if user else None,
-                    "user_mobile": user.mobile_no if user else None,
-                    "address_details": address_details,
-                    "items": items_response,
-                    "order_items": items_response
-                }
-                
-                
-                print(f"  Final service for response: '{response_dict['service']}'")
-                print(f"  Final status for response: '{response_dict['status']}'")
-                
-                
-                order_response = OrderResponse(**response_dict)
-                orders_response.append(order_response)
-                print(f"   Successfully processed order {order.order_id}")
-                
-            except Exception as order_error:
-                print(f"   Error processing order {order.order_id}: {str(order_error)}")
-                import traceback
-                print(f"  Order error details: {traceback.format_exc()}")
-                continue
+        orders_response = serialize_orders(db, orders, STAFF)
         
         print(f"Successfully processed {len(orders_response)} orders")
-        return orders_response
+        return FastJSONResponse(orders_response)
         
     except Exception as e:
         print(f"Get orders error: {str(e)}")
@@ -612,10 +360,11 @@ def get_orders_by_user(
     limit: int = 100,
     service: Optional[str] = Query(None, description="Filter by service type"),
     status: Optional[str] = Query(None),
+    cursor: Optional[int] = Query(None, description="X-Next-Cursor value from the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_staff_user)
 ):
-    """Get all orders for a specific user (Staff only)"""
+    """Get a user's orders newest first (Staff only); next page cursor is in X-Next-Cursor"""
     try:
         print(f"Staff getting orders for user: {user_id}")
         
@@ -625,115 +374,31 @@ def get_orders_by_user(
         
         print(f"Customer found: {customer.name} (ID: {customer.user_id}, Mobile: {customer.mobile_no})")
         
-        query = db.query(Order).filter(Order.user_id == user_id)
-
+        valid_service = None
         if service:
             valid_service = convert_service_type(service)
-            query = query.filter(Order.service == valid_service)
             print(f"Filtering by service: {valid_service}")
             
+        valid_status = None
         if status:
-            valid_status = convert_order_status(status)
-            query = query.filter(Order.status == valid_status.value)
-            print(f"Filtering by status: {valid_status.value}")
-
-        total_count = query.count()
-        print(f"Total orders found for customer {customer.name}: {total_count}")
-
-        query = query.order_by(Order.created_at.desc())
-        orders = query.offset(skip).limit(limit).all() 
-
-        print(f"Returning {len(orders)} orders for user {user_id} (showing {skip} to {skip + len(orders)})")
-        
-        orders_response = []
-        for order in orders:
-            try:
-                print(f"Processing order {order.order_id} - Status: {order.status}")
-                
-                order_customer = db.get(User, order.user_id)
-                
-               
-                address = db.get(Address, order.address_id)
-                
-              
-                order_items = db.query(OrderItem).filter(OrderItem.order_id == order.order_id).all()
-                
-                print(f"Found {len(order_items)} items for order {order.Token_no}")
-                
-               
-                items_response = []
-                for item in order_items:
-                    items_response.append({
-                        "order_item_id": item.order_item_id,
-                        "order_id": item.order_id,
-                        "category_name": convert_category_name(item.category_name),
-                        "product_name": convert_product_name(item.product_name),
-                        "quantity": item.quantity,
-                        "service": convert_service_type(item.service),
-                        "status": convert_order_status(item.status).value,
-                        "created_at": item.created_at,
-                        "updated_at": item.updated_at,
-                        "created_by": item.created_by,
-                        "updated_by": item.updated_by
-                    })
-                
-                
-                address_details = None
-                if address:
-                    address_details = {
-                        "address_line1": address.address_line1,
-                        "address_line2": address.address_line2,
-                        "city": address.city,
-                        "state": address.state,
-                        "pincode": address.pincode
-                    }
-                
-                
-                order_service = convert_service_type(order.service)
-                order_status = convert_order_status(order.status)
-
-               
-                response_dict = {
-                    "order_id": order.order_id,
-                    "user_id": order.user_id,
-                    "address_id": order.address_id,
-                    "Token_no": order.Token_no,
-                    "service": order_service,
-                    "status": order_status.value,
-                    "created_at": order.created_at,
-                    "updated_at": order.updated_at,
-                    "created_by": order.created_by,
-                    "updated_by": order.updated_by,
-                    "address_line1": address.address_line1 if address else "",
-                    "address_line2": address.address_line2 if address else "",
-                    "city": address.city if address else "",
-                    "state": address.state if address else "",
-                    "pincode": address.pincode if address else "",
-                    "user_name": order_customer.name if order_customer else None,
-                    "user_mobile": order_customer.mobile_no if order_customer else None,
-                    "address_details": address_details,
-                    "items": items_response,
-                    "order_items": items_response
-                }
-                
-                
-                order_response = OrderResponse(**response_dict)
-                orders_response.append(order_response)
-                print(f"Successfully processed order {order.order_id}")
-                
-            except Exception as order_error:
-                print(f"Error processing order {order.order_id}: {str(order_error)}")
-                import traceback
-                print(f"Order error details: {traceback.format_exc()}")
-                continue
+            valid_status = convert_order_status(status).value
+            print(f"Filtering by status: {valid_status}")
+
+        orders, next_cursor = get_order_history(
+            db, user_id, limit=limit, cursor=cursor, skip=skip, service=valid_service, status=valid_status
+        )
+
+        print(f"Returning {len(orders)} orders for user {user_id} (next cursor: {next_cursor})")
+        
+        orders_response = serialize_orders(db, orders, STAFF)
         
         print(f"Successfully processed {len(orders_response)} orders out of {len(orders)}")
         
         if len(orders_response) == 0:
             print(f" No orders found for customer {customer.name}")
-            return []
         
-        return orders_response
+        headers = {"X-Next-Cursor": str(next_cursor)} if next_cursor else None
+        return FastJSONResponse(orders_response, headers=headers)
     except HTTPException:
         raise
       
@@ -896,10 +561,11 @@ def get_orders_by_user(
 def update_order(
     order_id: int,
     order_update: OrderUpdate,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_staff_user)
 ):
-    """Update order status and details"""
+    """Update order status and details (If-Match / body version: refused with 409 if the order changed)"""
     try:
         print(f" Updating order: {order_id}")
         
@@ -912,6 +578,10 @@ def update_order(
         
         
         update_data = order_update.dict(exclude_unset=True)
+        expected = expected_version(if_match, update_data.pop('version', None))
+        if expected is not None and expected != order.version:
+            print(f" Version conflict on order {order_id}: expected {expected}, current {order.version}")
+            return conflict_response(serialize_order(db, order, STAFF))
 
         
         if 'status' in update_data and update_data['status']:
@@ -927,65 +597,22 @@ def update_order(
         order.updated_by = current_user.email
         
         db.add(order)
-        db.commit()
-        db.refresh(order)
+        try:
+            db.commit()
+        except StaleDataError:
+            # Someone else committed between our read and the versioned UPDATE
+            db.rollback()
+            print(f" Version conflict on order {order_id} at commit")
+            current = db.get(Order, order_id)
+            if not current:
+                raise HTTPException(status_code=404, detail="Order not found")
+            return conflict_response(serialize_order(db, current, STAFF))
         
         print(f" Order updated: {order.Token_no}")
-
-        
-        user = db.get(User, order.user_id)
-        address = db.get(Address, order.address_id)
-        order_items = db.exec(select(OrderItem).where(OrderItem.order_id == order_id)).all()
-        
-        items_response = []
-        for item in order_items:
-            items_response.append({
-                "order_item_id": item.order_item_id,
-                "order_id": item.order_id,
-                "category_name": convert_category_name(item.category_name),
-                "product_name": convert_product_name(item.product_name),
-                "quantity": item.quantity,
-                "service": convert_service_type(item.service),
-                "status": convert_order_status(item.status).value,
-                "created_at": item.created_at,
-                "updated_at": item.updated_at,
-            })
-        
-        address_details = None
-        if address:
-            address_details = {
-                "address_line1": address.address_line1,
-                "address_line2": address.address_line2,
-                "city": address.city,
-                "state": address.state,
-                "pincode": address.pincode,
-            }
-        
-        response_data = {
-            "order_id": order.order_id,
-            "user_id": order.user_id,
-            "address_id": order.address_id,
-            "Token_no": order.Token_no,
-            "service": convert_service_type(order.service),
-            "status": convert_order_status(order.status).value,
-            "created_at": order.created_at,
-            "updated_at": order.updated_at,
-            "created_by": order.created_by,
-            "updated_by": order.updated_by,
-            "address_line1": address.address_line1 if address else "",
-            "address_line2": address.address_line2 if address else "",
-            "city": address.city if address else "",
-            "state": address.state if address else "",
-            "pincode": address.pincode if address else "",
-            "user_name": user.name if user else None,
-            "user_mobile": user.mobile_no if user else None,
-            "address_details": address_details,
-            "items": items_response,
-            "order_items": items_response
-        }
-        
-        return OrderResponse(**response_data)
+        return FastJSONResponse(serialize_order(db, order, STAFF), headers={"ETag": version_etag(order.version)})
         
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         print(f"Update order error: {str(e)}")
@@ -1027,6 +654,43 @@ def delete_order(
 
 
 
+@router.post("/transitions")
+def apply_order_transitions(
+    request: OrderTransitionsRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_staff_user)
+):
+    """Move many orders (and their items) to new statuses in one transaction"""
+    try:
+        user_identifier = get_user_identifier(current_user)
+        print(f" Applying {len(request.transitions)} transitions by {user_identifier}")
+
+        result = apply_transitions(db, request.transitions, user_identifier)
+        db.commit()
+
+        for applied in result["applied"]:
+            event_hub.publish_order_event(
+                "order_status",
+                applied["user_id"],
+                order_id=applied["order_id"],
+                Token_no=applied["Token_no"],
+                status=applied["to"],
+                previous_status=applied["from"],
+                updated_by=user_identifier,
+            )
+
+        return {
+            "success": True,
+            "applied_count": len(result["applied"]),
+            "rejected_count": len(result["rejected"]),
+            **result
+        }
+
+    except Exception as e:
+        db.rollback()
+        print(f" Transitions error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to apply transitions: {str(e)}")
+
 @router.post("/{order_id}/confirm")
 def confirm_order(
     order_id: int,
@@ -1074,12 +738,14 @@ def pick_order(
         print(f" Order found - ID: {order.order_id}, Token: {order.Token_no}, Status: {order.status}")
         
         
+        previous_status = order.status
         order.status = OrderStatus.PICKED_UP
         
         
         if not order.Token_no:
-            new_token = generate_token()
+            new_token = generate_token(db)
             order.Token_no = new_token
+            index_tokens(db, [(order.order_id, new_token)])
             print(f" Generated new token: {new_token}")
         else:
             print(f" Using existing token: {order.Token_no}")
@@ -1089,7 +755,7 @@ def pick_order(
         
         db.add(order)
         db.commit()
-        db.refresh(order)
+        event_hub.publish_order_status(order, previous_status)
         
         print(f" Order picked successfully! Token: {order.Token_no}")
         return {
@@ -1121,12 +787,14 @@ def complete_order(
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
         
+        previous_status = order.status
         order.status = OrderStatus.COMPLETED
         order.updated_at = datetime.utcnow()
         order.updated_by = user_identifier
         
         db.add(order)
         db.commit()
+        event_hub.publish_order_status(order, previous_status)
         
         return {"message": "Order completed successfully", "Token_no": order.Token_no}
         
@@ -1166,7 +834,7 @@ def complete_order(
 
 @router.get("/dashboard/stats")
 def get_dashboard_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_staff_user)
 ):
     """Get dashboard statistics for staff"""
@@ -9,6 +9,7 @@ from db.session import get_db
 from models.user import User, UserRole
 from schemas.staff import StaffCreate, StaffUpdate, StaffResponse
 from dependencies.auth import get_current_user
+from services.refresh_token_service import revoke_user_tokens
 
 router = APIRouter(tags=["Staff Management"])
 
@@ -17,7 +18,7 @@ def hash_password(password: str) -> str:
 
 
 @router.get("/", response_model=List[StaffResponse])
-async def get_all_staff(
+def get_all_staff(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
     role: Optional[UserRole] = Query(None, description="Filter by role"),
@@ -65,7 +66,7 @@ async def get_all_staff(
 
 
 @router.get("/{staff_id}", response_model=StaffResponse)
-async def get_staff(
+def get_staff(
     staff_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -107,7 +108,7 @@ async def get_staff(
 
 
 @router.post("/", response_model=StaffResponse)
-async def create_staff(
+def create_staff(
     staff_data: StaffCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -147,7 +148,6 @@ async def create_staff(
         
         db.add(new_staff)
         db.commit()
-        db.refresh(new_staff)
         
         return new_staff
         
@@ -162,7 +162,7 @@ async def create_staff(
 
 
 @router.put("/{staff_id}", response_model=StaffResponse)
-async def update_staff(
+def update_staff(
     staff_id: int,
     staff_data: StaffUpdate,
     db: Session = Depends(get_db),
@@ -212,6 +212,7 @@ async def update_staff(
             if field == 'password' and value:
                 
                 setattr(staff, field, hash_password(value))
+                revoke_user_tokens(db, staff.user_id)
             elif field in ['role', 'status'] and value:
                 
                 setattr(staff, field, value.value)
@@ -221,7 +222,6 @@ async def update_staff(
         staff.updated_at = datetime.utcnow()
         
         db.commit()
-        db.refresh(staff)
         
         return staff
         
@@ -236,7 +236,7 @@ async def update_staff(
 
 
 @router.delete("/{staff_id}")
-async def delete_staff(
+def delete_staff(
     staff_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -292,7 +292,7 @@ async def delete_staff(
 
 
 @router.get("/role/{role}", response_model=List[StaffResponse])
-async def get_staff_by_role(
+def get_staff_by_role(
     role: UserRole,
     status_filter: Optional[str] = Query(None, description="Filter by status"),
     db: Session = Depends(get_db),
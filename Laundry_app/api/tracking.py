@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Header, HTTPException, Response, status
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+
+from services.order_tracking_service import MISSING, cached_tracking, load_tracking
+
+router = APIRouter()
+
+
+@router.get("/track/{Token_no}")
+async def track_order(
+    Token_no: str,
+    if_none_match: Optional[str] = Header(None)
+):
+    """Public order status by Token_no: status, timestamps and item counts"""
+    entry = cached_tracking(Token_no)
+    if entry is None:
+        entry = await run_in_threadpool(load_tracking, Token_no)
+    if entry is None or entry is MISSING:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if if_none_match and entry.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
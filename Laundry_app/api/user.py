@@ -8,6 +8,7 @@ from schemas.user import UserResponse, UserUpdate, UserCreate
 from Laundry_app.crud.crud_user import crud_user
 from dependencies.auth import get_current_user
 from core.security import get_password_hash
+from services.refresh_token_service import revoke_user_tokens
 from models.user import User
 
 router = APIRouter()
@@ -200,8 +201,9 @@ def update_user(
     
     
     if 'password' in update_data and update_data['password']:
-        update_data['hashed_password'] = get_password_hash(update_data['password'])
-        del update_data['password']
+        update_data['password'] = get_password_hash(update_data['password'])
+        # Committed with the update: other devices have to log in again
+        revoke_user_tokens(db, user_id)
     
     
     if 'mobile_no' in update_data and update_data['mobile_no']:
@@ -0,0 +1,102 @@
+# benchmarks/_harness.py
+"""
+Shared setup for the benchmark scripts (the test suite uses it too).
+
+Each script runs against an in-memory SQLite database with the app's tables
+and session listeners, counts the statements sent to the database and times
+the code path, so results are reproducible without MySQL. Statement counts
+carry over to MySQL; absolute timings do not (no network round trip).
+
+Run from Laundry_app/, e.g. `python -m benchmarks.bench_bulk_delete`.
+"""
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+from typing import Callable, List
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (APP_DIR, os.path.dirname(APP_DIR)):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+
+def quiet():
+    """Swallow the app's debug prints"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+with quiet():
+    import main  # noqa: F401  registers every model and session listener
+
+
+class StatementCounter:
+    """Records every statement sent to the engine (before_cursor_execute)"""
+
+    def __init__(self, engine):
+        self.statements: List[str] = []
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def reset(self):
+        self.statements.clear()
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def verbs(self) -> List[str]:
+        return [statement.split(None, 1)[0].upper() for statement in self.statements]
+
+
+def make_database():
+    """(engine, sessionmaker, counter) for a fresh in-memory database"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine, class_=Session, expire_on_commit=False), StatementCounter(engine)
+
+
+def use_local_token_range():
+    """
+    Hand out Token_no sequences from memory.
+
+    The allocator reserves blocks on a second connection, which an
+    in-memory SQLite database shared through one connection cannot do.
+    """
+    from services.token_service import token_allocator
+    token_allocator._day = time.strftime("%Y%m%d")
+    token_allocator._next, token_allocator._end = 1, 10**7
+
+
+def measure(run: Callable[[], None], setup: Callable[[], None] = None, repeat: int = 20) -> float:
+    """Median wall time of run() in milliseconds; setup() runs untimed before each call"""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        with quiet():
+            started = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def report(title: str, rows: List[tuple]):
+    """Print a before/after table: rows of (label, statements, milliseconds)"""
+    print(f"\n{title}")
+    print(f"  {'variant':<28}{'statements':>12}{'ms':>10}")
+    for label, statements, ms in rows:
+        print(f"  {label:<28}{statements:>12}{ms:>10.2f}")
@@ -0,0 +1,143 @@
+# benchmarks/bench_archive_payloads.py
+"""
+Archived order storage: legacy JSON columns (before) vs compressed payloads (after).
+
+Before: an archive kept the order in order_data, its items in
+order_items_data and again one order_items_archive row per item. After:
+one zlib-compressed, column-oriented payload per archive. The script seeds
+legacy archives with deterministic data, converts them with
+migrate_archive_payloads() and reports bytes stored and the time to read
+and decode a page of archives in each format.
+
+    python -m benchmarks.bench_archive_payloads [archives] [items_per_order]
+"""
+import random
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks._harness import make_database, measure, quiet, report
+
+from sqlalchemy import insert
+from sqlmodel import select
+from models.order import Order
+from models.order_archive import OrderArchive, OrderItemsArchive
+from models.order_item import OrderItem
+from services.archive_payload_service import archive_contents, items_summary, migrate_archive_payloads
+from services.order_service import _snapshot
+
+SERVICES = ("wash_iron", "dry_cleaning", "wash_only")
+CATEGORIES = ("Men", "Women", "Kids", "Household")
+PRODUCTS = ("Shirt", "Trousers", "Saree", "Kurta", "Bedsheet", "Curtain", "Jacket")
+
+
+def sample_row(table, values):
+    """A row dict with every column of `table`, None where no value is given"""
+    return {column.name: values.get(column.name) for column in table.columns}
+
+
+def seed(Local, archives: int, items_per_order: int):
+    rng = random.Random(40)
+    created = datetime(2025, 1, 1)
+    archive_rows, item_rows = [], []
+    for archive_id in range(1, archives + 1):
+        created += timedelta(minutes=rng.randint(1, 600))
+        service = rng.choice(SERVICES)
+        items = [
+            _snapshot(sample_row(OrderItem.__table__, {
+                "order_item_id": archive_id * 100 + n,
+                "order_id": archive_id,
+                "category_name": rng.choice(CATEGORIES),
+                "product_name": rng.choice(PRODUCTS),
+                "service": service,
+                "quantity": rng.randint(1, 6),
+                "unit_price": float(rng.choice((15, 20, 35, 60, 120))),
+                "status": "pending",
+                "created_at": created,
+                "updated_at": created,
+            }))
+            for n in range(items_per_order)
+        ]
+        order = _snapshot(sample_row(Order.__table__, {
+            "order_id": archive_id,
+            "user_id": rng.randint(1, 500),
+            "address_id": rng.randint(1, 800),
+            "Token_no": f"{rng.randrange(36 ** 6):06X}",
+            "service": service,
+            "status": "pending",
+            "item_count": len(items),
+            "total_quantity": sum(item["quantity"] for item in items),
+            "total_amount": sum(item["quantity"] * item["unit_price"] for item in items),
+            "created_at": created,
+            "updated_at": created,
+        }))
+        archive_rows.append({
+            "id": archive_id,
+            "original_order_id": archive_id,
+            "user_id": order["user_id"],
+            "order_data": order,
+            "order_items_data": items_summary(items),
+            "deletion_reason": "customer_request",
+            "deleted_by": 1,
+            "deleted_by_role": "admin",
+            "notes": None,
+            "deleted_at": created,
+        })
+        item_rows.extend(
+            {
+                "original_item_id": item["order_item_id"],
+                "original_order_id": archive_id,
+                "archive_order_id": archive_id,
+                "item_data": item,
+                "deleted_at": created,
+            }
+            for item in items
+        )
+
+    with Local() as db:
+        db.query(OrderItemsArchive).delete()
+        db.query(OrderArchive).delete()
+        db.execute(insert(OrderArchive.__table__), archive_rows)
+        db.execute(insert(OrderItemsArchive.__table__), item_rows)
+        db.commit()
+
+
+def read_page(Local, limit: int = 100):
+    """What the archive API does per page: load rows and decode each one"""
+    with Local() as db:
+        for archive in db.exec(select(OrderArchive).order_by(OrderArchive.id.desc()).limit(limit)).all():
+            archive_contents(archive)
+
+
+def main(archives: int = 1000, items_per_order: int = 6):
+    engine, Local, counter = make_database()
+    seed(Local, archives, items_per_order)
+    counter.reset()
+    read_page(Local)
+    legacy_statements = counter.count
+    legacy_ms = measure(lambda: read_page(Local))
+
+    with Local() as db, quiet():
+        converted = migrate_archive_payloads(db)
+    counter.reset()
+    read_page(Local)
+    payload_statements = counter.count
+    payload_ms = measure(lambda: read_page(Local))
+
+    json_bytes = converted["json_bytes"]
+    payload_bytes = converted["payload_bytes"]
+    print(f"\nStorage for {converted['converted']} archives x {items_per_order} items")
+    print(f"  {'variant':<28}{'bytes':>12}{'per order':>10}")
+    print(f"  {'JSON columns (before)':<28}{json_bytes:>12}{json_bytes / archives:>10.0f}")
+    print(f"  {'payload (after)':<28}{payload_bytes:>12}{payload_bytes / archives:>10.0f}")
+    print(f"  saved {json_bytes - payload_bytes} bytes ({100 * (1 - payload_bytes / json_bytes):.0f}%), "
+          f"plus {archives * items_per_order} order_items_archive rows")
+
+    report("Read and decode a page of 100 archives", [
+        ("JSON columns (before)", legacy_statements, legacy_ms),
+        ("payload (after)", payload_statements, payload_ms),
+    ])
+    print(f"  decode alone: {converted['decode_ms_per_archive']} ms per archive")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,74 @@
+# benchmarks/bench_bulk_delete.py
+"""
+Bulk catalogue deletes: per-row cascade (before) vs set-based (after).
+
+Before: DELETE /services/bulk/ looped over the ids, and each service ran a
+SELECT for itself, a SELECT for its categories and one product DELETE per
+category. After: ServiceCRUD.delete_services runs one existence SELECT and
+three DELETEs for the whole batch.
+
+    python -m benchmarks.bench_bulk_delete [services] [categories] [products]
+"""
+import sys
+
+from benchmarks._harness import make_database, measure, quiet, report
+
+from sqlalchemy import insert
+from crud.crud_service import ServiceCRUD
+from models.service import Service, ServiceCategory, ServiceProduct
+
+
+def seed(Local, services: int, categories: int, products: int):
+    with Local() as db:
+        db.query(ServiceProduct).delete()
+        db.query(ServiceCategory).delete()
+        db.query(Service).delete()
+        db.execute(insert(Service.__table__), [
+            {"id": s, "name": f"service {s}", "is_active": True} for s in range(1, services + 1)
+        ])
+        db.execute(insert(ServiceCategory.__table__), [
+            {"id": s * 1000 + c, "name": f"category {c}", "service_id": s, "is_active": True}
+            for s in range(1, services + 1) for c in range(categories)
+        ])
+        db.execute(insert(ServiceProduct.__table__), [
+            {"name": f"product {p}", "price": 10.0, "category_id": s * 1000 + c, "is_active": True, "is_available": True}
+            for s in range(1, services + 1) for c in range(categories) for p in range(products)
+        ])
+        db.commit()
+
+
+def delete_per_row(db, service_ids):
+    """The loop the bulk endpoint ran before the set-based delete"""
+    for service_id in service_ids:
+        service = db.query(Service).filter(Service.id == service_id).first()
+        if not service:
+            continue
+        for category in db.query(ServiceCategory).filter(ServiceCategory.service_id == service_id).all():
+            db.query(ServiceProduct).filter(ServiceProduct.category_id == category.id).delete()
+        db.query(ServiceCategory).filter(ServiceCategory.service_id == service_id).delete()
+        db.query(Service).filter(Service.id == service_id).delete()
+        db.commit()
+
+
+def main(services: int = 20, categories: int = 5, products: int = 10):
+    engine, Local, counter = make_database()
+    ids = list(range(1, services + 1))
+    rows = []
+    for label, delete in (("per-row (before)", delete_per_row), ("set-based (after)", ServiceCRUD.delete_services)):
+        seed(Local, services, categories, products)
+        with Local() as db, quiet():
+            counter.reset()
+            delete(db, ids)
+            statements = counter.count
+
+        def run():
+            with Local() as db:
+                delete(db, ids)
+
+        ms = measure(run, setup=lambda: seed(Local, services, categories, products), repeat=10)
+        rows.append((label, statements, ms))
+    report(f"Delete {services} services x {categories} categories x {products} products", rows)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,85 @@
+# benchmarks/bench_order_creation.py
+"""
+Order creation: commit per row (before) vs one transaction (after).
+
+Before: create_order committed the address, the order and the items
+separately and refreshed each of them afterwards (a SELECT per row).
+After: OrderCreationService flushes the address and the order, adds the
+items in one INSERT and the route commits once. Both variants take their
+Token_no from the same allocator, so only the write path differs.
+
+    python -m benchmarks.bench_order_creation [orders] [items_per_order]
+"""
+import sys
+from datetime import datetime
+
+from benchmarks._harness import make_database, measure, quiet, report, use_local_token_range
+
+from models.address import Address
+from models.order import Order
+from models.order_item import OrderItem
+from models.user import User
+from services.order_creation_service import OrderCreationService
+from services.token_service import generate_token_no
+
+
+def item_rows(items_per_order: int):
+    return [
+        {"category_name": "men", "product_name": f"shirt {i}", "quantity": 2, "service": "wash_iron", "status": "pending"}
+        for i in range(items_per_order)
+    ]
+
+
+def create_commit_per_row(db, user_id: int, items_per_order: int):
+    """The route's write path before the single-transaction change"""
+    address = Address(user_id=user_id, name="Customer", mobile_no="9000000000", address_line1="1 Main Road", address_line2="", city="Chennai", state="TN", pincode="600001")
+    db.add(address)
+    db.commit()
+    db.refresh(address)
+    order = Order(
+        user_id=user_id, address_id=address.address_id, Token_no=generate_token_no(db), service="wash_iron",
+        status="pending", created_by="bench", created_at=datetime.utcnow(), updated_at=datetime.utcnow()
+    )
+    db.add(order)
+    db.commit()
+    db.refresh(order)
+    items = [OrderItem(order_id=order.order_id, unit_price=10.0, created_by="bench", **row) for row in item_rows(items_per_order)]
+    for item in items:
+        db.add(item)
+    db.commit()
+    for item in items:
+        db.refresh(item)
+
+
+def create_single_transaction(db, user_id: int, items_per_order: int):
+    creator = OrderCreationService(db)
+    address = creator.find_or_create_address(user_id, "Customer", "9000000000", "1 Main Road", None, "Chennai", "TN", "600001")
+    creator.create_order(user_id, address.address_id, "wash_iron", "pending", "bench", item_rows(items_per_order))
+    db.commit()
+
+
+def main(orders: int = 50, items_per_order: int = 5):
+    use_local_token_range()
+    engine, Local, counter = make_database()
+    with Local() as db:
+        user = User(name="Customer", mobile_no="9000000000", email="bench@example.com", password="!guest")
+        db.add(user)
+        db.commit()
+        user_id = user.user_id
+
+    rows = []
+    for label, create in (("commit per row (before)", create_commit_per_row), ("one transaction (after)", create_single_transaction)):
+        def run():
+            with Local() as db:
+                for _ in range(orders):
+                    create(db, user_id, items_per_order)
+
+        counter.reset()
+        with quiet():
+            run()
+        rows.append((label, counter.count / orders, measure(run, repeat=5) / orders))
+    report(f"Create one order with {items_per_order} items (per order, averaged over {orders})", rows)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
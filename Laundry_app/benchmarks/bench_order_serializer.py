@@ -0,0 +1,82 @@
+# benchmarks/bench_order_serializer.py
+"""
+Order list serialization: per-order queries + model validation (before) vs
+services/order_serializer + FastJSONResponse (after).
+
+Before: the list routes read the user, the address and the items of each
+order separately (three queries per order), validated every dict through
+OrderResponse and encoded it with jsonable_encoder + json. After:
+serialize_orders loads users, addresses and items for the page with one IN
+query each and the dicts are encoded once by core.responses.dumps (orjson
+when installed).
+
+    python -m benchmarks.bench_order_serializer [orders] [items_per_order]
+"""
+import json
+import sys
+
+from benchmarks._harness import make_database, measure, quiet, report, use_local_token_range
+
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import select
+
+from core.responses import dumps
+from models.address import Address
+from models.order import Order
+from models.order_item import OrderItem
+from models.user import User
+from schemas.order import OrderResponse
+from services.order_creation_service import OrderCreationService
+from services.order_serializer import STAFF, build_order_dict, serialize_orders
+
+
+def seed(Local, orders: int, items_per_order: int):
+    with Local() as db, quiet():
+        creator = OrderCreationService(db)
+        for n in range(orders):
+            user = User(name=f"Customer {n}", mobile_no=f"9{n:09d}", email=f"c{n}@example.com", password="!guest")
+            db.add(user)
+            db.flush()
+            address = creator.find_or_create_address(user.user_id, user.name, user.mobile_no, "1 Main Road", None, "Chennai", "TN", "600001")
+            creator.create_order(user.user_id, address.address_id, "wash_iron", "pending", "bench", [
+                {"category_name": "men", "product_name": f"shirt {i}", "quantity": 2, "service": "wash_iron", "status": "pending"}
+                for i in range(items_per_order)
+            ])
+        db.commit()
+
+
+def encode_per_order(db, orders):
+    """What the list routes did before the shared serializer"""
+    payload = []
+    for order in orders:
+        user = db.get(User, order.user_id)
+        address = db.get(Address, order.address_id)
+        items = db.exec(select(OrderItem).where(OrderItem.order_id == order.order_id)).all()
+        payload.append(OrderResponse(**build_order_dict(order, user, address, items, STAFF)))
+    return json.dumps(jsonable_encoder(payload)).encode()
+
+
+def encode_batched(db, orders):
+    return dumps(serialize_orders(db, orders, STAFF))
+
+
+def main(orders: int = 100, items_per_order: int = 5):
+    use_local_token_range()
+    engine, Local, counter = make_database()
+    seed(Local, orders, items_per_order)
+    rows = []
+    for label, encode in (("per-order (before)", encode_per_order), ("batched + orjson (after)", encode_batched)):
+        def run():
+            with Local() as db:
+                encode(db, db.exec(select(Order).order_by(Order.order_id)).all())
+
+        counter.reset()
+        with quiet():
+            run()
+        statements = counter.count
+        rows.append((label, statements, measure(run, repeat=10)))
+    report(f"Serialize a page of {orders} orders x {items_per_order} items", rows)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
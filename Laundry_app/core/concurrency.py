@@ -0,0 +1,47 @@
+# core/concurrency.py
+"""
+Optimistic concurrency for order edits.
+
+Orders and order items carry a `version` that every write bumps. Edit
+responses send it as an ETag; a client echoes it in If-Match (or as
+`version` in the body) and an edit based on an older version is refused
+with 409 and the current state instead of overwriting someone else's
+change. No locks are held between the read and the write.
+"""
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from core.responses import FastJSONResponse
+
+
+def version_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def parse_if_match(value: Optional[str]) -> Optional[int]:
+    """Version from an If-Match header ('"3"', 'W/"3"' or '3'); None when absent or '*'"""
+    if not value or value.strip() == "*":
+        return None
+    value = value.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid If-Match header")
+
+
+def expected_version(if_match: Optional[str], body_version: Optional[int] = None) -> Optional[int]:
+    """The version a write is based on; If-Match wins over the body"""
+    header_version = parse_if_match(if_match)
+    return header_version if header_version is not None else body_version
+
+
+def conflict_response(current: Dict[str, Any], detail: str = "Order was modified by someone else") -> FastJSONResponse:
+    """409 carrying the current state, so the client can merge without another read"""
+    return FastJSONResponse(
+        {"detail": detail, "current": current},
+        status_code=status.HTTP_409_CONFLICT,
+        headers={"ETag": version_etag(current["version"])} if current.get("version") is not None else None
+    )
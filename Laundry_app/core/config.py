@@ -14,17 +14,69 @@ class Settings(BaseSettings):
     MYSQL_DATABASE: str = os.getenv("MYSQL_DATABASE", "laundry_db")
     
     DATABASE_URL: Optional[str] = None
+    # Read replica for dashboards, catalogue, listings and archive reads;
+    # when unset those reads use the primary
+    READ_DATABASE_URL: Optional[str] = os.getenv("READ_DATABASE_URL")
     
     
     SECRET_KEY: str = "your-secret-key-change-in-production" 
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Refresh tokens (services/refresh_token_service.py) renew access tokens
+    # without another OTP or password check
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     
     class Config:
         case_sensitive = True
 
     
     OTP_EXPIRE_MINUTES: int = 10
+
+    # Event-loop lag monitor (core/loop_monitor.py)
+    LOOP_LAG_MONITOR_ENABLED: bool = True
+    LOOP_LAG_INTERVAL_SECONDS: float = 0.5
+    LOOP_LAG_THRESHOLD_MS: int = 100
+
+    # History job (services/order_history_service.py): completed/cancelled orders
+    # older than HISTORY_AFTER_DAYS move to order_history
+    HISTORY_JOB_ENABLED: bool = True
+    HISTORY_AFTER_DAYS: int = 180
+    HISTORY_BATCH_SIZE: int = 500
+    HISTORY_JOB_INTERVAL_SECONDS: int = 3600
+    # Customer summaries re-verified per history job run (rolling sweep)
+    SUMMARY_REPAIR_BATCH_SIZE: int = 500
+
+    # Order event push (core/event_hub.py, api/events.py)
+    EVENT_QUEUE_SIZE: int = 100
+    EVENT_HEARTBEAT_SECONDS: int = 15
+
+    # Idempotency-Key on order creation (core/idempotency.py)
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    # How long a running attempt holds its key; a few times the request timeout
+    IDEMPOTENCY_LEASE_SECONDS: int = 120
+    IDEMPOTENCY_WAIT_SECONDS: float = 10
+
+    # Rate limiting and load shedding (core/rate_limit.py); per-prefix
+    # limits are set next to the routers in main.py
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_PER_MINUTE: int = 300
+    RATE_LIMIT_MAX_KEYS: int = 10000
+    # Reverse proxies in front of the app that append to X-Forwarded-For.
+    # The client IP is the entry that many places from the right; entries
+    # further left are client-supplied and ignored. 0 uses the socket peer.
+    # On Render (one proxy hop) set RATE_LIMIT_TRUSTED_PROXIES=1, otherwise
+    # every anonymous client shares the proxy's address.
+    RATE_LIMIT_TRUSTED_PROXIES: int = 0
+    # Requests served at once; the default matches the DB pool (5 + 10 overflow)
+    MAX_IN_FLIGHT_REQUESTS: int = 15
+
+    # Public order tracking cache (services/order_tracking_service.py).
+    # Commits in this worker refresh it at once; the TTL bounds staleness
+    # from writes made by other workers
+    TRACKING_CACHE_SIZE: int = 20000
+    TRACKING_CACHE_TTL_SECONDS: int = 15
+    # Unknown tokens are remembered this long, so probing costs no queries
+    TRACKING_MISS_TTL_SECONDS: int = 30
     
     class Config:
         case_sensitive = True
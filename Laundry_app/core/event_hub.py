@@ -0,0 +1,148 @@
+# core/event_hub.py
+"""
+In-process pub/sub for order status events.
+
+Write paths call `event_hub.publish_threadsafe(...)` after their commit; the
+event is handed to the broker on the event loop and fanned out to every
+subscriber of its channels. Channels are "user:<user_id>" for the order's
+customer and "staff" for staff/admin clients.
+
+Each subscriber has a bounded queue. A slow client never blocks the
+publisher: when its queue is full the oldest event is dropped and the
+client is sent a "resync" event with the number it missed, so it can
+reload (e.g. through the staff delta-sync feed).
+
+The broker is pluggable: InMemoryBroker serves a single worker; a broker
+backed by Redis pub/sub or similar can implement the same interface so
+several workers share events.
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional, Set
+
+from core.config import settings
+
+STAFF_CHANNEL = "staff"
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+class Subscription:
+    """One client's bounded event queue"""
+
+    def __init__(self, channels: Iterable[str], maxsize: int):
+        self.channels = set(channels)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, a resync notice after drops, or None on timeout"""
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            return {"type": "resync", "dropped": dropped}
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Broker(ABC):
+    @abstractmethod
+    async def publish(self, channels: Iterable[str], event: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    def subscribe(self, channels: Iterable[str], maxsize: int) -> Subscription:
+        ...
+
+    @abstractmethod
+    def unsubscribe(self, subscription: Subscription):
+        ...
+
+
+class InMemoryBroker(Broker):
+    """Fan-out to subscribers of this process"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+
+    async def publish(self, channels: Iterable[str], event: Dict[str, Any]):
+        delivered: Set[Subscription] = set()
+        for channel in channels:
+            for subscription in self._subscribers.get(channel, ()):
+                if subscription not in delivered:
+                    subscription.offer(event)
+                    delivered.add(subscription)
+
+    def subscribe(self, channels: Iterable[str], maxsize: int) -> Subscription:
+        subscription = Subscription(channels, maxsize)
+        for channel in subscription.channels:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for channel in subscription.channels:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def subscriber_count(self) -> int:
+        return len({s for subscribers in self._subscribers.values() for s in subscribers})
+
+
+class EventHub:
+    def __init__(self, broker: Broker, queue_size: int = 100):
+        self.broker = broker
+        self.queue_size = queue_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Remember the server's event loop so sync routes can publish"""
+        self._loop = loop
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        return self.broker.subscribe(channels, self.queue_size)
+
+    def unsubscribe(self, subscription: Subscription):
+        self.broker.unsubscribe(subscription)
+
+    def publish_threadsafe(self, channels: Iterable[str], event: Dict[str, Any]):
+        """Publish from any thread without waiting; a no-op until bind()"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self.broker.publish(list(channels), event), loop)
+
+    def publish_order_event(self, event_type: str, user_id: Optional[int], **data):
+        """Send an order event to the customer's channel and to staff"""
+        channels = [STAFF_CHANNEL]
+        if user_id is not None:
+            channels.append(user_channel(user_id))
+        self.publish_threadsafe(channels, {"type": event_type, "user_id": user_id, **data})
+
+    def publish_order_status(self, order, previous_status: Optional[str] = None):
+        """Order status event from a committed Order row"""
+        self.publish_order_event(
+            "order_status",
+            order.user_id,
+            order_id=order.order_id,
+            Token_no=order.Token_no,
+            status=order.status,
+            previous_status=previous_status,
+            updated_at=order.updated_at,
+            updated_by=order.updated_by,
+        )
+
+
+event_hub = EventHub(InMemoryBroker(), queue_size=settings.EVENT_QUEUE_SIZE)
@@ -0,0 +1,176 @@
+# core/idempotency.py
+"""
+Idempotency-Key support for create endpoints.
+
+A client that may retry sends the same Idempotency-Key header on every
+attempt. The first attempt claims the key by inserting a "pending" row in
+idempotency_keys (committed on its own); the primary key makes the claim
+atomic, so concurrent duplicates wait on the row instead of creating a
+second order. The response is stored in the same transaction as the order,
+and later attempts get it back without touching the order tables.
+
+A pending claim is a lease of IDEMPOTENCY_LEASE_SECONDS: if the worker
+running the attempt dies, a retry takes the key over once the lease has
+run out. An attempt that outlives its lease cannot store its response
+(complete() raises 409, rolling its order back), so a taken-over key never
+ends up with two orders. Completed keys are kept for
+IDEMPOTENCY_TTL_SECONDS. Expired rows are ignored and removed by
+prune_idempotency_keys() (run by the history job).
+"""
+import hashlib
+import json
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from core.config import settings
+from core.responses import FastJSONResponse, dumps
+from db.session import SessionLocal
+from models.idempotency_key import IdempotencyKey
+
+PENDING = "pending"
+DONE = "done"
+
+MAX_KEY_LENGTH = 128
+POLL_INTERVAL_SECONDS = 0.2
+
+
+def request_hash(payload: Any) -> str:
+    """Stable fingerprint of a request body, to catch a key reused for a different request"""
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+class IdempotentRequest:
+    """One request carrying an Idempotency-Key"""
+
+    def __init__(self, scope: str, key: str, payload: Any):
+        if len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"
+            )
+        self.scope = scope
+        self.key = key
+        self.request_hash = request_hash(payload)
+        # created_at of our claim; whole seconds so it compares equal after a DATETIME round trip
+        self.claimed_at: Optional[datetime] = None
+
+    def begin(self, wait_seconds: Optional[float] = None) -> Optional[FastJSONResponse]:
+        """
+        Claim the key, or return the stored response of an earlier attempt.
+
+        Returns None when this request owns the key and should run. While
+        another attempt with the key is still running, waits up to
+        wait_seconds for its response, then answers 409.
+        """
+        wait_seconds = settings.IDEMPOTENCY_WAIT_SECONDS if wait_seconds is None else wait_seconds
+        table = IdempotencyKey.__table__
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            with SessionLocal() as db:
+                now = datetime.utcnow().replace(microsecond=0)
+                db.add(IdempotencyKey(
+                    scope=self.scope,
+                    idempotency_key=self.key,
+                    request_hash=self.request_hash,
+                    status=PENDING,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+                ))
+                try:
+                    db.commit()
+                    self.claimed_at = now
+                    return None
+                except IntegrityError:
+                    db.rollback()
+
+                stored = db.get(IdempotencyKey, (self.scope, self.key))
+                if stored is None:
+                    continue  # released or pruned in between; claim again
+                if stored.expires_at <= now:
+                    # Lease of a dead attempt (or an expired response): take the key over
+                    self._delete(db, table.c.expires_at <= now)
+                    continue
+                if stored.request_hash != self.request_hash:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail="Idempotency-Key was already used for a different request"
+                    )
+                if stored.status == DONE:
+                    print(f" Idempotency: replaying stored response for key {self.key}")
+                    return FastJSONResponse(
+                        json.loads(zlib.decompress(stored.response)),
+                        status_code=stored.status_code or status.HTTP_200_OK,
+                        headers={"Idempotent-Replayed": "true"}
+                    )
+
+            if time.monotonic() >= deadline:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still being processed"
+                )
+            time.sleep(POLL_INTERVAL_SECONDS)
+
+    def complete(self, db: Session, body: Dict[str, Any], status_code: int = status.HTTP_200_OK):
+        """
+        Store the response and keep it for IDEMPOTENCY_TTL_SECONDS; committed
+        together with the caller's transaction.
+
+        Raises 409 when the claim is no longer ours (the lease ran out and a
+        retry took the key over), so the caller rolls its work back.
+        """
+        table = IdempotencyKey.__table__
+        result = db.execute(
+            update(table)
+            .where(table.c.scope == self.scope, table.c.idempotency_key == self.key, self._owned(table))
+            .values(
+                status=DONE,
+                status_code=status_code,
+                response=zlib.compress(dumps(body)),
+                expires_at=datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+            )
+        )
+        if not result.rowcount:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Idempotency-Key lease expired while the request was running; retry it"
+            )
+
+    def release(self):
+        """Give the key up after a failed attempt so a retry can run"""
+        if self.claimed_at is None:
+            return
+        with SessionLocal() as db:
+            self._delete(db, self._owned(IdempotencyKey.__table__))
+
+    def _owned(self, table):
+        return and_(table.c.status == PENDING, table.c.created_at == self.claimed_at)
+
+    def _delete(self, db: Session, *conditions):
+        table = IdempotencyKey.__table__
+        db.execute(
+            delete(table).where(table.c.scope == self.scope, table.c.idempotency_key == self.key, *conditions)
+        )
+        db.commit()
+
+
+def idempotent_request(scope: str, key: Optional[str], payload: Any) -> Optional[IdempotentRequest]:
+    """An IdempotentRequest when the client sent a key, else None"""
+    key = (key or "").strip()
+    return IdempotentRequest(scope, key, payload) if key else None
+
+
+def prune_idempotency_keys(db: Session) -> int:
+    """Drop expired keys"""
+    table = IdempotencyKey.__table__
+    result = db.execute(delete(table).where(table.c.expires_at < datetime.utcnow()))
+    db.commit()
+    return result.rowcount
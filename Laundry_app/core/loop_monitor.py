@@ -0,0 +1,61 @@
+# core/loop_monitor.py
+"""
+Event-loop lag monitor.
+
+A background task sleeps for a fixed interval and measures how late it wakes
+up. If the loop was stalled for longer than the threshold (for example by a
+blocking call inside an `async def` route) a warning is printed.
+"""
+import asyncio
+import time
+from typing import Optional
+
+from core.config import settings
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.5, threshold: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - started - self.interval
+            if lag > self.max_lag:
+                self.max_lag = lag
+            if lag > self.threshold:
+                self.stalls += 1
+                print(f" Event loop stalled for {lag * 1000:.0f} ms "
+                      f"(threshold {self.threshold * 1000:.0f} ms) at {time.strftime('%H:%M:%S')}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": round(self.threshold * 1000),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "stalls": self.stalls,
+        }
+
+
+loop_monitor = LoopLagMonitor(
+    interval=settings.LOOP_LAG_INTERVAL_SECONDS,
+    threshold=settings.LOOP_LAG_THRESHOLD_MS / 1000
+)
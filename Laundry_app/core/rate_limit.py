@@ -0,0 +1,200 @@
+# core/rate_limit.py
+"""
+Rate limiting and load shedding in front of the routers.
+
+Each request is checked against the limit of the longest matching router
+prefix (as registered in main.py):
+
+- a per-client token bucket, keyed by the user id from the bearer token or,
+  for anonymous requests, by the client IP (see client_key for proxies);
+- an optional per-route bucket shared by all clients of that prefix, which
+  caps bots that spread over many addresses.
+
+A request that finds a bucket empty is answered 429 with Retry-After. Separately, at
+most max_in_flight requests run at once; past that new requests get 503
+right away instead of queueing for a database connection.
+
+Buckets live in a bounded in-memory store (least recently used clients are
+dropped). Anything with the same take() method can be passed as the store,
+e.g. one shared by several workers.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from jose import JWTError, jwt
+
+from core.config import settings
+from core.responses import dumps
+
+
+@dataclass(frozen=True)
+class RouteLimit:
+    """Requests per minute; burst defaults to the per-minute rate"""
+    client_per_minute: Optional[int] = None
+    client_burst: Optional[int] = None
+    route_per_minute: Optional[int] = None
+    route_burst: Optional[int] = None
+
+
+class MemoryBucketStore:
+    """Token buckets in process memory, at most max_keys of them"""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, per_minute: int, burst: int) -> float:
+        """Take one token; 0 when allowed, else seconds until one is available"""
+        rate = per_minute / 60.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RateLimiter:
+    """Limits per router prefix plus the in-flight cap, with counters for /health"""
+
+    def __init__(
+        self,
+        limits: Dict[str, RouteLimit],
+        default: Optional[RouteLimit] = None,
+        max_in_flight: int = 0,
+        exempt: Iterable[str] = (),
+        store=None,
+        trusted_proxies: int = 0
+    ):
+        # Longest prefix first, so "/api/v1/orders/public" wins over "/api/v1/orders"
+        self.limits = sorted(limits.items(), key=lambda item: len(item[0]), reverse=True)
+        self.default = default
+        self.max_in_flight = max_in_flight
+        self.exempt = tuple(exempt)
+        self.store = store if store is not None else MemoryBucketStore(settings.RATE_LIMIT_MAX_KEYS)
+        self.trusted_proxies = trusted_proxies
+        self.in_flight = 0
+        self.limited = 0
+        self.shed = 0
+
+    def match(self, path: str) -> Tuple[str, Optional[RouteLimit]]:
+        for prefix, limit in self.limits:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return prefix, limit
+        return "", self.default
+
+    def check(self, scope) -> float:
+        """0 when the request may run, else seconds until the client may retry"""
+        prefix, limit = self.match(scope["path"])
+        if limit is None:
+            return 0.0
+        if limit.client_per_minute:
+            wait = self.store.take(
+                f"{prefix}|{self.client_key(scope)}",
+                limit.client_per_minute,
+                limit.client_burst or limit.client_per_minute
+            )
+            if wait:
+                return wait
+        if limit.route_per_minute:
+            return self.store.take(
+                f"{prefix}|route",
+                limit.route_per_minute,
+                limit.route_burst or limit.route_per_minute
+            )
+        return 0.0
+
+    def client_key(self, scope) -> str:
+        """
+        user:<id> from a valid bearer token, else ip:<address>.
+
+        Behind trusted_proxies reverse proxies the address is the
+        X-Forwarded-For entry appended by the outermost one (that many from
+        the right): anything left of it was sent by the client and can be
+        forged.
+        """
+        headers = dict(scope["headers"])
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        if authorization[:7].lower() == "bearer ":
+            try:
+                payload = jwt.decode(authorization[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+                if payload.get("sub"):
+                    return f"user:{payload['sub']}"
+            except JWTError:
+                pass
+        if self.trusted_proxies and b"x-forwarded-for" in headers:
+            hops = [hop.strip() for hop in headers[b"x-forwarded-for"].decode("latin-1").split(",") if hop.strip()]
+            if hops:
+                return "ip:" + hops[max(len(hops) - self.trusted_proxies, 0)]
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "rate_limited": self.limited,
+            "shed": self.shed,
+            "tracked_clients": len(self.store) if hasattr(self.store, "__len__") else None,
+        }
+
+
+class RateLimitMiddleware:
+    """ASGI middleware running every HTTP request through a RateLimiter"""
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.limiter
+        if scope["type"] != "http" or scope["path"].startswith(limiter.exempt):
+            await self.app(scope, receive, send)
+            return
+
+        wait = limiter.check(scope)
+        if wait:
+            limiter.limited += 1
+            await _reject(send, 429, "Too many requests", wait)
+            return
+
+        if limiter.max_in_flight and limiter.in_flight >= limiter.max_in_flight:
+            # Counted only (see /health): printing here would add work exactly when overloaded
+            limiter.shed += 1
+            await _reject(send, 503, "Server busy, retry shortly", 1)
+            return
+
+        limiter.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.in_flight -= 1
+
+
+async def _reject(send, status_code: int, detail: str, retry_after: float):
+    body = dumps({"detail": detail})
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
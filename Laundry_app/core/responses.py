@@ -0,0 +1,44 @@
+# core/responses.py
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional - fall back to the stdlib encoder
+    orjson = None
+
+
+def _json_default(obj: Any):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode plain dicts/lists (with datetimes and enums) straight to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_json_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    ORJSONResponse-style response for trusted, already-shaped data.
+
+    Returning it from a route skips FastAPI's response_model validation and
+    jsonable_encoder pass, so dicts built from ORM rows are encoded only once.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -28,8 +28,17 @@ def create_access_token(subject: Union[str, Any], expires_delta: timedelta = Non
 
 # def get_password_hash(password: str) -> str:
 #     return pwd_context.hash(password)
+# Password of guest accounts created from public orders. It is not a hash,
+# so nothing ever verifies against it, and creating a guest hashes nothing.
+UNUSABLE_PASSWORD = "!guest"
+
+def is_usable_password(hashed_password: Optional[str]) -> bool:
+    return bool(hashed_password) and not hashed_password.startswith("!")
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
+    if not is_usable_password(hashed_password):
+        return False
     try:
         print(f"Verifying password: {plain_password} against hash: {hashed_password}")
         result = pwd_context.verify(plain_password, hashed_password)
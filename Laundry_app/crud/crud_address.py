@@ -85,7 +85,6 @@ class CRUDAddress:
             )
             db.add(db_address)
             db.commit()
-            db.refresh(db_address)
             return db_address
         except Exception as e:
             db.rollback()
@@ -108,7 +107,6 @@ class CRUDAddress:
         
         db.add(address)
         db.commit()
-        db.refresh(address)
         return address
     
     def remove_default_from_others(self, db: Session, user_id: int):
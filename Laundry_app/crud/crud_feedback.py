@@ -22,7 +22,6 @@ class FeedbackCRUD:
         feedback = Feedback(**feedback_data)
         db.add(feedback)
         db.commit()
-        db.refresh(feedback)
         return feedback
     
     def create_or_update_feedback(self, db: Session, feedback_data: dict):
@@ -38,7 +37,6 @@ class FeedbackCRUD:
                     if hasattr(existing, field) and field != 'feedback_id':  # Don't update ID
                         setattr(existing, field, value)
                 db.commit()
-                db.refresh(existing)
                 return existing
             else:
                 # Create new feedback
@@ -52,7 +50,6 @@ class FeedbackCRUD:
                 feedback = Feedback(**feedback_data)
                 db.add(feedback)
                 db.commit()
-                db.refresh(feedback)
                 return feedback
                 
         except Exception as e:
@@ -82,7 +79,6 @@ class FeedbackCRUD:
                 setattr(feedback, field, value)
         
         db.commit()
-        db.refresh(feedback)
         return feedback
     
     def delete_feedback(self, db: Session, feedback_id: int):
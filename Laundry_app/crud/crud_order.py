@@ -10,19 +10,15 @@ class CRUDOrder:
         return db.get(Order, order_id)
     
     def get_by_user(self, db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Order]:
-        """Get all orders for a user with relationships"""
-        statement = select(Order).where(Order.user_id == user_id)
-        orders = db.exec(statement).all()
-        # Access relationships
-        for order in orders:
-            print(f"Order: {order.Token_no}")
-            if order.user:  
-                print(f"User: {order.user.name}")
-            if order.address:  
-                print(f"Address: {order.address.address_line1}")
-            print(f"Items count: {len(order.items)}")
-        
-        return orders
+        """Get a page of a user's orders, newest first"""
+        statement = (
+            select(Order)
+            .where(Order.user_id == user_id)
+            .order_by(Order.order_id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return db.exec(statement).all()
     
     def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[Order]:
         statement = select(Order).offset(skip).limit(limit)
@@ -54,7 +50,6 @@ class CRUDOrder:
         db_order = Order(**order_data)
         db.add(db_order)
         db.commit()
-        db.refresh(db_order)
         
         print(f"Order created with status: {db_order.status} by {current_user.role if current_user else 'public'}")
         return db_order
@@ -62,12 +57,12 @@ class CRUDOrder:
     def update(self, db: Session, order_id: int, order_in: OrderUpdate) -> Optional[Order]:
         order = self.get_by_id(db, order_id)
         if order:
-            update_data = order_in.dict(exclude_unset=True)
+            # version is managed by the mapper, never copied from input
+            update_data = order_in.dict(exclude_unset=True, exclude={"version"})
             for field, value in update_data.items():
                 setattr(order, field, value)
             db.add(order)
             db.commit()
-            db.refresh(order)
         return order
     
     def delete(self, db: Session, order_id: int) -> bool:
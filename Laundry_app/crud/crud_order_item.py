@@ -20,7 +20,6 @@ class CRUDOrderItem:
         
         db.add(db_item)
         db.commit()
-        db.refresh(db_item)
         return db_item
     
     def create_bulk(self, db: Session, items: List[OrderItemCreate], order_id: int) -> List[OrderItem]:
@@ -30,8 +29,6 @@ class CRUDOrderItem:
             db.add(db_item)
             db_items.append(db_item)
         db.commit()
-        for item in db_items:
-            db.refresh(item)
         return db_items
     
     def update(self, db: Session, order_item_id: int, order_item_in: OrderItemUpdate) -> Optional[OrderItem]:
@@ -42,7 +39,6 @@ class CRUDOrderItem:
                 setattr(item, field, value)
             db.add(item)
             db.commit()
-            db.refresh(item)
         return item
     
     def delete(self, db: Session, order_item_id: int) -> bool:
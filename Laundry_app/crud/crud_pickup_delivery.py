@@ -24,7 +24,6 @@ class CRUDPickupDelivery:
         db_pd = PickupDelivery(**pd_in.dict())
         db.add(db_pd)
         db.commit()
-        db.refresh(db_pd)
         return db_pd
     
     # def update(self, db: Session, pd_id: int, pd_in: PickupDeliveryUpdate) -> Optional[PickupDelivery]:
@@ -61,7 +60,6 @@ class CRUDPickupDelivery:
             pd.pickup_update_at = datetime.utcnow()  
             db.add(pd)
             db.commit()
-            db.refresh(pd)
         return pd
 
     def mark_picked_up(self, db: Session, pickup_id: int) -> Optional[PickupDelivery]:
@@ -74,7 +72,6 @@ class CRUDPickupDelivery:
             pickup.pickup_update_at = datetime.utcnow()
             db.add(pickup)
             db.commit()
-            db.refresh(pickup)
         return pickup
 
     def mark_delivered(self, db: Session, delivery_id: int) -> Optional[PickupDelivery]:
@@ -87,7 +84,6 @@ class CRUDPickupDelivery:
             delivery.pickup_update_at = datetime.utcnow()
             db.add(delivery)
             db.commit()
-            db.refresh(delivery)
         return delivery
 
     def delete(self, db: Session, pd_id: int) -> bool:
@@ -42,33 +42,29 @@ class ServiceCRUD:
         service = Service(**service_data)
         db.add(service)
         db.commit()
-        db.refresh(service)
         return service
     
     @staticmethod
     def create_service_with_categories_and_products(db: Session, service_data: dict, categories_data: list):
-        # Create service
+        # Flushes hand out the ids the children need; one commit at the end
         service = Service(**service_data)
         db.add(service)
-        db.commit()
-        db.refresh(service)
+        db.flush()
         
-        # Create categories and products
+        categories = []
         for category_data in categories_data:
             category_products = category_data.pop('products', [])
-            
-            # Create category
             category = ServiceCategory(**category_data, service_id=service.id)
-            db.add(category)
-            db.commit()
-            db.refresh(category)
-            
-            # Create products for this category
-            for product_data in category_products:
-                product = ServiceProduct(**product_data, category_id=category.id)
-                db.add(product)
-            
-            db.commit()
+            categories.append((category, category_products))
+        db.add_all([category for category, _ in categories])
+        db.flush()
+        
+        db.add_all([
+            ServiceProduct(**product_data, category_id=category.id)
+            for category, category_products in categories
+            for product_data in category_products
+        ])
+        db.commit()
         
         return service
     
@@ -83,37 +79,51 @@ class ServiceCRUD:
         
         db.add(service)
         db.commit()
-        db.refresh(service)
         return service
     
     @staticmethod
     def delete_service(db: Session, service_id: int) -> bool:
         """Delete a service and its related categories and products"""
+        return bool(ServiceCRUD.delete_services(db, [service_id]))
+    
+    @staticmethod
+    def delete_services(db: Session, service_ids: List[int]) -> List[int]:
+        """Delete services with their categories and products in one transaction.
+        
+        Runs a fixed number of set-based statements regardless of how many
+        categories/products the services hold. Returns the ids that existed.
+        """
+        if not service_ids:
+            return []
+        
         try:
-            # First get the service
-            service = db.query(Service).filter(Service.id == service_id).first()
-            if not service:
-                return False
+            existing_ids = db.execute(
+                select(Service.id).where(Service.id.in_(service_ids))
+            ).scalars().all()
+            if not existing_ids:
+                return []
+            
+            category_ids = select(ServiceCategory.id).where(ServiceCategory.service_id.in_(existing_ids))
             
-            # Delete all products in this service's categories
-            categories = db.query(ServiceCategory).filter(ServiceCategory.service_id == service_id).all()
-            for category in categories:
-                # Delete all products in this category
-                db.query(ServiceProduct).filter(ServiceProduct.category_id == category.id).delete()
+            db.query(ServiceProduct).filter(
+                ServiceProduct.category_id.in_(category_ids)
+            ).delete(synchronize_session=False)
             
-            # Delete all categories of this service
-            db.query(ServiceCategory).filter(ServiceCategory.service_id == service_id).delete()
+            db.query(ServiceCategory).filter(
+                ServiceCategory.service_id.in_(existing_ids)
+            ).delete(synchronize_session=False)
             
-            # Finally delete the service
-            db.query(Service).filter(Service.id == service_id).delete()
+            db.query(Service).filter(
+                Service.id.in_(existing_ids)
+            ).delete(synchronize_session=False)
             
             db.commit()
-            return True
+            return list(existing_ids)
             
         except Exception as e:
             db.rollback()
-            print(f"Error deleting service: {e}")
-            return False
+            print(f"Error deleting services: {e}")
+            raise
     
     @staticmethod
     def get_service_stats(db: Session, service_id: int):
@@ -161,7 +171,6 @@ class ServiceCategoryCRUD:
         category = ServiceCategory(**category_data, service_id=service_id)
         db.add(category)
         db.commit()
-        db.refresh(category)
         return category
     
     @staticmethod
@@ -175,18 +184,48 @@ class ServiceCategoryCRUD:
         
         db.add(category)
         db.commit()
-        db.refresh(category)
         return category
     
     @staticmethod
     def delete_category(db: Session, category_id: int):
-        category = ServiceCategoryCRUD.get_category(db, category_id)
-        if not category:
-            return False
+        return bool(ServiceCategoryCRUD.delete_categories(db, [category_id]))
+    
+    @staticmethod
+    def delete_categories(db: Session, category_ids: List[int]) -> List[int]:
+        """Delete categories and their products with set-based statements. Returns the ids that existed."""
+        if not category_ids:
+            return []
         
-        db.delete(category)
-        db.commit()
-        return True
+        try:
+            existing_ids = db.execute(
+                select(ServiceCategory.id).where(ServiceCategory.id.in_(category_ids))
+            ).scalars().all()
+            if not existing_ids:
+                return []
+            
+            db.query(ServiceProduct).filter(
+                ServiceProduct.category_id.in_(existing_ids)
+            ).delete(synchronize_session=False)
+            
+            db.query(ServiceCategory).filter(
+                ServiceCategory.id.in_(existing_ids)
+            ).delete(synchronize_session=False)
+            
+            db.commit()
+            return list(existing_ids)
+            
+        except Exception as e:
+            db.rollback()
+            print(f"Error deleting categories: {e}")
+            raise
+    
+    @staticmethod
+    def delete_all_categories_in_service(db: Session, service_id: int) -> bool:
+        """Delete every category (and its products) of a service"""
+        category_ids = db.execute(
+            select(ServiceCategory.id).where(ServiceCategory.service_id == service_id)
+        ).scalars().all()
+        return bool(ServiceCategoryCRUD.delete_categories(db, category_ids))
 
 
 class ServiceProductCRUD:
@@ -234,7 +273,6 @@ class ServiceProductCRUD:
         product = ServiceProduct(**product_data)
         db.add(product)
         db.commit()
-        db.refresh(product)
         return product
     
     @staticmethod
@@ -248,7 +286,6 @@ class ServiceProductCRUD:
         
         db.add(product)
         db.commit()
-        db.refresh(product)
         return product
     
     @staticmethod
@@ -260,15 +297,33 @@ class ServiceProductCRUD:
         product.price = new_price
         db.add(product)
         db.commit()
-        db.refresh(product)
         return product
     
     @staticmethod
     def delete_product(db: Session, product_id: int):
-        product = ServiceProductCRUD.get_product(db, product_id)
-        if not product:
-            return False
+        return bool(ServiceProductCRUD.delete_products(db, [product_id]))
+    
+    @staticmethod
+    def delete_products(db: Session, product_ids: List[int]) -> List[int]:
+        """Delete products with a single DELETE ... WHERE id IN. Returns the ids that existed."""
+        if not product_ids:
+            return []
         
-        db.delete(product)
-        db.commit()
-        return True
\ No newline at end of file
+        try:
+            existing_ids = db.execute(
+                select(ServiceProduct.id).where(ServiceProduct.id.in_(product_ids))
+            ).scalars().all()
+            if not existing_ids:
+                return []
+            
+            db.query(ServiceProduct).filter(
+                ServiceProduct.id.in_(existing_ids)
+            ).delete(synchronize_session=False)
+            
+            db.commit()
+            return list(existing_ids)
+            
+        except Exception as e:
+            db.rollback()
+            print(f"Error deleting products: {e}")
+            raise
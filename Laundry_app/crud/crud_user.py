@@ -82,7 +82,6 @@ class CRUDUser:
         )
         db.add(db_user)
         db.commit()
-        db.refresh(db_user)
         return db_user
 
     def update(self, db: Session, user_id: int, update_data: dict) -> Optional[User]:
@@ -104,7 +103,6 @@ class CRUDUser:
             
             db.add(user)
             db.commit()
-            db.refresh(user)
             return user
             
         except Exception as e:
@@ -160,7 +158,6 @@ class CRUDUser:
         if user:
             user.verified_otp = otp
             db.commit()
-            db.refresh(user)
         return user
 
     def verify_otp(self, db: Session, mobile_no: str, otp: str) -> bool:
@@ -448,7 +448,7 @@ from db.session import get_db
 from models.user import User
 from Laundry_app.crud.crud_user import crud_user
 from schemas.user import UserResponse
-from core.security import verify_token
+from core.security import UNUSABLE_PASSWORD, verify_token
 from core.config import settings
 import logging
 from typing import Optional
@@ -628,39 +628,42 @@ def get_current_user_optional(
 
 from datetime import datetime  
 
-def get_or_create_guest_user(db: Session, name: str, mobile_no: str, email: str = None) -> User:
+def get_or_create_guest_user(db: Session, name: str, mobile_no: str, email: str = None, commit: bool = True) -> User:
     """
-    Find existing user by mobile AND ALWAYS UPDATE NAME
+    Find existing user by mobile, or create a guest user.
+
+    The stored name is only written when it differs, so a repeat customer
+    costs one indexed read and no write. With commit=False the changes are
+    only flushed so the caller can keep them in its own transaction.
     """
     try:
         clean_mobile = ''.join(filter(str.isdigit, mobile_no))
+        clean_name = name.strip()
         
         existing_user = db.query(User).filter(User.mobile_no == clean_mobile).first()
         
         if existing_user:
             print(f" Found existing user: {existing_user.name}")
             
-            print(f" UPDATING user name from '{existing_user.name}' to '{name}'")
-            existing_user.name = name.strip()
-            existing_user.updated_at = datetime.utcnow()
-            db.commit()
-            db.refresh(existing_user)
-            print(f" User name updated to: {existing_user.name}")
+            if existing_user.name != clean_name:
+                print(f" UPDATING user name from '{existing_user.name}' to '{clean_name}'")
+                existing_user.name = clean_name
+                existing_user.updated_at = datetime.utcnow()
+                if commit:
+                    db.commit()
+                else:
+                    db.flush()
             
             return existing_user
         
         if not email:
             email = f"guest_{clean_mobile}@laundry.com"
         
-        from core.security import get_password_hash
-        
-        password_hash = get_password_hash("guest_default_password")
-        
         new_user = User(
-            name=name.strip(),
+            name=clean_name,
             email=email,
             mobile_no=clean_mobile,
-            password=password_hash,  
+            password=UNUSABLE_PASSWORD,
             role="customer",
             status="active",
             image_url="/static/images/default-avatar.jpg",  
@@ -669,8 +672,10 @@ def get_or_create_guest_user(db: Session, name: str, mobile_no: str, email: str
         )
         
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        if commit:
+            db.commit()
+        else:
+            db.flush()
         
         print(f" Created new guest user: {new_user.name} (ID: {new_user.user_id})")
         return new_user
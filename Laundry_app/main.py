@@ -1,5 +1,6 @@
 import os
 import sys
+import asyncio
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
@@ -8,8 +9,17 @@ from contextlib import asynccontextmanager
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 
-from db.session import create_db_and_tables
+from db.session import SessionLocal, create_db_and_tables
+from services.token_lookup_service import backfill_token_index
+from services.customer_search_service import backfill_customer_search_index
+from services.order_totals_service import repair_order_totals
+from services.order_change_service import ensure_change_counter
+from models.order_history import OrderHistory, OrderItemHistory
 from core.config import settings
+from core.loop_monitor import loop_monitor
+from core.rate_limit import RateLimiter, RateLimitMiddleware, RouteLimit
+from services.order_history_service import order_history_job
+from services.order_tracking_service import tracking_cache
 from api.auth import router as auth_router
 # from api.staff_auth import router as staff_auth_router
 from api.user import router as user_router
@@ -29,12 +39,28 @@ from api.pricing import router as pricing_router
 from api.order_archive import router as order_archive_router
 from api.service import router as service_router
 from api.feedback import router as feedback_router
+from api.events import router as events_router
+from api.tracking import router as tracking_router
+from core.event_hub import event_hub
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Create database tables on startup
     create_db_and_tables()
+    with SessionLocal() as db:
+        backfill_token_index(db)
+        backfill_customer_search_index(db)
+        ensure_change_counter(db)
+        repair_order_totals(db, only_missing=True)
+        repair_order_totals(db, only_missing=True, order_model=OrderHistory, item_model=OrderItemHistory)
+    event_hub.bind(asyncio.get_running_loop())
+    if settings.LOOP_LAG_MONITOR_ENABLED:
+        loop_monitor.start()
+    if settings.HISTORY_JOB_ENABLED:
+        order_history_job.start()
     yield
+    await order_history_job.stop()
+    await loop_monitor.stop()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -42,6 +68,31 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Rate limits per router prefix (see the include_router calls below); the
+# longest matching prefix applies, everything else gets the default.
+# Event streams are long-lived and exempt from both the limits and the
+# in-flight count.
+rate_limiter = RateLimiter(
+    limits={
+        f"{settings.API_V1_STR}/login": RouteLimit(client_per_minute=10, client_burst=5, route_per_minute=600),
+        f"{settings.API_V1_STR}/verify-otp": RouteLimit(client_per_minute=5, route_per_minute=300),
+        f"{settings.API_V1_STR}/resend-otp": RouteLimit(client_per_minute=3, route_per_minute=120),
+        f"{settings.API_V1_STR}/token/refresh": RouteLimit(client_per_minute=20, client_burst=5),
+        f"{settings.API_V1_STR}/token/revoke": RouteLimit(client_per_minute=20, client_burst=5),
+        f"{settings.API_V1_STR}/orders/public": RouteLimit(client_per_minute=10, client_burst=5, route_per_minute=600),
+        f"{settings.API_V1_STR}/orders": RouteLimit(client_per_minute=120, client_burst=30),
+        f"{settings.API_V1_STR}/track": RouteLimit(client_per_minute=60, client_burst=20),
+    },
+    default=RouteLimit(client_per_minute=settings.RATE_LIMIT_PER_MINUTE),
+    max_in_flight=settings.MAX_IN_FLIGHT_REQUESTS,
+    exempt=("/health", f"{settings.API_V1_STR}/events"),
+    trusted_proxies=settings.RATE_LIMIT_TRUSTED_PROXIES
+)
+# Added before CORS so CORS stays outermost: preflights are not counted and
+# 429/503 responses still carry the CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
 # CORS settings
 app.add_middleware(
     CORSMiddleware,
@@ -81,6 +132,8 @@ app.include_router(service_router, prefix="/api/v1", tags=["services"])
 app.include_router(pricing_router, prefix=f"{settings.API_V1_STR}/pricing", tags=["pricing"])
 app.include_router(order_archive_router, prefix=f"{settings.API_V1_STR}", tags=["order-archive"])
 app.include_router(feedback_router, prefix="/api/v1", tags=["feedback"])
+app.include_router(events_router, prefix=f"{settings.API_V1_STR}/events", tags=["events"])
+app.include_router(tracking_router, prefix=settings.API_V1_STR, tags=["tracking"])
 
 
 @app.get("/")
@@ -89,7 +142,13 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "event_loop": loop_monitor.stats(),
+        "history_job": order_history_job.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "tracking_cache": tracking_cache.stats(),
+    }
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -0,0 +1,57 @@
+# manage.py
+"""
+One-off maintenance commands, run by hand (not at app startup):
+
+    python manage.py migrate-archive-payloads [--batch-size N]
+    python manage.py repair-order-totals [--history]
+"""
+import argparse
+import os
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Same import roots as the app: its own modules and the Laundry_app package
+sys.path.extend([APP_DIR, os.path.dirname(APP_DIR)])
+
+from db.session import SessionLocal
+import main  # noqa: F401  registers every model and session listener
+from models.order_history import OrderHistory, OrderItemHistory
+from services.archive_payload_service import MIGRATION_BATCH_SIZE, migrate_archive_payloads
+from services.order_totals_service import repair_order_totals
+
+
+def migrate_archive_payloads_command(args):
+    """Convert archives still stored as JSON columns to compressed payloads"""
+    with SessionLocal() as db:
+        report = migrate_archive_payloads(db, batch_size=args.batch_size)
+    if not report["converted"]:
+        print(" No archives left to convert")
+
+
+def repair_order_totals_command(args):
+    """Recompute the stored totals of every order (the history job only checks changed ones)"""
+    with SessionLocal() as db:
+        if args.history:
+            repaired = repair_order_totals(db, order_model=OrderHistory, item_model=OrderItemHistory)
+        else:
+            repaired = repair_order_totals(db)
+    print(f" Repaired totals of {repaired} orders")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Laundry app maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate-archive-payloads", help=migrate_archive_payloads_command.__doc__)
+    migrate.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE)
+    migrate.set_defaults(handler=migrate_archive_payloads_command)
+
+    totals = commands.add_parser("repair-order-totals", help=repair_order_totals_command.__doc__)
+    totals.add_argument("--history", action="store_true", help="repair order_history instead of orders")
+    totals.set_defaults(handler=repair_order_totals_command)
+    return parser
+
+
+if __name__ == "__main__":
+    arguments = build_parser().parse_args()
+    arguments.handler(arguments)
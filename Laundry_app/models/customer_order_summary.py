@@ -0,0 +1,19 @@
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import ForeignKey, Integer, JSON
+from datetime import datetime
+from typing import Optional
+
+
+class CustomerOrderSummary(SQLModel, table=True):
+    """Per-customer order totals, refreshed whenever that customer's orders change"""
+    __tablename__ = "customer_order_summaries"
+
+    user_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    )
+    order_count: int = Field(default=0)
+    lifetime_spend: float = Field(default=0.0)
+    last_order_id: Optional[int] = Field(default=None)
+    last_order_at: Optional[datetime] = Field(default=None)
+    status_counts: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,14 @@
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import ForeignKey, Integer
+
+
+class CustomerSearchToken(SQLModel, table=True):
+    """Search terms (name words, mobile digits, email) for staff customer lookup"""
+    __tablename__ = "customer_search_tokens"
+
+    # (token, user_id) primary key doubles as the index for `token LIKE 'abc%'`
+    token: str = Field(primary_key=True, max_length=100)
+    user_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True, index=True)
+    )
+    weight: int = Field(default=1)
@@ -0,0 +1,20 @@
+from sqlmodel import SQLModel, Field, Column
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import LargeBinary
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """Idempotency-Key → stored response for retried create requests"""
+    __tablename__ = "idempotency_keys"
+
+    # scope separates endpoints/callers ("orders:user:12", "orders:public")
+    scope: str = Field(primary_key=True, max_length=64)
+    idempotency_key: str = Field(primary_key=True, max_length=128)
+    request_hash: str = Field(max_length=64)
+    status: str = Field(default="pending", max_length=10)  # "pending" or "done"
+    status_code: Optional[int] = Field(default=None)
+    # zlib-compressed JSON body
+    response: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary(2**24 - 1), nullable=True))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
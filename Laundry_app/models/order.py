@@ -56,6 +56,7 @@ from sqlmodel import SQLModel, Field, Column, Relationship
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
+from sqlalchemy import Integer
 from sqlalchemy.dialects.mysql import ENUM as MySQLEnum
 
 class OrderStatus(str, Enum):
@@ -75,8 +76,14 @@ class ServiceType(str, Enum):
     WASH_ONLY = "wash_only"
     IRON_ONLY = "iron_only"
 
+# Row version for optimistic concurrency: ORM updates run
+# "UPDATE ... WHERE version = <loaded>" and bump it (StaleDataError when
+# another writer got there first); Core updates bump it themselves.
+_order_version = Column("version", Integer, nullable=False, default=1, server_default="1")
+
 class Order(SQLModel, table=True):
     __tablename__ = "orders"
+    __mapper_args__ = {"version_id_col": _order_version}
     
     order_id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.user_id")
@@ -98,6 +105,12 @@ class Order(SQLModel, table=True):
     created_by: Optional[str] = Field(default=None, max_length=150)
     updated_by: Optional[str] = Field(default=None, max_length=150)
 
+    # Kept in step with order_items on write (services/order_totals_service.py)
+    total_amount: Optional[float] = Field(default=0.0)
+    item_count: Optional[int] = Field(default=0)
+    total_quantity: Optional[int] = Field(default=0)
+    version: int = Field(default=1, sa_column=_order_version)
+
    
     user: Optional["User"] = Relationship(back_populates="orders")  
     address: Optional["Address"] = Relationship(back_populates="orders")  
@@ -1,7 +1,7 @@
 from sqlmodel import SQLModel, Field, Column
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import JSON, Text
+from sqlalchemy import JSON, LargeBinary, Text
 from enum import Enum
 
 class DeletionReason(str, Enum):
@@ -17,8 +17,12 @@ class OrderArchive(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     original_order_id: int = Field(index=True)
     user_id: int = Field(index=True)
-    order_data: dict = Field(sa_column=Column(JSON))  
-    order_items_data: dict = Field(sa_column=Column(JSON))  
+    # Legacy JSON snapshots; new archives store `payload` instead
+    # (services/archive_payload_service.py)
+    order_data: Optional[dict] = Field(default=None, sa_column=Column(JSON))  
+    order_items_data: Optional[dict] = Field(default=None, sa_column=Column(JSON))  
+    payload: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary(length=2**24 - 1)))
+    payload_version: Optional[int] = Field(default=None)
     deletion_reason: DeletionReason
     deleted_by: int = Field(index=True)  
     deleted_by_role: str  
@@ -32,5 +36,5 @@ class OrderItemsArchive(SQLModel, table=True):
     original_item_id: int = Field(index=True)
     original_order_id: int = Field(index=True)
     archive_order_id: int = Field(index=True)  
-    item_data: dict = Field(sa_column=Column(JSON))  
+    item_data: Optional[dict] = Field(default=None, sa_column=Column(JSON))  
     deleted_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
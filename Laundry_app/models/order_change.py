@@ -0,0 +1,24 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class OrderChange(SQLModel, table=True):
+    """Append-only change log of orders, read by the staff delta-sync feed"""
+    __tablename__ = "order_changes"
+
+    # change_id is the client's watermark: assigned from OrderChangeCounter
+    # at commit (so in commit order, without gaps) and the primary key, so
+    # `change_id > since` is an index range scan
+    change_id: Optional[int] = Field(default=None, primary_key=True)
+    order_id: int = Field(index=True)
+    op: str = Field(max_length=10)  # "upsert" or "delete"
+    changed_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class OrderChangeCounter(SQLModel, table=True):
+    """Single row holding the last change_id handed out"""
+    __tablename__ = "order_change_counter"
+
+    id: int = Field(default=1, primary_key=True)
+    last_change_id: int = Field(default=0)
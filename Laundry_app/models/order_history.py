@@ -0,0 +1,55 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class OrderHistory(SQLModel, table=True):
+    """Finished (completed or cancelled) orders moved out of `orders` by the history job"""
+    __tablename__ = "order_history"
+
+    # history_month (YYYYMM of created_at) is part of the key so the table
+    # can be RANGE partitioned on it (see "Laundry db.sql")
+    order_id: int = Field(primary_key=True)
+    history_month: int = Field(primary_key=True)
+    user_id: int = Field(index=True)
+    address_id: int
+    Token_no: str = Field(max_length=50, index=True)
+    service: str
+    status: str
+
+    picked_at: Optional[datetime] = Field(default=None)
+    delivered_at: Optional[datetime] = Field(default=None)
+    cancelled_at: Optional[datetime] = Field(default=None)
+
+    picked_by: Optional[str] = Field(default=None, max_length=150)
+    delivered_by: Optional[str] = Field(default=None, max_length=150)
+    cancelled_by: Optional[str] = Field(default=None, max_length=150)
+    created_at: datetime = Field(index=True)
+    updated_at: datetime
+    created_by: Optional[str] = Field(default=None, max_length=150)
+    updated_by: Optional[str] = Field(default=None, max_length=150)
+    total_amount: Optional[float] = Field(default=0.0)
+    item_count: Optional[int] = Field(default=0)
+    total_quantity: Optional[int] = Field(default=0)
+    version: int = Field(default=1)
+    moved_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class OrderItemHistory(SQLModel, table=True):
+    """Items of orders in order_history"""
+    __tablename__ = "order_item_history"
+
+    order_item_id: int = Field(primary_key=True)
+    history_month: int = Field(primary_key=True)
+    order_id: int = Field(index=True)
+    category_name: str = Field(max_length=100)
+    product_name: str = Field(max_length=100)
+    quantity: int = Field(default=1)
+    service: str = Field(max_length=50)
+    status: str = Field(max_length=50)
+    unit_price: float = Field(default=0.0)
+    created_at: datetime
+    updated_at: datetime
+    created_by: Optional[str] = Field(default=None, max_length=150)
+    updated_by: Optional[str] = Field(default=None, max_length=150)
+    version: int = Field(default=1)
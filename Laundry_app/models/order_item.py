@@ -2,7 +2,7 @@ from sqlmodel import SQLModel, Field, Column, Relationship
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import UniqueConstraint, String
+from sqlalchemy import UniqueConstraint, String, Integer
 
 class OrderItemStatus(str, Enum):
     PENDING = "pending"
@@ -119,8 +119,12 @@ class ProductName(str, Enum):
 #     )
 
 
+# Row version for optimistic concurrency (see models/order.py)
+_item_version = Column("version", Integer, nullable=False, default=1, server_default="1")
+
 class OrderItem(SQLModel, table=True):
     __tablename__ = "order_items"
+    __mapper_args__ = {"version_id_col": _item_version}
     
     order_item_id: Optional[int] = Field(default=None, primary_key=True)
     order_id: int = Field(foreign_key="orders.order_id")
@@ -134,6 +138,7 @@ class OrderItem(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     created_by: Optional[str] = Field(default=None, max_length=150)
     updated_by: Optional[str] = Field(default=None, max_length=150)
+    version: int = Field(default=1, sa_column=_item_version)
     
     # ✅ FIXED: Removed cascade_delete
     order: Optional["Order"] = Relationship(back_populates="items")
\ No newline at end of file
@@ -0,0 +1,8 @@
+from sqlmodel import SQLModel, Field
+
+
+class OrderTokenCounter(SQLModel, table=True):
+    __tablename__ = "order_token_counters"
+
+    day: str = Field(primary_key=True, max_length=8)  # YYYYMMDD
+    last_value: int = Field(default=0)
@@ -0,0 +1,13 @@
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import ForeignKey, Integer
+
+
+class OrderTokenSuffix(SQLModel, table=True):
+    """Side index of Token_no suffixes for partial-token search"""
+    __tablename__ = "order_token_suffixes"
+
+    # (suffix, order_id) primary key doubles as the index for `suffix LIKE 'abc%'`
+    suffix: str = Field(primary_key=True, max_length=50)
+    order_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("orders.order_id", ondelete="CASCADE"), primary_key=True, index=True)
+    )
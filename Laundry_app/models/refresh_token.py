@@ -0,0 +1,18 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class RefreshToken(SQLModel, table=True):
+    """Rotating refresh tokens; only the SHA-256 of each token is stored"""
+    __tablename__ = "refresh_tokens"
+
+    token_id: Optional[int] = Field(default=None, primary_key=True)
+    token_hash: str = Field(max_length=64, unique=True, index=True)
+    user_id: int = Field(foreign_key="users.user_id", index=True)
+    # Every token rotated from the same login shares the family; reuse of a
+    # rotated token revokes the whole family
+    family_id: str = Field(max_length=32, index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+    revoked_at: Optional[datetime] = Field(default=None)
@@ -66,7 +66,7 @@ class User(SQLModel, table=True):
     user_id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(max_length=150)
     email: str = Field(max_length=255, unique=True, index=True)
-    mobile_no: Optional[str] = Field(default=None, max_length=20)
+    mobile_no: Optional[str] = Field(default=None, max_length=20, index=True)
     password: str = Field(max_length=255)
     role: str = Field(default="customer", max_length=50)
     image_url: Optional[str] = Field(default= None, max_length=500)     
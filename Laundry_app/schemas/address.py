@@ -81,6 +81,13 @@ class AddressResponse(AddressBase):
     user_id: int
     created_at: datetime
     updated_at: datetime
+
+    @validator("pincode", pre=True)
+    def pad_pincode(cls, v):
+        # Legacy rows lost leading zeros
+        if v is not None and len(str(v)) != 6:
+            return str(v).zfill(6)
+        return v
     # is_default: bool
 
     class Config:
@@ -217,6 +217,8 @@ class OrderUpdate(BaseModel):
     priority: Optional[str] = None
     special_instructions: Optional[str] = None
     
+    # Version the edit is based on (alternative to the If-Match header)
+    version: Optional[int] = None
     
     items: Optional[List[dict]] = None  
 
@@ -236,6 +238,7 @@ class OrderResponse(OrderBase):
     updated_at: datetime
     created_by: Optional[str] = None
     updated_by: Optional[str] = None
+    version: Optional[int] = None
     
     picked_at: Optional[datetime] = None
     delivered_at: Optional[datetime] = None
@@ -283,9 +286,25 @@ class OrderResponse(OrderBase):
 
 class UserOrdersResponse(BaseModel):
     orders: List[OrderResponse]
-    total_orders: int
+    total_orders: Optional[int] = None
     user_details: Optional[dict] = None
     
     class Config:
         from_attributes = True
 
+
+
+class OrderTransition(BaseModel):
+    order_id: Optional[int] = None
+    Token_no: Optional[str] = None
+    status: str
+
+
+class OrderTransitionsRequest(BaseModel):
+    transitions: List[OrderTransition]
+
+    @validator("transitions")
+    def validate_transitions_not_empty(cls, v):
+        if not v:
+            raise ValueError("At least one transition is required")
+        return v
@@ -1,5 +1,5 @@
-from typing import Optional, Dict, Any
-from pydantic import BaseModel
+from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, Field
 from datetime import datetime
 from models.order_archive import DeletionReason
 
@@ -29,4 +29,16 @@ class OrderArchiveSearch(BaseModel):
     deletion_reason: Optional[DeletionReason] = None
     deleted_by: Optional[int] = None
     date_from: Optional[datetime] = None
-    date_to: Optional[datetime] = None
\ No newline at end of file
+    date_to: Optional[datetime] = None
+
+class BulkArchiveRequest(BaseModel):
+    """Orders to archive: explicit ids and/or a created_at range and status"""
+    order_ids: Optional[List[int]] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    status: Optional[str] = None
+    deletion_reason: DeletionReason
+    notes: Optional[str] = None
+
+class BulkRestoreRequest(BaseModel):
+    archive_ids: List[int] = Field(..., min_length=1)
@@ -168,6 +168,7 @@ class BulkDeleteResponse(BaseModel):
     message: str
     deleted_count: int
     failed_count: int = 0
+    failed_ids: List[int] = []
 
 # ========== PRICE UPDATE SCHEMAS ==========
 
@@ -120,6 +120,9 @@ class Token(BaseModel):
     token_type: str
     # role: str = None
 
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
 class TokenData(BaseModel):
     user_id: Optional[int] = None
     email: Optional[str] = None
@@ -0,0 +1,187 @@
+# services/archive_payload_service.py
+"""
+Compact storage for archived orders.
+
+An archive is stored once, in OrderArchive.payload, as zlib-compressed JSON:
+
+    {"v": 1,
+     "order": {...order columns...},
+     "items": {"columns": ["order_item_id", "category_name", ...],
+               "rows": [[...], [...]]}}
+
+Items are column-oriented (names written once, order_id implied by the
+order) and there are no per-item order_items_archive rows. "v" selects the
+decoder, so the layout can change without rewriting old archives. Rows
+written before this format keep order_data / order_items_data until
+migrate_archive_payloads() converts them (`python manage.py
+migrate-archive-payloads`).
+"""
+import json
+import time
+import zlib
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import bindparam, delete, null, update
+from sqlmodel import Session, select
+
+from core.responses import dumps
+from models.order_archive import OrderArchive, OrderItemsArchive
+
+ARCHIVE_FORMAT_VERSION = 1
+COMPRESSION_LEVEL = 6
+MIGRATION_BATCH_SIZE = 500
+
+
+def encode_archive(order: Dict[str, Any], items: List[Dict[str, Any]]) -> bytes:
+    """Compressed, versioned payload for one order and its items"""
+    columns: List[str] = []
+    for item in items:
+        for key in item:
+            if key != "order_id" and key not in columns:
+                columns.append(key)
+
+    document = {
+        "v": ARCHIVE_FORMAT_VERSION,
+        "order": order,
+        "items": {
+            "columns": columns,
+            "rows": [[item.get(column) for column in columns] for item in items],
+        },
+    }
+    return zlib.compress(dumps(document), COMPRESSION_LEVEL)
+
+
+def _decode_v1(document: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    order = document["order"]
+    columns = document["items"]["columns"]
+    items = []
+    for row in document["items"]["rows"]:
+        item = dict(zip(columns, row))
+        item["order_id"] = order.get("order_id")
+        items.append(item)
+    return order, items
+
+
+_DECODERS = {1: _decode_v1}
+
+
+def decode_archive(payload: bytes) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Order dict and item dicts from a payload written by encode_archive"""
+    document = json.loads(zlib.decompress(payload))
+    decoder = _DECODERS.get(document.get("v"))
+    if decoder is None:
+        raise ValueError(f"Unsupported archive payload version: {document.get('v')}")
+    return decoder(document)
+
+
+def items_summary(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The order_items_data shape returned by the archive API"""
+    return {
+        "items": items,
+        "total_items": len(items),
+        "total_amount": round(sum((item.get("quantity") or 0) * (item.get("unit_price") or 0) for item in items), 2),
+    }
+
+
+def archive_contents(archive) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(order_data, order_items_data) for an archive row in either format"""
+    if archive.payload:
+        order, items = decode_archive(archive.payload)
+        return order, items_summary(items)
+    return archive.order_data or {}, archive.order_items_data or items_summary([])
+
+
+def archive_details(archive) -> Dict[str, Any]:
+    """An archive row as the archive API returns it, with its payload decoded"""
+    order_data, order_items_data = archive_contents(archive)
+    return {
+        "id": archive.id,
+        "original_order_id": archive.original_order_id,
+        "user_id": archive.user_id,
+        "order_data": order_data,
+        "order_items_data": order_items_data,
+        "deletion_reason": archive.deletion_reason,
+        "deleted_by": archive.deleted_by,
+        "deleted_by_role": archive.deleted_by_role,
+        "notes": archive.notes,
+        "deleted_at": archive.deleted_at,
+    }
+
+
+def _json_size(value: Any) -> int:
+    return len(dumps(value)) if value is not None else 0
+
+
+def migrate_archive_payloads(db: Session, batch_size: int = MIGRATION_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Convert archives still stored as JSON columns to payloads.
+
+    Each batch is one transaction: payloads are written with one executemany
+    UPDATE and the duplicated order_items_archive rows are deleted. Returns
+    how many rows were converted, JSON vs payload bytes and decode latency.
+    """
+    table = OrderArchive.__table__
+    items_table = OrderItemsArchive.__table__
+    report = {"converted": 0, "json_bytes": 0, "payload_bytes": 0, "decode_ms_per_archive": 0.0}
+    decode_seconds = 0.0
+    last_id = 0
+
+    while True:
+        archives = db.exec(
+            select(OrderArchive)
+            .where(OrderArchive.payload.is_(None), OrderArchive.id > last_id)
+            .order_by(OrderArchive.id)
+            .limit(batch_size)
+        ).all()
+        if not archives:
+            break
+        archive_ids = [archive.id for archive in archives]
+
+        item_rows: Dict[int, List[Dict[str, Any]]] = {}
+        for archive_id, item_data in db.exec(
+            select(OrderItemsArchive.archive_order_id, OrderItemsArchive.item_data)
+            .where(OrderItemsArchive.archive_order_id.in_(archive_ids))
+            .order_by(OrderItemsArchive.id)
+        ).all():
+            item_rows.setdefault(archive_id, []).append(item_data)
+            report["json_bytes"] += _json_size(item_data)
+
+        updates = []
+        for archive in archives:
+            items = (archive.order_items_data or {}).get("items") or item_rows.get(archive.id, [])
+            payload = encode_archive(archive.order_data or {}, items)
+            report["json_bytes"] += _json_size(archive.order_data) + _json_size(archive.order_items_data)
+            report["payload_bytes"] += len(payload)
+
+            started = time.perf_counter()
+            decode_archive(payload)
+            decode_seconds += time.perf_counter() - started
+
+            updates.append({"archive_id": archive.id, "new_payload": payload})
+
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("archive_id"))
+            .values(
+                payload=bindparam("new_payload"),
+                payload_version=ARCHIVE_FORMAT_VERSION,
+                order_data=null(),
+                order_items_data=null()
+            ),
+            updates
+        )
+        db.execute(delete(items_table).where(items_table.c.archive_order_id.in_(archive_ids)))
+        db.commit()
+        for archive in archives:
+            db.expunge(archive)
+
+        report["converted"] += len(archives)
+        last_id = archive_ids[-1]
+
+    if report["converted"]:
+        report["decode_ms_per_archive"] = round(decode_seconds * 1000 / report["converted"], 3)
+        saved = report["json_bytes"] - report["payload_bytes"]
+        print(f" Converted {report['converted']} archives to compressed payloads: "
+              f"{report['json_bytes']} -> {report['payload_bytes']} bytes ({saved} saved), "
+              f"decode {report['decode_ms_per_archive']} ms/archive")
+    return report
@@ -0,0 +1,175 @@
+# services/customer_search_service.py
+"""
+Ranked prefix search over customers.
+
+customer_search_tokens holds the lowercase words of each user's name, the
+digits of the mobile number (plus its trailing 4+ digit suffixes, so the
+last digits can be typed) and the email local part, each with a weight.
+A search term matches with an indexed `token LIKE 'term%'`; rows are
+ranked by weight, with a bonus for exact token matches.
+
+The table is kept current by ORM listeners on User inserts and updates,
+so every code path that saves a User through the session is covered.
+"""
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, delete, event, func, insert, inspect
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select
+
+from models.customer_search_token import CustomerSearchToken
+from models.user import User
+from services.token_lookup_service import escape_like
+
+MIN_MOBILE_SUFFIX = 4
+MAX_SEARCH_WORDS = 4
+EXACT_MATCH_BONUS = 2
+BACKFILL_BATCH_SIZE = 1000
+
+# Token weights
+FIRST_NAME_WEIGHT = 3
+NAME_WEIGHT = 2
+MOBILE_WEIGHT = 3
+MOBILE_SUFFIX_WEIGHT = 1
+EMAIL_WEIGHT = 1
+
+SEARCHED_FIELDS = ("name", "mobile_no", "email")
+_TOKEN_MAX_LENGTH = 100
+
+
+def _clean_word(word: str) -> str:
+    return re.sub(r"[^\w@.+-]", "", word.lower())[:_TOKEN_MAX_LENGTH]
+
+
+def customer_search_tokens(name: Optional[str], mobile_no: Optional[str], email: Optional[str]) -> Dict[str, int]:
+    """Search tokens for one user mapped to their weight"""
+    tokens: Dict[str, int] = {}
+
+    def add(token: str, weight: int):
+        if token and weight > tokens.get(token, 0):
+            tokens[token] = weight
+
+    for position, word in enumerate((name or "").split()):
+        add(_clean_word(word), FIRST_NAME_WEIGHT if position == 0 else NAME_WEIGHT)
+
+    digits = "".join(filter(str.isdigit, mobile_no or ""))
+    add(digits, MOBILE_WEIGHT)
+    for start in range(1, len(digits) - MIN_MOBILE_SUFFIX + 1):
+        add(digits[start:], MOBILE_SUFFIX_WEIGHT)
+
+    if email and "@" in email:
+        add(_clean_word(email.split("@", 1)[0]), EMAIL_WEIGHT)
+
+    return tokens
+
+
+def _token_rows(user_id: int, name, mobile_no, email) -> List[dict]:
+    return [
+        {"token": token, "user_id": user_id, "weight": weight}
+        for token, weight in customer_search_tokens(name, mobile_no, email).items()
+    ]
+
+
+def _reindex_user(connection, user: User):
+    table = CustomerSearchToken.__table__
+    connection.execute(delete(table).where(table.c.user_id == user.user_id))
+    rows = _token_rows(user.user_id, user.name, user.mobile_no, user.email)
+    if rows:
+        connection.execute(insert(table), rows)
+
+
+@event.listens_for(User, "after_insert")
+def _index_new_user(mapper, connection, target):
+    _reindex_user(connection, target)
+
+
+@event.listens_for(User, "after_update")
+def _index_updated_user(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in SEARCHED_FIELDS):
+        _reindex_user(connection, target)
+
+
+def search_customer_ids(db: Session, search: str, skip: int = 0, limit: int = 100) -> List[int]:
+    """User ids of customers matching every word of the search, best match first"""
+    words = [word for word in (_clean_word(w) for w in search.split()) if word][:MAX_SEARCH_WORDS]
+    if not words:
+        return []
+
+    statement = select(User.user_id).where(User.role == "customer")
+    scores = []
+    for word in words:
+        matches = (
+            select(
+                CustomerSearchToken.user_id,
+                func.max(
+                    CustomerSearchToken.weight
+                    + case((CustomerSearchToken.token == word, EXACT_MATCH_BONUS), else_=0)
+                ).label("score")
+            )
+            .where(CustomerSearchToken.token.like(f"{escape_like(word)}%", escape="\\"))
+            .group_by(CustomerSearchToken.user_id)
+            .subquery()
+        )
+        statement = statement.join(matches, matches.c.user_id == User.user_id)
+        scores.append(matches.c.score)
+
+    statement = (
+        statement
+        .order_by(sum(scores[1:], scores[0]).desc(), User.user_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(db.exec(statement).all())
+
+
+def get_customer_page(db: Session, search: Optional[str], skip: int = 0, limit: int = 100) -> List[User]:
+    """One page of customers with addresses loaded for that page only"""
+    if search and search.strip():
+        user_ids = search_customer_ids(db, search, skip, limit)
+        if not user_ids:
+            return []
+        users = db.exec(
+            select(User).where(User.user_id.in_(user_ids)).options(selectinload(User.addresses))
+        ).all()
+        rank = {user_id: position for position, user_id in enumerate(user_ids)}
+        return sorted(users, key=lambda user: rank[user.user_id])
+
+    return list(db.exec(
+        select(User)
+        .where(User.role == "customer")
+        .order_by(User.user_id)
+        .offset(skip)
+        .limit(limit)
+        .options(selectinload(User.addresses))
+    ).all())
+
+
+def backfill_customer_search_index(db: Session) -> int:
+    """Index existing users when the search table is still empty"""
+    if db.exec(select(func.count()).select_from(CustomerSearchToken)).one():
+        return 0
+
+    indexed = 0
+    last_id = 0
+    table = CustomerSearchToken.__table__
+    while True:
+        batch = db.exec(
+            select(User.user_id, User.name, User.mobile_no, User.email)
+            .where(User.user_id > last_id)
+            .order_by(User.user_id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not batch:
+            break
+        rows = [row for user in batch for row in _token_rows(*user)]
+        if rows:
+            db.execute(insert(table), rows)
+        db.commit()
+        indexed += len(batch)
+        last_id = batch[-1][0]
+
+    if indexed:
+        print(f" Indexed search tokens for {indexed} existing users")
+    return indexed
@@ -0,0 +1,435 @@
+# services/customer_summary_service.py
+"""
+Per-customer order summaries and newest-first order history.
+
+customer_order_summaries is kept in step inside the transaction that
+writes the orders. Every write is turned into deltas per customer (order
+count, spend, a move between status buckets, the newest order) and just
+before the commit the touched summary rows are locked and updated with one
+executemany UPDATE, so the summary commits or rolls back with the orders.
+ORM changes to orders are picked up by a flush listener; Core statements
+report the order states they replace and create through
+record_order_states(), and stored totals report their own changes.
+
+A customer without a summary row gets one computed from scratch in the same
+transaction. The full recompute (refresh_summaries) is otherwise only used
+by the history job's repair sweep, repair_customer_summaries.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import bindparam, event, func, insert, inspect, null, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from core.config import settings
+from models.customer_order_summary import CustomerOrderSummary
+from models.order import Order, OrderStatus
+from models.order_history import OrderHistory
+
+_DELTAS_KEY = "summary_deltas"
+
+EXCLUDED_FROM_SPEND = (OrderStatus.CANCELLED.value,)
+
+# Order columns the summary depends on
+_ORDER_FIELDS = ("user_id", "status", "total_amount")
+
+
+def _status_value(order_status) -> Optional[str]:
+    return getattr(order_status, "value", order_status)
+
+
+def _spend(order_status, total_amount) -> float:
+    if _status_value(order_status) in EXCLUDED_FROM_SPEND:
+        return 0.0
+    return float(total_amount or 0)
+
+
+def _add_state(db: Session, state: Mapping[str, Any], sign: int):
+    """Count one order state in (sign 1) or out (sign -1) of its customer's pending delta"""
+    user_id = state.get("user_id")
+    if user_id is None:
+        return
+    delta = db.info.setdefault(_DELTAS_KEY, {}).setdefault(user_id, {
+        "order_count": 0,
+        "lifetime_spend": 0.0,
+        "status_counts": {},
+        "last_order_id": None,
+        "last_order_at": None,
+        "removed_ids": set(),
+        "added_ids": set(),
+    })
+    order_status = _status_value(state.get("status"))
+    delta["order_count"] += sign
+    delta["lifetime_spend"] += sign * _spend(order_status, state.get("total_amount"))
+    delta["status_counts"][order_status] = delta["status_counts"].get(order_status, 0) + sign
+
+    order_id = state.get("order_id")
+    if sign < 0:
+        delta["removed_ids"].add(order_id)
+        return
+    delta["added_ids"].add(order_id)
+    if order_id is not None and (delta["last_order_id"] is None or order_id > delta["last_order_id"]):
+        delta["last_order_id"] = order_id
+    created_at = state.get("created_at")
+    if created_at is not None and (delta["last_order_at"] is None or created_at > delta["last_order_at"]):
+        delta["last_order_at"] = created_at
+
+
+def record_order_states(
+    db: Session,
+    before: Iterable[Mapping[str, Any]] = (),
+    after: Iterable[Mapping[str, Any]] = ()
+):
+    """
+    Queue summary deltas for orders written with Core statements.
+
+    `before` are the order rows (order_id, user_id, status, total_amount)
+    as they were and `after` as they are now; an inserted order only has an
+    after state, a deleted one only a before state. created_at on an after
+    state keeps the customer's newest order up to date.
+    """
+    for state in before:
+        _add_state(db, state, -1)
+    for state in after:
+        _add_state(db, state, 1)
+
+
+def _order_state(order: Order, previous: bool = False) -> Dict[str, Any]:
+    state = {"order_id": order.order_id, "created_at": order.created_at}
+    attrs = inspect(order).attrs
+    for field in _ORDER_FIELDS:
+        history = attrs[field].history
+        state[field] = history.deleted[0] if previous and history.deleted else getattr(order, field)
+    return state
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_orders(session, flush_context):
+    for obj in session.new:
+        if isinstance(obj, Order):
+            _add_state(session, _order_state(obj), 1)
+    for obj in session.dirty:
+        if isinstance(obj, Order):
+            attrs = inspect(obj).attrs
+            if any(attrs[field].history.has_changes() for field in _ORDER_FIELDS):
+                _add_state(session, _order_state(obj, previous=True), -1)
+                _add_state(session, _order_state(obj), 1)
+    for obj in session.deleted:
+        if isinstance(obj, Order):
+            _add_state(session, _order_state(obj, previous=True), -1)
+
+
+def _apply_summary_deltas(session):
+    # Pending ORM changes are flushed first so their deltas are included
+    session.flush()
+    deltas = session.info.pop(_DELTAS_KEY, None)
+    if deltas:
+        apply_summary_deltas(session, deltas)
+
+
+# Ahead of the change log writer, which takes the change counter lock and
+# must stay the last statement before the commit
+event.listen(Session, "before_commit", _apply_summary_deltas, insert=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_summary_deltas(session):
+    session.info.pop(_DELTAS_KEY, None)
+
+
+def _lock_summaries(db: Session, user_ids: List[int]) -> Dict[int, Any]:
+    """Summary rows of the given customers, locked until the commit"""
+    if not user_ids:
+        return {}
+    table = CustomerOrderSummary.__table__
+    return {
+        row.user_id: row
+        for row in db.execute(
+            select(table).where(table.c.user_id.in_(user_ids)).order_by(table.c.user_id).with_for_update()
+        ).all()
+    }
+
+
+def _last_orders(db: Session, user_ids: Iterable[int]) -> Dict[int, Tuple[Optional[int], Optional[datetime]]]:
+    """(last_order_id, last_order_at) per customer, across active and history orders"""
+    last = {user_id: (None, None) for user_id in user_ids}
+    for order_model in (Order, OrderHistory):
+        rows = db.exec(
+            select(order_model.user_id, func.max(order_model.order_id), func.max(order_model.created_at))
+            .where(order_model.user_id.in_(list(last)))
+            .group_by(order_model.user_id)
+        ).all()
+        for user_id, last_id, last_at in rows:
+            last_id = max(filter(None, (last[user_id][0], last_id)), default=None)
+            last_at = max(filter(None, (last[user_id][1], last_at)), default=None)
+            last[user_id] = (last_id, last_at)
+    return last
+
+
+def _with_delta(row, delta: Dict[str, Any]) -> Dict[str, Any]:
+    status_counts = dict(row.status_counts)
+    for order_status, change in delta["status_counts"].items():
+        count = status_counts.get(order_status, 0) + change
+        if count:
+            status_counts[order_status] = count
+        else:
+            status_counts.pop(order_status, None)
+
+    summary = {
+        "user_id": row.user_id,
+        "order_count": row.order_count + delta["order_count"],
+        "lifetime_spend": round(row.lifetime_spend + delta["lifetime_spend"], 2),
+        "last_order_id": row.last_order_id,
+        "last_order_at": row.last_order_at,
+        "status_counts": status_counts,
+    }
+    if delta["last_order_id"] is not None and (summary["last_order_id"] is None or delta["last_order_id"] > summary["last_order_id"]):
+        summary["last_order_id"] = delta["last_order_id"]
+    if delta["last_order_at"] is not None and (summary["last_order_at"] is None or delta["last_order_at"] > summary["last_order_at"]):
+        summary["last_order_at"] = delta["last_order_at"]
+    return summary
+
+
+def apply_summary_deltas(db: Session, deltas: Dict[int, Dict[str, Any]]):
+    """
+    Apply queued deltas to the customers' summary rows (not committed).
+
+    Existing rows are locked before they are read, so concurrent writers
+    for one customer apply their deltas one after the other. Absent keys
+    are never locked (that takes a gap lock, and two of those deadlock as
+    soon as both sides insert): a missing row is computed in full and
+    inserted, and if a concurrent transaction inserted it first, the delta
+    is applied to that row instead.
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if _has_changes(delta)}
+    if not deltas:
+        return
+
+    table = CustomerOrderSummary.__table__
+    user_ids = sorted(deltas)
+    existing = set(db.exec(select(table.c.user_id).where(table.c.user_id.in_(user_ids))).all())
+    stored = _lock_summaries(db, [user_id for user_id in user_ids if user_id in existing])
+    summaries = {}
+
+    missing = [user_id for user_id in user_ids if user_id not in stored]
+    # status_counts NULL marks a row that was never computed
+    uncomputed = [user_id for user_id, row in stored.items() if row.status_counts is None]
+    if missing or uncomputed:
+        computed = compute_summaries(db, missing + uncomputed)
+        summaries.update((user_id, computed[user_id]) for user_id in uncomputed)
+        for user_id in missing:
+            inserted = db.execute(
+                insert(table).prefix_with("IGNORE", dialect="mysql").prefix_with("OR IGNORE", dialect="sqlite"),
+                dict(computed[user_id], updated_at=datetime.utcnow())
+            )
+            if not inserted.rowcount:
+                # Created by a concurrent writer in the meantime
+                stored.update(_lock_summaries(db, [user_id]))
+
+    lost_last = []
+    for user_id, row in stored.items():
+        if user_id in summaries:
+            continue
+        delta = deltas[user_id]
+        summaries[user_id] = _with_delta(row, delta)
+        if row.last_order_id in delta["removed_ids"] - delta["added_ids"]:
+            lost_last.append(user_id)
+    if lost_last:
+        # The newest order went away: look up the one before it
+        for user_id, (last_id, last_at) in _last_orders(db, lost_last).items():
+            summaries[user_id].update(last_order_id=last_id, last_order_at=last_at)
+
+    _store_summaries(db, summaries)
+
+
+def _has_changes(delta: Dict[str, Any]) -> bool:
+    return bool(
+        delta["order_count"] or round(delta["lifetime_spend"], 2) or delta["last_order_id"] is not None
+        or any(delta["status_counts"].values())
+    )
+
+
+def _store_summaries(db: Session, summaries: Dict[int, Dict[str, Any]]):
+    """One executemany UPDATE of existing summary rows"""
+    if not summaries:
+        return
+    table = CustomerOrderSummary.__table__
+    now = datetime.utcnow()
+    db.execute(
+        update(table).where(table.c.user_id == bindparam("summary_user_id")),
+        [
+            {
+                "summary_user_id": user_id,
+                "order_count": summary["order_count"],
+                "lifetime_spend": summary["lifetime_spend"],
+                "last_order_id": summary["last_order_id"],
+                "last_order_at": summary["last_order_at"],
+                "status_counts": summary["status_counts"],
+                "updated_at": now,
+            }
+            for user_id, summary in summaries.items()
+        ]
+    )
+
+
+def compute_summaries(db: Session, user_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Aggregate order count, spend, last order and status breakdown per customer"""
+    user_ids = set(user_ids)
+    summaries = {
+        user_id: {
+            "user_id": user_id,
+            "order_count": 0,
+            "lifetime_spend": 0.0,
+            "last_order_id": None,
+            "last_order_at": None,
+            "status_counts": {},
+        }
+        for user_id in user_ids
+    }
+    if not user_ids:
+        return summaries
+
+    # Orders moved to history still count towards the customer's totals
+    for order_model in (Order, OrderHistory):
+        status_rows = db.exec(
+            select(
+                order_model.user_id,
+                order_model.status,
+                func.count(order_model.order_id),
+                func.max(order_model.order_id),
+                func.max(order_model.created_at)
+            )
+            .where(order_model.user_id.in_(user_ids))
+            .group_by(order_model.user_id, order_model.status)
+        ).all()
+        for user_id, order_status, count, last_id, last_at in status_rows:
+            summary = summaries[user_id]
+            summary["order_count"] += count
+            summary["status_counts"][order_status] = summary["status_counts"].get(order_status, 0) + count
+            if summary["last_order_id"] is None or last_id > summary["last_order_id"]:
+                summary["last_order_id"] = last_id
+            if summary["last_order_at"] is None or (last_at and last_at > summary["last_order_at"]):
+                summary["last_order_at"] = last_at
+
+        spend_rows = db.exec(
+            select(order_model.user_id, func.sum(order_model.total_amount))
+            .where(order_model.user_id.in_(user_ids), order_model.status.not_in(EXCLUDED_FROM_SPEND))
+            .group_by(order_model.user_id)
+        ).all()
+        for user_id, spend in spend_rows:
+            summaries[user_id]["lifetime_spend"] = round(summaries[user_id]["lifetime_spend"] + float(spend or 0), 2)
+
+    return summaries
+
+
+def refresh_summaries(db: Session, user_ids: Iterable[int]) -> int:
+    """
+    Recompute and store summaries for the given customers, committed.
+
+    Missing rows are created first in a transaction of their own, so the
+    FOR UPDATE below always locks existing rows: locking an absent key takes
+    a gap lock, and two of those deadlock as soon as both sides insert.
+    The orders are only read once the locks are held.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return 0
+
+    table = CustomerOrderSummary.__table__
+    existing = set(db.exec(
+        select(CustomerOrderSummary.user_id).where(CustomerOrderSummary.user_id.in_(user_ids))
+    ).all())
+    missing = [user_id for user_id in user_ids if user_id not in existing]
+    if missing:
+        # status_counts NULL marks a row that was never computed
+        now = datetime.utcnow()
+        try:
+            db.execute(insert(table).values(status_counts=null()), [
+                {"user_id": user_id, "order_count": 0, "lifetime_spend": 0.0, "updated_at": now}
+                for user_id in missing
+            ])
+            db.commit()
+        except IntegrityError:
+            db.rollback()  # created by a concurrent refresh
+    else:
+        db.commit()  # end the snapshot opened by the read above
+
+    _lock_summaries(db, user_ids)
+    summaries = compute_summaries(db, user_ids)
+    _store_summaries(db, summaries)
+    db.commit()
+    return len(summaries)
+
+
+def repair_customer_summaries(db: Session, after_user_id: int = 0, limit: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Recompute the next `limit` stored summaries after after_user_id, plus
+    any row an interrupted refresh left uncomputed.
+
+    Returns the number of summaries recomputed and the user_id to continue
+    from on the next call (0 once the sweep has wrapped around).
+    """
+    limit = limit or settings.SUMMARY_REPAIR_BATCH_SIZE
+    table = CustomerOrderSummary.__table__
+    user_ids = db.exec(
+        select(table.c.user_id).where(table.c.user_id > after_user_id).order_by(table.c.user_id).limit(limit)
+    ).all()
+    next_user_id = user_ids[-1] if len(user_ids) == limit else 0
+    uncomputed = db.exec(select(table.c.user_id).where(table.c.status_counts.is_(None)).limit(limit)).all()
+    db.commit()
+
+    repaired = 0
+    user_ids = sorted(set(user_ids) | set(uncomputed))
+    for start in range(0, len(user_ids), 100):
+        repaired += refresh_summaries(db, user_ids[start:start + 100])
+    return repaired, next_user_id
+
+
+def get_customer_summary(db: Session, user_id: int) -> Dict[str, Any]:
+    """Stored summary for a customer, computed on the fly if none is stored yet"""
+    stored = db.get(CustomerOrderSummary, user_id)
+    if stored and stored.status_counts is not None:
+        return {
+            "user_id": stored.user_id,
+            "order_count": stored.order_count,
+            "lifetime_spend": stored.lifetime_spend,
+            "last_order_id": stored.last_order_id,
+            "last_order_at": stored.last_order_at,
+            "status_counts": stored.status_counts,
+        }
+    return compute_summaries(db, [user_id])[user_id]
+
+
+def get_order_history(
+    db: Session,
+    user_id: int,
+    limit: int = 20,
+    cursor: Optional[int] = None,
+    skip: int = 0,
+    service: Optional[str] = None,
+    status: Optional[str] = None
+) -> Tuple[List[Order], Optional[int]]:
+    """
+    One page of a customer's orders, newest first.
+
+    `cursor` is the next_cursor of the previous page (an order_id); pages
+    are read with `order_id < cursor` so they stay cheap however deep the
+    history is. Returns the orders and the cursor for the following page.
+    """
+    statement = select(Order).where(Order.user_id == user_id)
+    if service:
+        statement = statement.where(Order.service == service)
+    if status:
+        statement = statement.where(Order.status == status)
+    if cursor:
+        statement = statement.where(Order.order_id < cursor)
+    elif skip:
+        statement = statement.offset(skip)
+
+    orders = db.exec(statement.order_by(Order.order_id.desc()).limit(limit + 1)).all()
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = orders[-1].order_id
+    return orders, next_cursor
@@ -21,7 +21,7 @@ class DashboardService:
         total_orders = self.db.exec(select(func.count(Order.order_id))).first() or 0
         
         
-        total_revenue_stmt = select(func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price), 0)).select_from(OrderItem)
+        total_revenue_stmt = select(func.coalesce(func.sum(Order.total_amount), 0))
         total_revenue = self.db.exec(total_revenue_stmt).first() or 0.0
         
         
@@ -39,12 +39,12 @@ class DashboardService:
         
         
         current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        monthly_revenue_stmt = select(func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price), 0)).select_from(OrderItem).join(Order).where(Order.created_at >= current_month_start)
+        monthly_revenue_stmt = select(func.coalesce(func.sum(Order.total_amount), 0)).where(Order.created_at >= current_month_start)
         monthly_revenue = self.db.exec(monthly_revenue_stmt).first() or 0.0
         
         
         week_ago = datetime.now() - timedelta(days=7)
-        weekly_revenue_stmt = select(func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price), 0)).select_from(OrderItem).join(Order).where(Order.created_at >= week_ago)
+        weekly_revenue_stmt = select(func.coalesce(func.sum(Order.total_amount), 0)).where(Order.created_at >= week_ago)
         weekly_revenue = self.db.exec(weekly_revenue_stmt).first() or 0.0
         
         
@@ -52,7 +52,7 @@ class DashboardService:
         prev_period_end = datetime.now() - timedelta(days=period_days)
         
         
-        prev_revenue_stmt = select(func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price), 0)).select_from(OrderItem).join(Order).where(
+        prev_revenue_stmt = select(func.coalesce(func.sum(Order.total_amount), 0)).where(
             and_(
                 Order.created_at >= prev_period_start,
                 Order.created_at < prev_period_end
@@ -104,7 +104,7 @@ class DashboardService:
             day_end = datetime.combine(current_date, datetime.max.time())
             
             
-            daily_revenue_stmt = select(func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price), 0)).select_from(OrderItem).join(Order).where(
+            daily_revenue_stmt = select(func.coalesce(func.sum(Order.total_amount), 0)).where(
                 and_(
                     Order.created_at >= day_start,
                     Order.created_at <= day_end
@@ -143,7 +143,7 @@ class DashboardService:
             service_count = self.db.exec(service_count_stmt).first() or 0
             
             
-            service_revenue_stmt = select(func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price), 0)).select_from(OrderItem).join(Order).where(Order.service == service_type)
+            service_revenue_stmt = select(func.coalesce(func.sum(Order.total_amount), 0)).where(Order.service == service_type)
             service_revenue = self.db.exec(service_revenue_stmt).first() or 0.0
             
             percentage = (service_count / total_orders) * 100 if total_orders > 0 else 0
@@ -160,7 +160,7 @@ class DashboardService:
     def get_category_stats(self) -> List[CategoryWiseStats]:
         """Get category-wise statistics"""
         
-        total_items_stmt = select(func.sum(OrderItem.quantity))
+        total_items_stmt = select(func.sum(Order.total_quantity))
         total_items = self.db.exec(total_items_stmt).first() or 1
         
         category_stats = []
@@ -202,13 +202,6 @@ class DashboardService:
                     # Get user details
                     user = self.db.get(User, order.user_id)
                     
-                    # Get order items
-                    items_statement = select(OrderItem).where(OrderItem.order_id == order.order_id)
-                    order_items = self.db.exec(items_statement).all()
-                    
-                    total_items = len(order_items)
-                    total_quantity = sum(item.quantity for item in order_items)
-                    
                     order_data = {
                         "order_id": order.order_id,
                         "Token_no": order.Token_no,
@@ -216,8 +209,8 @@ class DashboardService:
                         "customer_mobile": user.mobile_no if user else "Unknown",
                         "service": order.service,
                         "status": order.status,
-                        "total_items": total_items,
-                        "total_quantity": total_quantity,
+                        "total_items": order.item_count or 0,
+                        "total_quantity": order.total_quantity or 0,
                         "created_at": order.created_at.isoformat() if order.created_at else None,
                         "user_id": order.user_id
                     }
@@ -245,15 +238,14 @@ class DashboardService:
                 User.user_id,
                 User.name,
                 func.count(Order.order_id).label('total_orders'),
-                func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price), 0).label('total_spent'),
+                func.coalesce(func.sum(Order.total_amount), 0).label('total_spent'),
                 func.max(Order.created_at).label('last_order_date')
             )
             .select_from(User)
             .join(Order, User.user_id == Order.user_id)
-            .join(OrderItem, Order.order_id == OrderItem.order_id)
             .group_by(User.user_id, User.name)
             .having(func.count(Order.order_id) > 0)
-            .order_by(func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price), 0).desc())
+            .order_by(func.coalesce(func.sum(Order.total_amount), 0).desc())
             .limit(limit)
         )
         
@@ -287,7 +279,7 @@ class DashboardService:
         today_orders = self.db.exec(today_orders_stmt).first() or 0
         
         
-        today_revenue_stmt = select(func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price), 0)).select_from(OrderItem).join(Order).where(
+        today_revenue_stmt = select(func.coalesce(func.sum(Order.total_amount), 0)).where(
             and_(
                 Order.created_at >= today_start,
                 Order.created_at <= today_end
@@ -298,7 +290,7 @@ class DashboardService:
         
         week_start = datetime.now() - timedelta(days=datetime.now().weekday())
         week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-        week_revenue_stmt = select(func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price), 0)).select_from(OrderItem).join(Order).where(
+        week_revenue_stmt = select(func.coalesce(func.sum(Order.total_amount), 0)).where(
             Order.created_at >= week_start
         )
         week_revenue = self.db.exec(week_revenue_stmt).first() or 0.0
@@ -306,7 +298,7 @@ class DashboardService:
         
         total_orders_stmt = select(func.count(Order.order_id))
         total_orders = self.db.exec(total_orders_stmt).first() or 1
-        total_revenue_stmt = select(func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price), 0))
+        total_revenue_stmt = select(func.coalesce(func.sum(Order.total_amount), 0))
         total_revenue = self.db.exec(total_revenue_stmt).first() or 0.0
         avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
         
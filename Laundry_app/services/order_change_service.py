@@ -0,0 +1,182 @@
+# services/order_change_service.py
+"""
+Order change log behind the staff delta-sync feed.
+
+Every commit that touches orders or their items appends one row per order
+to order_changes ("upsert", or "delete" when the order left the active
+tables through archive, delete or the history job). ORM writes are picked
+up by session listeners; Core statements report their orders through
+record_order_changes().
+
+Clients keep the last change_id they saw and ask for `change_id > since`.
+Auto-increment ids would be handed out at insert time but become visible at
+commit, so a lower id could appear after a client had already moved past
+it. change_ids are instead taken from the single order_change_counter row
+by the last statement before the commit: the row lock is held until the
+commit, so ids become visible in commit order, and a rollback returns its
+ids, so there are no gaps to wait for. Only the commit itself runs under
+the lock.
+
+In-process caches of order data register with on_orders_committed() and
+are called with the changed order ids after each commit.
+"""
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, event, func, insert, update
+from sqlmodel import Session, select
+
+from models.order import Order
+from models.order_change import OrderChange, OrderChangeCounter
+from models.order_item import OrderItem
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+CHANGE_LOG_RETENTION_DAYS = 7
+
+_UPSERTED_KEY = "changed_order_ids"
+_DELETED_KEY = "deleted_order_ids"
+_COMMITTED_KEY = "committed_order_ids"
+
+_commit_listeners: List[Callable[[Set[int]], None]] = []
+
+
+def record_order_changes(db: Session, upserted: Iterable[int] = (), deleted: Iterable[int] = ()):
+    """Queue orders to be written to the change log with the next commit"""
+    if upserted:
+        db.info.setdefault(_UPSERTED_KEY, set()).update(upserted)
+    if deleted:
+        db.info.setdefault(_DELETED_KEY, set()).update(deleted)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_order_changes(session, flush_context):
+    upserted = set()
+    deleted = set()
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Order):
+            upserted.add(obj.order_id)
+        elif isinstance(obj, OrderItem):
+            upserted.add(obj.order_id)
+    for obj in session.deleted:
+        if isinstance(obj, Order):
+            deleted.add(obj.order_id)
+        elif isinstance(obj, OrderItem):
+            upserted.add(obj.order_id)
+    record_order_changes(session, upserted, deleted)
+
+
+@event.listens_for(Session, "before_commit")
+def _write_order_changes(session):
+    # Pending ORM changes are flushed first so their orders are collected
+    session.flush()
+    deleted = session.info.pop(_DELETED_KEY, set())
+    upserted = session.info.pop(_UPSERTED_KEY, set()) - deleted
+    upserted.discard(None)
+    deleted.discard(None)
+    if not (upserted or deleted):
+        return
+
+    now = datetime.utcnow()
+    changes = [(order_id, UPSERT) for order_id in sorted(upserted)]
+    changes += [(order_id, DELETE) for order_id in sorted(deleted)]
+    first_id = _reserve_change_ids(session, len(changes))
+    session.execute(insert(OrderChange.__table__), [
+        {"change_id": first_id + offset, "order_id": order_id, "op": op, "changed_at": now}
+        for offset, (order_id, op) in enumerate(changes)
+    ])
+    session.info[_COMMITTED_KEY] = upserted | deleted
+
+
+def _reserve_change_ids(session, count: int) -> int:
+    """First of `count` consecutive change_ids; locks the counter row until the commit"""
+    counter = OrderChangeCounter.__table__
+    result = session.execute(
+        update(counter).where(counter.c.id == 1).values(last_change_id=counter.c.last_change_id + count)
+    )
+    if not result.rowcount:
+        last = ensure_change_counter(session, commit=False)
+        session.execute(update(counter).where(counter.c.id == 1).values(last_change_id=last + count))
+        return last + 1
+    return session.execute(select(counter.c.last_change_id).where(counter.c.id == 1)).scalar_one() - count + 1
+
+
+def ensure_change_counter(db: Session, commit: bool = True) -> int:
+    """Create the counter row if missing, continuing after existing changes; returns its value"""
+    counter = OrderChangeCounter.__table__
+    last = db.execute(select(counter.c.last_change_id).where(counter.c.id == 1)).scalar()
+    if last is None:
+        last = db.exec(select(func.coalesce(func.max(OrderChange.change_id), 0))).one()
+        db.execute(insert(counter).values(id=1, last_change_id=last))
+        if commit:
+            db.commit()
+    return last
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_order_changes(session):
+    order_ids = session.info.pop(_COMMITTED_KEY, None)
+    if order_ids:
+        for listener in _commit_listeners:
+            listener(order_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_order_changes(session):
+    session.info.pop(_UPSERTED_KEY, None)
+    session.info.pop(_DELETED_KEY, None)
+    session.info.pop(_COMMITTED_KEY, None)
+
+
+def on_orders_committed(listener: Callable[[Set[int]], None]):
+    """Call listener(order_ids) after every commit that changed orders"""
+    _commit_listeners.append(listener)
+    return listener
+
+
+def current_watermark(db: Session) -> int:
+    return db.exec(select(func.coalesce(func.max(OrderChange.change_id), 0))).one()
+
+
+def read_changes(db: Session, since: int, limit: int = 500) -> Tuple[List[OrderChange], int, bool]:
+    """
+    Changes after `since`, up to `limit` rows.
+
+    Returns the rows, the watermark the client should send next time and
+    whether more changes are waiting. Read from the primary: a replica
+    that is behind would hand out a watermark past changes it has not
+    applied yet.
+    """
+    rows = db.exec(
+        select(OrderChange)
+        .where(OrderChange.change_id > since)
+        .order_by(OrderChange.change_id)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, (rows[-1].change_id if rows else since), has_more
+
+
+def collapse_changes(rows: List[OrderChange]) -> Tuple[List[int], List[int]]:
+    """Latest operation per order: (upserted ids, deleted ids)"""
+    latest: Dict[int, str] = {}
+    for row in rows:
+        latest[row.order_id] = row.op
+    upserted = [order_id for order_id, op in latest.items() if op == UPSERT]
+    deleted = [order_id for order_id, op in latest.items() if op == DELETE]
+    return upserted, deleted
+
+
+def oldest_change_id(db: Session) -> Optional[int]:
+    return db.exec(select(func.min(OrderChange.change_id))).one()
+
+
+def prune_changes(db: Session, older_than_days: int = CHANGE_LOG_RETENTION_DAYS) -> int:
+    """Drop change log rows older than the retention window"""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    table = OrderChange.__table__
+    result = db.execute(delete(table).where(table.c.changed_at < cutoff))
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,111 @@
+# services/order_creation_service.py
+"""
+Creates an order, its address and its items in a single transaction.
+
+Rows are only flushed until the caller commits, items go in as one
+multi-row INSERT, and an address identical to one the customer already has
+is reused instead of being inserted again. On any error the caller rolls
+back and nothing is left behind.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from models.address import Address
+from models.order import Order
+from models.order_item import OrderItem
+from services.order_item_service import build_items, insert_items
+from services.order_totals_service import item_totals, mark_order_totals_fresh
+from services.token_service import generate_token_no
+from services.token_lookup_service import index_tokens
+
+
+def _clean(value: Optional[str]) -> str:
+    return value.strip() if value else ""
+
+
+class OrderCreationService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def find_or_create_address(
+        self,
+        user_id: int,
+        name: str,
+        mobile_no: str,
+        address_line1: str,
+        address_line2: Optional[str],
+        city: str,
+        state: str,
+        pincode: str
+    ) -> Address:
+        """Reuse an identical address of the user or add a new one (flushed, not committed)"""
+        values = {
+            "name": _clean(name),
+            "mobile_no": _clean(mobile_no),
+            "address_line1": _clean(address_line1),
+            "address_line2": _clean(address_line2),
+            "city": _clean(city),
+            "state": _clean(state),
+            "pincode": _clean(pincode),
+        }
+
+        statement = select(Address).where(Address.user_id == user_id)
+        for field, value in values.items():
+            statement = statement.where(getattr(Address, field) == value)
+        existing = self.db.exec(statement.limit(1)).first()
+        if existing:
+            print(f" Reusing address {existing.address_id} for user {user_id}")
+            return existing
+
+        now = datetime.utcnow()
+        address = Address(user_id=user_id, created_at=now, updated_at=now, **values)
+        self.db.add(address)
+        self.db.flush()
+        print(f" New address created with ID: {address.address_id}")
+        return address
+
+    def create_order(
+        self,
+        user_id: int,
+        address_id: int,
+        service: str,
+        status: str,
+        created_by: str,
+        items: List[Dict[str, Any]],
+        updated_by: Optional[str] = None
+    ) -> Tuple[Order, List[OrderItem]]:
+        """
+        Add the order and its items (flushed, not committed).
+
+        Each item dict needs category_name, product_name, quantity, service
+        and status; unit_price falls back to the OrderItem default.
+        """
+        now = datetime.utcnow()
+        new_items = build_items(items, created_by, updated_by, now)
+        total_amount, item_count, total_quantity = item_totals(new_items)
+        db_order = Order(
+            user_id=user_id,
+            address_id=address_id,
+            Token_no=generate_token_no(self.db),
+            service=service,
+            status=status,
+            total_amount=total_amount,
+            item_count=item_count,
+            total_quantity=total_quantity,
+            created_by=created_by,
+            updated_by=updated_by,
+            created_at=now,
+            updated_at=now
+        )
+        self.db.add(db_order)
+        self.db.flush()
+        index_tokens(self.db, [(db_order.order_id, db_order.Token_no)])
+
+        created_items = insert_items(self.db, db_order.order_id, new_items)
+        # The totals went in with the order row; nothing to recompute at commit
+        mark_order_totals_fresh(self.db, [db_order.order_id])
+
+        print(f" Order created: {db_order.Token_no} with {len(created_items)} items")
+        return db_order, created_items
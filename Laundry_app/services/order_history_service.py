@@ -0,0 +1,241 @@
+# services/order_history_service.py
+"""
+History tier for finished orders.
+
+Completed and cancelled orders older than HISTORY_AFTER_DAYS are moved
+from orders / order_items into order_history / order_item_history, keyed
+by the month they were created in (history_month, YYYYMM). Each batch is copied with
+INSERT ... SELECT and removed with set-based DELETEs in its own
+transaction, so an interrupted run loses nothing and the next run simply
+picks up the orders that are still in the active tables.
+
+Listing endpoints keep reading `orders`, which now only holds the active
+set; history is read with an explicit date range (get_history_orders).
+"""
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, exists, insert, inspect, literal
+from sqlmodel import Session, select
+
+from core.config import settings
+from core.idempotency import prune_idempotency_keys
+from db.session import SessionLocal
+from models.feedback import Feedback
+from models.order import Order, OrderStatus
+from models.order_history import OrderHistory, OrderItemHistory
+from models.order_item import OrderItem
+from models.order_token_suffix import OrderTokenSuffix
+from models.pickup_delivery import PickupDelivery
+from services.customer_summary_service import repair_customer_summaries
+from services.order_change_service import (
+    collapse_changes, current_watermark, prune_changes, read_changes, record_order_changes
+)
+from services.order_totals_service import REPAIR_BATCH_SIZE, repair_order_totals
+from services.refresh_token_service import prune_refresh_tokens
+
+# Upper bound on the orders the job re-checks per run; the rest wait for the next run
+TOTALS_REPAIR_MAX_BATCHES = 10
+
+# The terminal states of ORDER_TRANSITIONS: nothing moves an order out of them
+MOVED_STATUSES = (OrderStatus.COMPLETED.value, OrderStatus.CANCELLED.value)
+
+# Orders still referenced from these tables stay active so their
+# foreign keys keep pointing at a row
+_REFERENCING_TABLES = (PickupDelivery.__table__, Feedback.__table__)
+
+
+def history_month(value: datetime) -> int:
+    return value.year * 100 + value.month
+
+
+def referencing_tables(db: Session):
+    """Tables with a foreign key to orders that exist in this database"""
+    inspector = inspect(db.get_bind())
+    return [table for table in _REFERENCING_TABLES if inspector.has_table(table.name)]
+
+
+def _copy_rows(db: Session, source, target, key_column, ids: List[int], month: int, extra: Optional[Dict[str, Any]] = None):
+    """INSERT INTO target (...) SELECT ... FROM source WHERE key IN ids"""
+    extra = dict(extra or {}, history_month=month)
+    columns = [column.name for column in source.columns]
+    db.execute(
+        insert(target).from_select(
+            columns + list(extra),
+            select(*source.columns, *[literal(value) for value in extra.values()])
+            .where(key_column.in_(ids))
+        )
+    )
+
+
+def move_batch(db: Session, batch: List[Tuple[int, datetime]]) -> int:
+    """Move a batch of (order_id, created_at) to the history tables and commit"""
+    if not batch:
+        return 0
+
+    now = datetime.utcnow()
+    by_month = defaultdict(list)
+    for order_id, created_at in batch:
+        by_month[history_month(created_at)].append(order_id)
+
+    orders = Order.__table__
+    items = OrderItem.__table__
+    for month, ids in by_month.items():
+        _copy_rows(db, orders, OrderHistory.__table__, orders.c.order_id, ids, month, {"moved_at": now})
+        _copy_rows(db, items, OrderItemHistory.__table__, items.c.order_id, ids, month)
+
+    order_ids = [order_id for order_id, _ in batch]
+    suffixes = OrderTokenSuffix.__table__
+    db.execute(delete(items).where(items.c.order_id.in_(order_ids)))
+    db.execute(delete(suffixes).where(suffixes.c.order_id.in_(order_ids)))
+    db.execute(delete(orders).where(orders.c.order_id.in_(order_ids)))
+    # Moved orders leave the active set the staff app syncs
+    record_order_changes(db, deleted=order_ids)
+    db.commit()
+    return len(order_ids)
+
+
+def move_completed_orders(
+    db: Session,
+    older_than_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None
+) -> int:
+    """Move finished orders older than the cutoff into history, batch by batch"""
+    older_than_days = settings.HISTORY_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.HISTORY_BATCH_SIZE
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+
+    statement = select(Order.order_id, Order.created_at).where(
+        Order.status.in_(MOVED_STATUSES),
+        Order.created_at < cutoff
+    )
+    for table in referencing_tables(db):
+        statement = statement.where(~exists().where(table.c.order_id == Order.order_id))
+
+    moved = 0
+    batches = 0
+    last_id = 0
+    while max_batches is None or batches < max_batches:
+        batch = db.exec(
+            statement.where(Order.order_id > last_id).order_by(Order.order_id).limit(batch_size)
+        ).all()
+        if not batch:
+            break
+        moved += move_batch(db, batch)
+        batches += 1
+        last_id = batch[-1][0]
+        print(f" History: moved {moved} orders so far (up to order {last_id})")
+
+    return moved
+
+
+def get_history_orders(
+    db: Session,
+    date_from: datetime,
+    date_to: datetime,
+    user_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List[OrderHistory]:
+    """History orders created in [date_from, date_to], newest first"""
+    statement = select(OrderHistory).where(
+        OrderHistory.history_month.between(history_month(date_from), history_month(date_to)),
+        OrderHistory.created_at >= date_from,
+        OrderHistory.created_at <= date_to
+    )
+    if user_id:
+        statement = statement.where(OrderHistory.user_id == user_id)
+    statement = statement.order_by(OrderHistory.created_at.desc()).offset(skip).limit(limit)
+    return db.exec(statement).all()
+
+
+class OrderHistoryJob:
+    """Runs move_completed_orders (and log/totals/summary upkeep) in a worker thread at a fixed interval"""
+
+    def __init__(self, interval: float = 3600):
+        self.interval = interval
+        self.moved = 0
+        self.totals_repaired = 0
+        self.summaries_checked = 0
+        self._summary_cursor = 0
+        self._totals_change_id: Optional[int] = None
+        self.last_run: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def run_once(self) -> int:
+        started = time.monotonic()
+        try:
+            with SessionLocal() as db:
+                moved = move_completed_orders(db)
+                prune_changes(db)
+                prune_idempotency_keys(db)
+                prune_refresh_tokens(db)
+                self.totals_repaired += self._repair_changed_totals(db)
+                checked, self._summary_cursor = repair_customer_summaries(db, self._summary_cursor)
+                self.summaries_checked += checked
+            self.moved += moved
+            self.last_error = None
+            if moved:
+                print(f" History job moved {moved} orders in {time.monotonic() - started:.1f}s")
+            return moved
+        except Exception as e:
+            self.last_error = str(e)
+            print(f" History job error: {str(e)}")
+            return 0
+        finally:
+            self.last_run = datetime.utcnow()
+
+    def _repair_changed_totals(self, db: Session) -> int:
+        """
+        Totals of orders never filled in, then of orders in the change log
+        since the previous run, at most TOTALS_REPAIR_MAX_BATCHES batches each.
+        """
+        repaired = repair_order_totals(db, only_missing=True, max_batches=TOTALS_REPAIR_MAX_BATCHES)
+        if self._totals_change_id is None:
+            # First run in this process: start from the current end of the log
+            self._totals_change_id = current_watermark(db)
+            return repaired
+        for _ in range(TOTALS_REPAIR_MAX_BATCHES):
+            rows, self._totals_change_id, has_more = read_changes(db, self._totals_change_id, REPAIR_BATCH_SIZE)
+            upserted, _ = collapse_changes(rows)
+            if upserted:
+                repaired += repair_order_totals(db, order_ids=upserted)
+            if not has_more:
+                break
+        db.commit()
+        return repaired
+
+    async def _run(self):
+        while True:
+            await asyncio.to_thread(self.run_once)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "moved": self.moved,
+            "totals_repaired": self.totals_repaired,
+            "summaries_checked": self.summaries_checked,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_error": self.last_error,
+        }
+
+
+order_history_job = OrderHistoryJob(interval=settings.HISTORY_JOB_INTERVAL_SECONDS)
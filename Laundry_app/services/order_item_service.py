@@ -0,0 +1,181 @@
+# services/order_item_service.py
+"""
+Set-based writes for order items.
+
+`insert_items` adds any number of items with one multi-row INSERT and
+`reconcile_items` brings an order's items in line with an edited list using
+at most one UPDATE (CASE per changed column), one INSERT and one DELETE.
+Nothing is committed here; the calling route commits.
+
+UPDATE and DELETE only touch rows still at the version that was read (or
+the version the client sent) and bump it, raising StaleDataError when
+another writer changed an item in between.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, delete, insert, update
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.exc import StaleDataError
+from sqlmodel import Session, select
+
+from models.order_item import OrderItem
+from services.order_change_service import record_order_changes
+from services.order_totals_service import mark_order_totals_stale
+
+EDITABLE_FIELDS = ("category_name", "product_name", "quantity", "service", "status")
+
+
+def build_items(
+    items: List[Dict[str, Any]],
+    created_by: Optional[str],
+    updated_by: Optional[str] = None,
+    now: Optional[datetime] = None
+) -> List[OrderItem]:
+    """OrderItem objects for item dicts, not yet attached to an order"""
+    now = now or datetime.utcnow()
+    return [
+        OrderItem(created_by=created_by, updated_by=updated_by, created_at=now, updated_at=now, **item)
+        for item in items
+    ]
+
+
+def insert_items(db: Session, order_id: int, items: List[OrderItem]) -> List[OrderItem]:
+    """
+    Insert built items for an order in one statement and return them.
+
+    The items get their ids from the INSERT itself and are added to the
+    session as loaded rows, so nothing is read back.
+    """
+    if not items:
+        return []
+
+    table = OrderItem.__table__
+    for item in items:
+        item.order_id = order_id
+    rows = [item.model_dump(exclude={"order_item_id"}) for item in items]
+    # One multi-row INSERT numbers its rows in VALUES order
+    if db.get_bind().dialect.insert_executemany_returning:
+        item_ids = sorted(db.execute(insert(table).returning(table.c.order_item_id), rows).scalars().all())
+    else:
+        # No RETURNING on MySQL: the rows take consecutive ids from LAST_INSERT_ID()
+        first_id = db.execute(insert(table).values(rows)).lastrowid
+        item_ids = range(first_id, first_id + len(rows))
+    for item, item_id in zip(items, item_ids):
+        item.order_item_id = item_id
+        make_transient_to_detached(item)
+        db.add(item)
+
+    record_order_changes(db, upserted=[order_id])
+    mark_order_totals_stale(db, [order_id])
+    return items
+
+
+def _read_versions(existing, item_ids, table):
+    """CASE giving each item the version it was read at"""
+    return case({item_id: existing[item_id].version for item_id in item_ids}, value=table.c.order_item_id)
+
+
+def reconcile_items(db: Session, order_id: int, items_data: List[dict], updated_by: str) -> Dict[str, Any]:
+    """
+    Apply an edited item list to an order.
+
+    Items with a known order_item_id are updated (only fields that actually
+    change), items without one are added, and existing items missing from
+    the list are deleted. An item dict may carry the `version` it was read
+    at. Returns a summary of what was written.
+    """
+    table = OrderItem.__table__
+    now = datetime.utcnow()
+
+    existing = {
+        row.order_item_id: row
+        for row in db.exec(
+            select(
+                OrderItem.order_item_id,
+                OrderItem.version,
+                *[getattr(OrderItem, field) for field in EDITABLE_FIELDS]
+            ).where(OrderItem.order_id == order_id)
+        ).all()
+    }
+
+    changes: Dict[int, Dict[str, Any]] = {}
+    unchanged: List[int] = []
+    new_items: List[Dict[str, Any]] = []
+    stale: List[int] = []
+    seen = set()
+
+    for item_data in items_data:
+        item_id = item_data.get("order_item_id")
+
+        if item_id and item_id in existing:
+            seen.add(item_id)
+            current = existing[item_id]
+            if item_data.get("version") is not None and item_data["version"] != current.version:
+                stale.append(item_id)
+                continue
+            diff = {
+                field: item_data[field]
+                for field in EDITABLE_FIELDS
+                if item_data.get(field) is not None and item_data[field] != getattr(current, field)
+            }
+            if diff:
+                changes[item_id] = diff
+            else:
+                unchanged.append(item_id)
+        else:
+            new_items.append({
+                "category_name": item_data["category_name"],
+                "product_name": item_data["product_name"],
+                "quantity": item_data["quantity"],
+                "service": item_data.get("service") or "wash_iron",
+                "status": item_data.get("status") or "pending",
+            })
+
+    if stale:
+        raise StaleDataError(f"Order items {sorted(stale)} were changed by someone else")
+
+    deleted = [item_id for item_id in existing if item_id not in seen]
+
+    if changes:
+        values = {"updated_at": now, "updated_by": updated_by, "version": table.c.version + 1}
+        for field in EDITABLE_FIELDS:
+            per_row = {item_id: diff[field] for item_id, diff in changes.items() if field in diff}
+            if per_row:
+                values[field] = case(per_row, value=table.c.order_item_id, else_=table.c[field])
+        result = db.execute(
+            update(table)
+            .where(
+                table.c.order_item_id.in_(list(changes)),
+                table.c.version == _read_versions(existing, changes, table)
+            )
+            .values(**values)
+        )
+        if result.rowcount != len(changes):
+            raise StaleDataError(f"Order items of order {order_id} were changed by someone else")
+
+    created = len(insert_items(db, order_id, build_items(new_items, updated_by, updated_by, now)))
+
+    if deleted:
+        result = db.execute(
+            delete(table).where(
+                table.c.order_item_id.in_(deleted),
+                table.c.version == _read_versions(existing, deleted, table)
+            )
+        )
+        if result.rowcount != len(deleted):
+            raise StaleDataError(f"Order items of order {order_id} were changed by someone else")
+
+    if changes or deleted:
+        record_order_changes(db, upserted=[order_id])
+        mark_order_totals_stale(db, [order_id])
+
+    summary = {
+        "updated": sorted(changes),
+        "created": created,
+        "deleted": deleted,
+        "unchanged": len(unchanged),
+    }
+    print(f" Items for order {order_id}: {len(changes)} updated, {created} created, "
+          f"{len(deleted)} deleted, {len(unchanged)} unchanged")
+    return summary
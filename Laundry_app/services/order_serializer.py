@@ -0,0 +1,162 @@
+# services/order_serializer.py
+"""
+Builds the OrderResponse-shaped dicts used by the order and staff routers.
+
+Users, addresses and items for a page of orders are loaded with one IN query
+each, and the result is plain dicts that can go straight to FastJSONResponse
+without being validated again by OrderResponse.
+"""
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlmodel import Session, select
+
+from models.address import Address
+from models.order import Order
+from models.order_item import OrderItem
+from models.user import User
+from utils.normalization import (
+    CATEGORY_NAMES, PRODUCT_NAMES, DB_TO_FRONTEND_ORDER_STATUS, DB_TO_FRONTEND_ITEM_STATUS,
+    normalize_items, normalize_service, normalize_order_status_value
+)
+
+# Output styles
+STAFF = "staff"        # staff app: normalized names, service and status
+CUSTOMER = "customer"  # customer app list: statuses mapped for the app
+RAW = "raw"            # values as stored
+
+ADDRESS_FIELDS = ("address_line1", "address_line2", "city", "state", "pincode")
+
+
+def _raw_items(items: Iterable[OrderItem], status_map: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    result = []
+    for item in items:
+        category = (item.category_name or "").strip()
+        product = (item.product_name or "").strip()
+        result.append({
+            "category_name": CATEGORY_NAMES.get(category, category),
+            "product_name": PRODUCT_NAMES.get(product, product),
+            "quantity": item.quantity,
+            "service": item.service,
+            "status": status_map.get(item.status, "pending") if status_map is not None else item.status,
+            "order_item_id": item.order_item_id,
+            "order_id": item.order_id,
+            "created_at": item.created_at,
+            "updated_at": item.updated_at,
+            "version": item.version,
+        })
+    return result
+
+
+def _staff_items(items: Iterable[OrderItem]) -> List[Dict[str, Any]]:
+    result = normalize_items(items)
+    for item in result:
+        # OrderItemResponse does not expose the audit columns
+        item.pop("created_by", None)
+        item.pop("updated_by", None)
+    return result
+
+
+def load_related(db: Session, orders: List[Order], item_model=OrderItem):
+    """Batch-load users, addresses and items for the given orders (3 queries)"""
+    if not orders:
+        return {}, {}, {}
+
+    user_ids = {order.user_id for order in orders}
+    address_ids = {order.address_id for order in orders}
+    order_ids = [order.order_id for order in orders]
+
+    users = {
+        user.user_id: user
+        for user in db.exec(select(User).where(User.user_id.in_(user_ids))).all()
+    }
+    addresses = {
+        address.address_id: address
+        for address in db.exec(select(Address).where(Address.address_id.in_(address_ids))).all()
+    }
+    items_by_order = defaultdict(list)
+    items = db.exec(
+        select(item_model).where(item_model.order_id.in_(order_ids)).order_by(item_model.order_item_id)
+    ).all()
+    for item in items:
+        items_by_order[item.order_id].append(item)
+
+    return users, addresses, items_by_order
+
+
+def build_order_dict(
+    order: Order,
+    user: Optional[User],
+    address: Optional[Address],
+    items: List[OrderItem],
+    style: str = RAW
+) -> Dict[str, Any]:
+    """Build one OrderResponse-shaped dict from already loaded rows"""
+    if style == STAFF:
+        status = normalize_order_status_value(order.status)
+        service = normalize_service(order.service)
+        items_response = _staff_items(items)
+        missing_address = ""
+    elif style == CUSTOMER:
+        status = DB_TO_FRONTEND_ORDER_STATUS.get(order.status, order.status)
+        service = order.service
+        items_response = _raw_items(items, DB_TO_FRONTEND_ITEM_STATUS)
+        missing_address = None
+    else:
+        status = order.status
+        service = order.service
+        items_response = _raw_items(items)
+        missing_address = None
+
+    address_details = None
+    if address:
+        address_details = {field: getattr(address, field) for field in ADDRESS_FIELDS}
+
+    data = {
+        "order_id": order.order_id,
+        "user_id": order.user_id,
+        "address_id": order.address_id,
+        "Token_no": order.Token_no,
+        "service": service,
+        "status": status,
+        "created_at": order.created_at,
+        "updated_at": order.updated_at,
+        "created_by": order.created_by,
+        "updated_by": order.updated_by,
+        "version": order.version,
+        "picked_at": order.picked_at,
+        "delivered_at": order.delivered_at,
+        "cancelled_at": order.cancelled_at,
+        "picked_by": order.picked_by,
+        "delivered_by": order.delivered_by,
+        "cancelled_by": order.cancelled_by,
+        "user_name": user.name if user else None,
+        "user_mobile": user.mobile_no if user else None,
+        "address_details": address_details,
+        "items": items_response,
+        "order_items": items_response,
+    }
+    for field in ADDRESS_FIELDS:
+        data[field] = address_details[field] if address_details else missing_address
+
+    return data
+
+
+def serialize_orders(db: Session, orders: List[Order], style: str = RAW, item_model=OrderItem) -> List[Dict[str, Any]]:
+    """Serialize a page of orders with batched child loading (item_model: OrderItemHistory for history)"""
+    users, addresses, items_by_order = load_related(db, orders, item_model)
+    return [
+        build_order_dict(
+            order,
+            users.get(order.user_id),
+            addresses.get(order.address_id),
+            items_by_order.get(order.order_id, []),
+            style
+        )
+        for order in orders
+    ]
+
+
+def serialize_order(db: Session, order: Order, style: str = RAW) -> Dict[str, Any]:
+    """Serialize a single order"""
+    return serialize_orders(db, [order], style)[0]
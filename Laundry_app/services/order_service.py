@@ -1,5 +1,7 @@
 from sqlmodel import Session, select
-from typing import List, Optional
+from sqlalchemy import DateTime, delete, exists, func, insert
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
 from models.order import Order, OrderStatus
 from models.order_item import OrderItem
 from models.pickup_delivery import PickupDelivery, ServiceType
@@ -10,6 +12,34 @@ from datetime import datetime, timedelta
 from models.order_archive import OrderArchive, OrderItemsArchive, DeletionReason
 from models.user import User
 import json
+from models.order_token_suffix import OrderTokenSuffix
+from services.token_lookup_service import index_tokens
+from services.customer_summary_service import record_order_states
+from services.order_change_service import record_order_changes
+from services.order_totals_service import mark_order_totals_stale
+from services.order_history_service import referencing_tables
+from services.archive_payload_service import ARCHIVE_FORMAT_VERSION, archive_contents, encode_archive
+
+ARCHIVE_CHUNK_SIZE = 200
+
+
+def _snapshot(row) -> Dict[str, Any]:
+    """JSON-safe copy of a table row (datetimes as ISO strings)"""
+    return {key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()}
+
+
+def _from_snapshot(data: Dict[str, Any], table) -> Dict[str, Any]:
+    """Row values for `table` from a snapshot, parsing datetime columns back"""
+    row = {}
+    for column in table.columns:
+        if column.name not in data:
+            continue
+        value = data[column.name]
+        if isinstance(value, str) and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        row[column.name] = value
+    return row
+
 
 class OrderService:
     def create_complete_order(
@@ -54,7 +84,6 @@ class OrderService:
             order.updated_at = datetime.utcnow()
             db.add(order)
             db.commit()
-            db.refresh(order)
         return order
     
     def schedule_delivery(self, db: Session, order_id: int, delivery_date: datetime) -> Optional[PickupDelivery]:
@@ -77,54 +106,133 @@ class OrderService:
         """
         Soft delete order by moving to archive and then deleting from main tables
         """
-        # Get the order with items
-        order = db.get(Order, order_id)
-        if not order:
+        if not db.get(Order, order_id):
             raise ValueError("Order not found")
-        
-        # Get all order items
-        order_items = db.exec(
-            select(OrderItem).where(OrderItem.order_id == order_id)
-        ).all()
-        
-        # Create archive record
-        archive_order = OrderArchive(
-            original_order_id=order_id,
-            user_id=order.user_id,
-            order_data=order.dict(),  # Store complete order data
-            order_items_data={
-                "items": [item.dict() for item in order_items],
-                "total_items": len(order_items),
-                "total_amount": order.total_amount
-            },
-            deletion_reason=deletion_reason,
-            deleted_by=deleted_by.user_id,
-            deleted_by_role=deleted_by.role,
-            notes=notes
+
+        result = OrderService.archive_orders(
+            db, deletion_reason, deleted_by, order_ids=[order_id], notes=notes
         )
-        
-        db.add(archive_order)
-        db.flush()  # Get the archive ID without committing
-        
-        # Archive individual items
-        for item in order_items:
-            archive_item = OrderItemsArchive(
-                original_item_id=item.id,
-                original_order_id=order_id,
-                archive_order_id=archive_order.id,
-                item_data=item.dict()
-            )
-            db.add(archive_item)
-        
-        # Delete from main tables
-        for item in order_items:
-            db.delete(item)
-        
-        db.delete(order)
+        if not result["archived"]:
+            raise ValueError("Order is still referenced by pickups/deliveries or feedback")
+
+        return db.exec(
+            select(OrderArchive)
+            .where(OrderArchive.original_order_id == order_id)
+            .order_by(OrderArchive.id.desc())
+        ).first()
+
+    @staticmethod
+    def archive_orders(
+        db: Session,
+        deletion_reason: DeletionReason,
+        deleted_by: User,
+        order_ids: Optional[List[int]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        status: Optional[str] = None,
+        notes: Optional[str] = None,
+        chunk_size: int = ARCHIVE_CHUNK_SIZE,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Archive many orders, given by id or by a created_at range / status.
+
+        Orders are handled in chunks of `chunk_size`, each in its own
+        transaction: orders and items are read with one query each, the
+        archives are encoded in one pass (services/archive_payload_service.py)
+        and written with one multi-row INSERT, then items, token suffixes and
+        orders are removed with set-based DELETEs. `progress(done, total)` is
+        called after each chunk.
+        """
+        statement = select(Order.order_id)
+        if order_ids is not None:
+            statement = statement.where(Order.order_id.in_(set(order_ids)))
+        if date_from:
+            statement = statement.where(Order.created_at >= date_from)
+        if date_to:
+            statement = statement.where(Order.created_at <= date_to)
+        if status:
+            statement = statement.where(Order.status == status)
+
+        # Orders still referenced by pickups/deliveries or feedback are skipped
+        archivable = statement
+        for table in referencing_tables(db):
+            archivable = archivable.where(~exists().where(table.c.order_id == Order.order_id))
+
+        not_found = []
+        if order_ids is not None:
+            matched = set(db.exec(statement).all())
+            not_found = sorted(set(order_ids) - matched)
+
+        total = db.exec(select(func.count()).select_from(archivable.subquery())).one()
+        skipped = db.exec(statement.where(Order.order_id.not_in(archivable))).all()
+        print(f" Archiving {total} orders in chunks of {chunk_size} ({len(skipped)} referenced, skipped)")
+
+        archived = 0
+        last_id = 0
+        while archived < total:
+            chunk = db.exec(
+                archivable.where(Order.order_id > last_id).order_by(Order.order_id).limit(chunk_size)
+            ).all()
+            if not chunk:
+                break
+            archived += OrderService._archive_chunk(db, chunk, deletion_reason, deleted_by, notes)
+            last_id = chunk[-1]
+            print(f" Archived {archived}/{total} orders")
+            if progress:
+                progress(archived, total)
+
+        return {"archived": archived, "skipped": list(skipped), "not_found": not_found}
+
+    @staticmethod
+    def _archive_chunk(
+        db: Session,
+        order_ids: List[int],
+        deletion_reason: DeletionReason,
+        deleted_by: User,
+        notes: Optional[str]
+    ) -> int:
+        orders_table = Order.__table__
+        items_table = OrderItem.__table__
+        now = datetime.utcnow()
+
+        orders = db.execute(select(orders_table).where(orders_table.c.order_id.in_(order_ids))).mappings().all()
+        items_by_order = defaultdict(list)
+        for item in db.execute(
+            select(items_table).where(items_table.c.order_id.in_(order_ids)).order_by(items_table.c.order_item_id)
+        ).mappings().all():
+            items_by_order[item["order_id"]].append(item)
+
+        archive_rows = [
+            {
+                "original_order_id": order["order_id"],
+                "user_id": order["user_id"],
+                "payload": encode_archive(
+                    _snapshot(order),
+                    [_snapshot(item) for item in items_by_order.get(order["order_id"], [])]
+                ),
+                "payload_version": ARCHIVE_FORMAT_VERSION,
+                "deletion_reason": deletion_reason,
+                "deleted_by": deleted_by.user_id,
+                "deleted_by_role": deleted_by.role,
+                "notes": notes,
+                "deleted_at": now,
+            }
+            for order in orders
+        ]
+        if not archive_rows:
+            return 0
+        db.execute(insert(OrderArchive.__table__), archive_rows)
+
+        suffixes = OrderTokenSuffix.__table__
+        db.execute(delete(items_table).where(items_table.c.order_id.in_(order_ids)))
+        db.execute(delete(suffixes).where(suffixes.c.order_id.in_(order_ids)))
+        db.execute(delete(orders_table).where(orders_table.c.order_id.in_(order_ids)))
+        record_order_states(db, before=orders)
+        record_order_changes(db, deleted=[order["order_id"] for order in orders])
         db.commit()
-        
-        return archive_order
-    
+        return len(orders)
+
     @staticmethod
     def get_archived_orders(
         db: Session,
@@ -160,40 +268,101 @@ class OrderService:
     @staticmethod
     def restore_order_from_archive(db: Session, archive_id: int):
         """Restore an order from archive (admin only)"""
-        archived_order = db.get(OrderArchive, archive_id)
-        if not archived_order:
+        result = OrderService.restore_orders(db, [archive_id])
+        if result["not_found"]:
             raise ValueError("Archived order not found")
-        
-        # Check if original order ID still exists
-        existing_order = db.get(Order, archived_order.original_order_id)
-        if existing_order:
-            raise ValueError("Original order ID already exists in active orders")
-        
-        # Restore order
-        order_data = archived_order.order_data
-        order = Order(**order_data)
-        db.add(order)
-        db.flush()
-        
-        # Restore order items
-        archived_items = db.exec(
-            select(OrderItemsArchive).where(
-                OrderItemsArchive.archive_order_id == archive_id
-            )
-        ).all()
-        
-        for archived_item in archived_items:
-            item_data = archived_item.item_data
-            item_data['order_id'] = order.id  # Update with new order ID
-            order_item = OrderItem(**item_data)
-            db.add(order_item)
-        
-        # Delete from archive
-        for archived_item in archived_items:
-            db.delete(archived_item)
-        db.delete(archived_order)
-        
+        if result["conflicts"]:
+            raise ValueError(result["conflicts"][0]["reason"])
+        return db.get(Order, result["restored"][0])
+
+    @staticmethod
+    def restore_orders(
+        db: Session,
+        archive_ids: List[int],
+        chunk_size: int = ARCHIVE_CHUNK_SIZE,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Restore many archived orders, chunk by chunk.
+
+        Archives whose order id or Token_no has since been taken by an active
+        order stay in the archive and are reported in "conflicts".
+        """
+        archive_ids = list(dict.fromkeys(archive_ids))
+        existing = set(db.exec(select(OrderArchive.id).where(OrderArchive.id.in_(archive_ids))).all())
+        pending = [archive_id for archive_id in archive_ids if archive_id in existing]
+
+        restored: List[int] = []
+        conflicts: List[Dict[str, Any]] = []
+        for start in range(0, len(pending), chunk_size):
+            archives = db.exec(
+                select(OrderArchive).where(OrderArchive.id.in_(pending[start:start + chunk_size]))
+            ).all()
+            restored.extend(OrderService._restore_chunk(db, archives, conflicts))
+            done = min(start + chunk_size, len(pending))
+            print(f" Restored {len(restored)} orders ({done}/{len(pending)} archives processed)")
+            if progress:
+                progress(done, len(pending))
+
+        return {
+            "restored": restored,
+            "conflicts": conflicts,
+            "not_found": [archive_id for archive_id in archive_ids if archive_id not in existing],
+        }
+
+    @staticmethod
+    def _restore_chunk(db: Session, archives: List[OrderArchive], conflicts: List[Dict[str, Any]]) -> List[int]:
+        orders_table = Order.__table__
+        items_table = OrderItem.__table__
+
+        contents = {archive.id: archive_contents(archive) for archive in archives}
+        order_ids = [archive.original_order_id for archive in archives]
+        tokens = [order_data.get("Token_no") for order_data, _ in contents.values()]
+        taken_ids = set(db.exec(select(Order.order_id).where(Order.order_id.in_(order_ids))).all())
+        taken_tokens = set(db.exec(select(Order.Token_no).where(Order.Token_no.in_(tokens))).all())
+
+        order_rows = []
+        item_rows = []
+        restored_archives = []
+        for archive in archives:
+            order_data, order_items_data = contents[archive.id]
+            order = _from_snapshot(order_data, orders_table)
+            order["order_id"] = archive.original_order_id
+            if order["order_id"] in taken_ids:
+                conflicts.append({"archive_id": archive.id, "reason": "Original order ID already exists in active orders"})
+                continue
+            if order.get("Token_no") in taken_tokens:
+                conflicts.append({"archive_id": archive.id, "reason": f"Token_no {order['Token_no']} is in use by an active order"})
+                continue
+
+            order_rows.append(order)
+            restored_archives.append(archive)
+            for item_data in order_items_data.get("items", []):
+                item = _from_snapshot(item_data, items_table)
+                # Item ids are reassigned; the order keeps its original id
+                item.pop("order_item_id", None)
+                item["order_id"] = order["order_id"]
+                item_rows.append(item)
+
+        if not order_rows:
+            return []
+
+        db.execute(insert(orders_table), order_rows)
+        if item_rows:
+            db.execute(insert(items_table), item_rows)
+        index_tokens(db, [(order["order_id"], order.get("Token_no")) for order in order_rows])
+
+        restored_ids = [archive.id for archive in restored_archives]
+        db.execute(delete(OrderItemsArchive.__table__).where(OrderItemsArchive.archive_order_id.in_(restored_ids)))
+        db.execute(delete(OrderArchive.__table__).where(OrderArchive.id.in_(restored_ids)))
+        record_order_states(db, after=order_rows)
+        record_order_changes(db, upserted=[order["order_id"] for order in order_rows])
+        # Archives written before stored totals existed carry none
+        mark_order_totals_stale(db, [order["order_id"] for order in order_rows])
         db.commit()
-        return order
-    
+        # Archive rows were deleted with a Core statement; drop them from the session
+        for archive in restored_archives:
+            db.expunge(archive)
+        return [order["order_id"] for order in order_rows]
+
 order_service = OrderService()
\ No newline at end of file
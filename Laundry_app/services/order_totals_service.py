@@ -0,0 +1,237 @@
+# services/order_totals_service.py
+"""
+Stored order totals: Order.total_amount, item_count and total_quantity.
+
+Listings, dashboards and revenue queries read these columns instead of
+aggregating order_items. They are kept in step on write: ORM changes to
+items are noted by a flush listener, Core item writers call
+mark_order_totals_stale(), and just before the commit the noted orders are
+recomputed with one grouped SELECT and one executemany UPDATE, inside the
+same transaction.
+
+repair_order_totals() recomputes stored totals in batches and fixes any
+that drifted (rows written outside the application, or NULL totals after
+the columns were added). The history job runs it incrementally, over the
+orders in the change log since its previous run.
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import bindparam, event, func, inspect, or_, update
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import Session, select
+
+from models.order import Order
+from models.order_item import OrderItem
+from services.customer_summary_service import record_order_states
+
+_STALE_KEY = "stale_total_order_ids"
+
+REPAIR_BATCH_SIZE = 1000
+
+TOTAL_FIELDS = ("total_amount", "item_count", "total_quantity")
+
+# Item columns the totals depend on
+_ITEM_FIELDS = ("order_id", "quantity", "unit_price")
+
+_EMPTY_TOTALS = (0.0, 0, 0)
+
+
+def mark_order_totals_stale(db: Session, order_ids: Iterable[int]):
+    """Queue orders whose stored totals must be recomputed before the next commit"""
+    db.info.setdefault(_STALE_KEY, set()).update(order_ids)
+
+
+def mark_order_totals_fresh(db: Session, order_ids: Iterable[int]):
+    """Take orders whose totals the caller has just stored off the refresh queue"""
+    db.info.get(_STALE_KEY, set()).difference_update(order_ids)
+
+
+def item_totals(items: Iterable[OrderItem]) -> Tuple[float, int, int]:
+    """(total_amount, item_count, total_quantity) of item objects already in hand"""
+    items = list(items)
+    return (
+        round(sum(item.quantity * item.unit_price for item in items), 2),
+        len(items),
+        sum(item.quantity for item in items)
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stale_totals(session, flush_context):
+    order_ids = set()
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, OrderItem):
+            order_ids.add(obj.order_id)
+    for obj in session.dirty:
+        if isinstance(obj, OrderItem):
+            state = inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in _ITEM_FIELDS):
+                order_ids.add(obj.order_id)
+                # An item moved to another order changes the old order too
+                order_ids.update(state.attrs.order_id.history.deleted)
+    order_ids.discard(None)
+    if order_ids:
+        mark_order_totals_stale(session, order_ids)
+
+
+def _refresh_stale_totals(session):
+    # Pending ORM changes are flushed first so their items are counted
+    session.flush()
+    order_ids = session.info.pop(_STALE_KEY, set())
+    order_ids.discard(None)
+    if order_ids:
+        refresh_order_totals(session, order_ids)
+
+
+# Runs ahead of the other before_commit listeners so customer summaries
+# are computed from up-to-date totals
+event.listen(Session, "before_commit", _refresh_stale_totals, insert=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_totals(session):
+    session.info.pop(_STALE_KEY, None)
+
+
+def compute_order_totals(
+    db: Session,
+    order_ids: Iterable[int],
+    item_model=OrderItem
+) -> Dict[int, Tuple[float, int, int]]:
+    """(total_amount, item_count, total_quantity) per order, from its items"""
+    order_ids = list(order_ids)
+    totals = {order_id: _EMPTY_TOTALS for order_id in order_ids}
+    if not order_ids:
+        return totals
+
+    rows = db.exec(
+        select(
+            item_model.order_id,
+            func.coalesce(func.sum(item_model.quantity * item_model.unit_price), 0),
+            func.count(item_model.order_item_id),
+            func.coalesce(func.sum(item_model.quantity), 0)
+        )
+        .where(item_model.order_id.in_(order_ids))
+        .group_by(item_model.order_id)
+    ).all()
+    for order_id, amount, count, quantity in rows:
+        totals[order_id] = (round(float(amount), 2), int(count), int(quantity))
+    return totals
+
+
+def _write_totals(db: Session, totals: Dict[int, Tuple[float, int, int]], order_model=Order):
+    """One executemany UPDATE, mirrored onto Order objects loaded in the session"""
+    if not totals:
+        return
+    table = order_model.__table__
+    db.execute(
+        update(table)
+        .where(table.c.order_id == bindparam("target_order_id"))
+        .values(
+            total_amount=bindparam("new_total_amount"),
+            item_count=bindparam("new_item_count"),
+            total_quantity=bindparam("new_total_quantity")
+        ),
+        [
+            {
+                "target_order_id": order_id,
+                "new_total_amount": amount,
+                "new_item_count": count,
+                "new_total_quantity": quantity,
+            }
+            for order_id, (amount, count, quantity) in totals.items()
+        ]
+    )
+    if order_model is not Order:
+        return
+    for order_id, values in totals.items():
+        order = db.identity_map.get(db.identity_key(Order, order_id))
+        if order is not None:
+            for field, value in zip(TOTAL_FIELDS, values):
+                set_committed_value(order, field, value)
+
+
+def refresh_order_totals(db: Session, order_ids: Iterable[int]):
+    """Recompute and store totals for the given orders (not committed)"""
+    rows = db.exec(
+        select(
+            Order.order_id,
+            Order.user_id,
+            Order.status,
+            Order.total_amount,
+            func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price), 0),
+            func.count(OrderItem.order_item_id),
+            func.coalesce(func.sum(OrderItem.quantity), 0)
+        )
+        .outerjoin(OrderItem, OrderItem.order_id == Order.order_id)
+        .where(Order.order_id.in_(list(order_ids)))
+        .group_by(Order.order_id, Order.user_id, Order.status, Order.total_amount)
+    ).all()
+    totals = {
+        order_id: (round(float(amount), 2), int(count), int(quantity))
+        for order_id, _, _, _, amount, count, quantity in rows
+    }
+    _write_totals(db, totals)
+
+    # Customer summaries follow the change in spend
+    before = [
+        {"order_id": order_id, "user_id": user_id, "status": order_status, "total_amount": total_amount}
+        for order_id, user_id, order_status, total_amount, *_ in rows
+        if total_amount != totals[order_id][0]
+    ]
+    record_order_states(
+        db,
+        before=before,
+        after=[dict(state, total_amount=totals[state["order_id"]][0]) for state in before]
+    )
+
+
+def repair_order_totals(
+    db: Session,
+    only_missing: bool = False,
+    order_ids: Optional[Iterable[int]] = None,
+    batch_size: int = REPAIR_BATCH_SIZE,
+    max_batches: Optional[int] = None,
+    order_model=Order,
+    item_model=OrderItem
+) -> int:
+    """
+    Recompute stored totals batch by batch and fix the ones that differ.
+
+    With only_missing, just the orders whose totals were never filled in
+    are visited; with order_ids, just those orders. Pass OrderHistory /
+    OrderItemHistory to repair the history tier. Each batch is committed on
+    its own; returns how many orders were corrected.
+    """
+    statement = select(order_model.order_id, *[getattr(order_model, field) for field in TOTAL_FIELDS])
+    if only_missing:
+        statement = statement.where(or_(*[getattr(order_model, field).is_(None) for field in TOTAL_FIELDS]))
+    if order_ids is not None:
+        statement = statement.where(order_model.order_id.in_(list(order_ids)))
+
+    repaired = 0
+    batches = 0
+    last_id = 0
+    while max_batches is None or batches < max_batches:
+        rows = db.exec(
+            statement.where(order_model.order_id > last_id).order_by(order_model.order_id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        computed = compute_order_totals(db, [row[0] for row in rows], item_model)
+        drifted = {
+            order_id: computed[order_id]
+            for order_id, amount, count, quantity in rows
+            if amount is None or round(float(amount), 2) != computed[order_id][0]
+            or count != computed[order_id][1] or quantity != computed[order_id][2]
+        }
+        if drifted:
+            _write_totals(db, drifted, order_model)
+            db.commit()
+            repaired += len(drifted)
+        batches += 1
+        last_id = rows[-1][0]
+
+    if repaired:
+        print(f" Order totals: repaired {repaired} rows in {order_model.__tablename__}")
+    return repaired
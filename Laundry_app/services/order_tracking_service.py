@@ -0,0 +1,164 @@
+# services/order_tracking_service.py
+"""
+Public order tracking by Token_no.
+
+Customers poll their order status many times a day. Lookups are served
+from a bounded LRU of ready-to-send JSON bodies with their ETags, so a hit
+costs no query and no serialization. A miss reads one order row by the
+unique Token_no index (falling back to order_history for orders the
+history job has moved) and fills the cache.
+
+Entries are dropped when a commit changes their order (through the order
+change log hook) and expire after TRACKING_CACHE_TTL_SECONDS, which bounds
+staleness from writes made in other workers.
+
+Tokens that match no order are remembered as MISSING for
+TRACKING_MISS_TTL_SECONDS in a separate LRU of the same size, so probing
+random tokens costs no queries and cannot evict real entries.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from core.config import settings
+from core.responses import dumps
+from db.session import SessionLocal
+from models.order import Order
+from models.order_history import OrderHistory
+from services.order_change_service import on_orders_committed
+from services.token_lookup_service import normalize_token_query
+
+# Cached answer for a token that matches no order
+MISSING = object()
+
+TRACKING_FIELDS = (
+    "Token_no", "status", "service", "item_count", "total_quantity",
+    "created_at", "updated_at", "picked_at", "delivered_at", "cancelled_at",
+)
+
+
+class TrackingEntry:
+    __slots__ = ("order_id", "body", "etag", "expires")
+
+    def __init__(self, order_id: int, body: bytes, expires: float):
+        self.order_id = order_id
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        self.expires = expires
+
+
+class TrackingCache:
+    """LRU of Token_no -> TrackingEntry, at most max_entries"""
+
+    def __init__(self, max_entries: int = 20000, ttl: float = 15, miss_ttl: float = 30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self._entries: "OrderedDict[str, TrackingEntry]" = OrderedDict()
+        self._missing: "OrderedDict[str, float]" = OrderedDict()
+        self._tokens_by_order: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; a load that started before one is not cached
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.missing_hits = 0
+
+    def get(self, token_no: str):
+        """The cached TrackingEntry, MISSING for a known-unknown token, else None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token_no)
+            if entry is not None and entry.expires > now:
+                self._entries.move_to_end(token_no)
+                self.hits += 1
+                return entry
+            if self._missing.get(token_no, 0) > now:
+                self.missing_hits += 1
+                return MISSING
+            self.misses += 1
+            return None
+
+    def put_missing(self, token_no: str, generation: int):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._missing[token_no] = time.monotonic() + self.miss_ttl
+            self._missing.move_to_end(token_no)
+            while len(self._missing) > self.max_entries:
+                self._missing.popitem(last=False)
+
+    def put(self, token_no: str, order_id: int, body: bytes, generation: int) -> TrackingEntry:
+        entry = TrackingEntry(order_id, body, time.monotonic() + self.ttl)
+        with self._lock:
+            if generation != self.generation:
+                return entry
+            self._entries[token_no] = entry
+            self._entries.move_to_end(token_no)
+            self._missing.pop(token_no, None)
+            self._tokens_by_order[order_id] = token_no
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._tokens_by_order.pop(evicted.order_id, None)
+        return entry
+
+    def invalidate(self, order_ids: Iterable[int]):
+        with self._lock:
+            self.generation += 1
+            for order_id in order_ids:
+                token_no = self._tokens_by_order.pop(order_id, None)
+                if token_no is not None:
+                    self._entries.pop(token_no, None)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "missing": len(self._missing),
+            "hits": self.hits,
+            "missing_hits": self.missing_hits,
+            "misses": self.misses,
+        }
+
+
+tracking_cache = TrackingCache(
+    settings.TRACKING_CACHE_SIZE, settings.TRACKING_CACHE_TTL_SECONDS, settings.TRACKING_MISS_TTL_SECONDS
+)
+on_orders_committed(tracking_cache.invalidate)
+
+
+def _load_tracking(db: Session, token_no: str) -> Optional[Tuple[int, dict]]:
+    for model in (Order, OrderHistory):
+        row = db.exec(
+            select(model.order_id, *[getattr(model, field) for field in TRACKING_FIELDS])
+            .where(model.Token_no == token_no)
+        ).first()
+        if row is not None:
+            return row[0], dict(zip(TRACKING_FIELDS, row[1:]))
+    return None
+
+
+def cached_tracking(token_no: str):
+    """Tracking entry or MISSING from the cache only (no database access); None if not cached"""
+    return tracking_cache.get(normalize_token_query(token_no))
+
+
+def load_tracking(token_no: str) -> Optional[TrackingEntry]:
+    """
+    Read the order from the primary and cache it; None if the token is unknown.
+
+    The primary rather than the replica: a replica read racing a commit
+    could put a superseded status back into the cache.
+    """
+    token_no = normalize_token_query(token_no)
+    generation = tracking_cache.generation
+    with SessionLocal() as db:
+        loaded = _load_tracking(db, token_no)
+    if loaded is None:
+        tracking_cache.put_missing(token_no, generation)
+        return None
+    order_id, payload = loaded
+    return tracking_cache.put(token_no, order_id, dumps(payload), generation)
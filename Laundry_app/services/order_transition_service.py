@@ -0,0 +1,203 @@
+# services/order_transition_service.py
+"""
+Batch status transitions for orders and their items.
+
+Allowed moves are declared once in ORDER_TRANSITIONS / ITEM_TRANSITIONS.
+A batch is validated against them in memory, then applied with one UPDATE
+of orders and one UPDATE of order_items per target status, all in the
+caller's transaction.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import or_, update
+from sqlmodel import Session, select
+
+from models.order import Order, OrderStatus
+from models.order_item import OrderItem, OrderItemStatus
+from utils.normalization import ORDER_STATUSES
+from services.customer_summary_service import record_order_states
+from services.order_change_service import record_order_changes
+
+# ========== STATE MACHINES ==========
+
+_IN_PROCESS = {OrderStatus.IN_PROGRESS, OrderStatus.PROCESSED, OrderStatus.READY}
+
+ORDER_TRANSITIONS = {
+    OrderStatus.PENDING: {OrderStatus.CONFIRMED, OrderStatus.CANCELLED},
+    OrderStatus.CONFIRMED: {OrderStatus.PICKED_UP, OrderStatus.IN_PROGRESS, OrderStatus.CANCELLED},
+    OrderStatus.PICKED_UP: _IN_PROCESS | {OrderStatus.COMPLETED, OrderStatus.CANCELLED},
+    OrderStatus.IN_PROGRESS: {OrderStatus.PROCESSED, OrderStatus.READY, OrderStatus.COMPLETED, OrderStatus.CANCELLED},
+    OrderStatus.PROCESSED: {OrderStatus.READY, OrderStatus.COMPLETED, OrderStatus.CANCELLED},
+    OrderStatus.READY: {OrderStatus.COMPLETED},
+    OrderStatus.COMPLETED: set(),
+    OrderStatus.CANCELLED: set(),
+}
+
+ITEM_TRANSITIONS = {
+    OrderItemStatus.PENDING: {OrderItemStatus.CONFIRMED, OrderItemStatus.PICKED, OrderItemStatus.CANCELLED, OrderItemStatus.REJECTED},
+    OrderItemStatus.CONFIRMED: {OrderItemStatus.PICKED, OrderItemStatus.PROCESSED, OrderItemStatus.CANCELLED, OrderItemStatus.REJECTED},
+    OrderItemStatus.PICKED: {OrderItemStatus.PROCESSED, OrderItemStatus.WASHED, OrderItemStatus.IRONED, OrderItemStatus.READY, OrderItemStatus.COMPLETED, OrderItemStatus.CANCELLED},
+    OrderItemStatus.PROCESSED: {OrderItemStatus.WASHED, OrderItemStatus.IRONED, OrderItemStatus.READY, OrderItemStatus.COMPLETED, OrderItemStatus.CANCELLED},
+    OrderItemStatus.WASHED: {OrderItemStatus.IRONED, OrderItemStatus.READY, OrderItemStatus.COMPLETED, OrderItemStatus.CANCELLED},
+    OrderItemStatus.IRONED: {OrderItemStatus.READY, OrderItemStatus.COMPLETED, OrderItemStatus.CANCELLED},
+    OrderItemStatus.READY: {OrderItemStatus.COMPLETED},
+    OrderItemStatus.COMPLETED: set(),
+    OrderItemStatus.CANCELLED: set(),
+    OrderItemStatus.REJECTED: set(),
+}
+
+# Item status that follows an order status (None: items are left alone)
+ORDER_TO_ITEM_STATUS = {
+    OrderStatus.CONFIRMED: OrderItemStatus.CONFIRMED,
+    OrderStatus.PICKED_UP: OrderItemStatus.PICKED,
+    OrderStatus.IN_PROGRESS: None,
+    OrderStatus.PROCESSED: OrderItemStatus.PROCESSED,
+    OrderStatus.READY: OrderItemStatus.READY,
+    OrderStatus.COMPLETED: OrderItemStatus.COMPLETED,
+    OrderStatus.CANCELLED: OrderItemStatus.CANCELLED,
+}
+
+# Item statuses that may move to each target, derived from ITEM_TRANSITIONS
+ITEM_SOURCES = defaultdict(set)
+for _source, _targets in ITEM_TRANSITIONS.items():
+    for _target in _targets:
+        ITEM_SOURCES[_target].add(_source.value)
+
+
+def parse_order_status(value) -> Optional[OrderStatus]:
+    """Map a stored or requested status string to OrderStatus, None if unknown"""
+    if not value:
+        return None
+    value = str(getattr(value, "value", value)).strip()
+    try:
+        status = OrderStatus(value)
+    except ValueError:
+        status = ORDER_STATUSES.get(value) or ORDER_STATUSES.get(value.lower())
+    # "picked" is the legacy spelling of picked_up
+    if status == OrderStatus.PICKED:
+        return OrderStatus.PICKED_UP
+    return status
+
+
+def can_transition(current: Optional[OrderStatus], target: OrderStatus) -> bool:
+    if current is None:
+        return False
+    return target in ORDER_TRANSITIONS.get(current, set())
+
+
+# ========== BATCH APPLY ==========
+
+def apply_transitions(db: Session, transitions: List[Any], updated_by: str) -> Dict[str, Any]:
+    """
+    Validate and apply a batch of (order_id or Token_no, status) transitions.
+
+    Valid transitions are applied together; invalid ones are reported in
+    "rejected" with a reason. Nothing is committed here.
+    """
+    order_ids = {t.order_id for t in transitions if t.order_id}
+    tokens = {t.Token_no for t in transitions if t.Token_no and not t.order_id}
+
+    conditions = []
+    if order_ids:
+        conditions.append(Order.order_id.in_(order_ids))
+    if tokens:
+        conditions.append(Order.Token_no.in_(tokens))
+
+    rows = []
+    if conditions:
+        # Lock the rows so the statuses checked here are the ones updated
+        rows = db.exec(
+            select(Order.order_id, Order.Token_no, Order.status, Order.user_id, Order.total_amount)
+            .where(or_(*conditions))
+            .with_for_update()
+        ).all()
+    by_id = {row.order_id: row for row in rows}
+    by_token = {row.Token_no: row for row in rows}
+
+    applied = []
+    rejected = []
+    targets = defaultdict(list)  # target status -> order ids
+    claimed = set()
+
+    for transition in transitions:
+        reference = transition.order_id or transition.Token_no
+        row = by_id.get(transition.order_id) if transition.order_id else by_token.get(transition.Token_no)
+        target = parse_order_status(transition.status)
+
+        if row is None:
+            rejected.append({"order": reference, "reason": "Order not found"})
+            continue
+        if target is None:
+            rejected.append({"order": reference, "reason": f"Unknown status '{transition.status}'"})
+            continue
+        if row.order_id in claimed:
+            rejected.append({"order": reference, "reason": "Order appears more than once in this batch"})
+            continue
+
+        current = parse_order_status(row.status)
+        if current == target:
+            rejected.append({"order": reference, "reason": f"Order is already {target.value}"})
+            continue
+        if not can_transition(current, target):
+            rejected.append({"order": reference, "reason": f"Cannot move from {row.status} to {target.value}"})
+            continue
+
+        claimed.add(row.order_id)
+        targets[target].append(row.order_id)
+        applied.append({
+            "order_id": row.order_id,
+            "Token_no": row.Token_no,
+            "user_id": row.user_id,
+            "from": row.status,
+            "to": target.value,
+        })
+
+    now = datetime.utcnow()
+    items_updated = 0
+    order_table = Order.__table__
+    item_table = OrderItem.__table__
+
+    for target, ids in targets.items():
+        values = {
+            "status": target.value,
+            "updated_at": now,
+            "updated_by": updated_by,
+            "version": order_table.c.version + 1,
+        }
+        if target == OrderStatus.PICKED_UP:
+            values.update(picked_at=now, picked_by=updated_by)
+        elif target == OrderStatus.COMPLETED:
+            values.update(delivered_at=now, delivered_by=updated_by)
+        elif target == OrderStatus.CANCELLED:
+            values.update(cancelled_at=now, cancelled_by=updated_by)
+
+        db.execute(update(order_table).where(order_table.c.order_id.in_(ids)).values(**values))
+        record_order_changes(db, upserted=ids)
+        before = [by_id[order_id]._asdict() for order_id in ids]
+        record_order_states(db, before=before, after=[dict(row, status=target.value) for row in before])
+
+        item_target = ORDER_TO_ITEM_STATUS.get(target)
+        if item_target is not None:
+            result = db.execute(
+                update(item_table)
+                .where(
+                    item_table.c.order_id.in_(ids),
+                    item_table.c.status.in_(ITEM_SOURCES[item_target])
+                )
+                .values(
+                    status=item_target.value,
+                    updated_at=now,
+                    updated_by=updated_by,
+                    version=item_table.c.version + 1
+                )
+            )
+            items_updated += result.rowcount
+
+    print(f" Transitions: {len(applied)} applied, {len(rejected)} rejected, {items_updated} items updated")
+    return {
+        "applied": applied,
+        "rejected": rejected,
+        "items_updated": items_updated,
+    }
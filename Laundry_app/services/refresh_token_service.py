@@ -0,0 +1,120 @@
+# services/refresh_token_service.py
+"""
+Rotating refresh tokens.
+
+Login hands out a refresh token next to the short-lived access token. When
+the access token expires the client exchanges the refresh token at
+/token/refresh for a new pair instead of logging in again, so no OTP is
+generated or sent and no password is hashed.
+
+Tokens are random and only their SHA-256 is stored (a slow password hash
+buys nothing for 256-bit random values). Each refresh revokes the
+presented token and issues its successor in the same family. Presenting a
+token that was already rotated means it was copied: the whole family is
+revoked and the user has to log in again.
+
+Logging out (/token/revoke) revokes the presented token's family; a password
+change or reset revokes every family of the user.
+"""
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, update
+from sqlmodel import Session, select
+
+from core.config import settings
+from models.refresh_token import RefreshToken
+from models.user import User
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_refresh_token(db: Session, user_id: int, family_id: Optional[str] = None) -> str:
+    """Store a new refresh token for the user (not committed) and return it"""
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        token_hash=_hash(token),
+        user_id=user_id,
+        family_id=family_id or secrets.token_hex(16),
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    return token
+
+
+def revoke_token_family(db: Session, family_id: str) -> int:
+    """Revoke every live token of a family (not committed)"""
+    table = RefreshToken.__table__
+    result = db.execute(
+        update(table)
+        .where(table.c.family_id == family_id, table.c.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    return result.rowcount
+
+
+def revoke_user_tokens(db: Session, user_id: Optional[int] = None) -> int:
+    """Revoke every live token of a user, or of all users when user_id is None (not committed)"""
+    table = RefreshToken.__table__
+    statement = update(table).where(table.c.revoked_at.is_(None))
+    if user_id is not None:
+        statement = statement.where(table.c.user_id == user_id)
+    return db.execute(statement.values(revoked_at=datetime.utcnow())).rowcount
+
+
+def revoke_refresh_token(db: Session, token: str) -> int:
+    """Revoke the family of a refresh token (logout), committed; unknown tokens are ignored"""
+    stored = db.exec(select(RefreshToken).where(RefreshToken.token_hash == _hash(token))).first()
+    if not stored:
+        return 0
+    revoked = revoke_token_family(db, stored.family_id)
+    db.commit()
+    return revoked
+
+
+def rotate_refresh_token(db: Session, token: str) -> Tuple[User, str]:
+    """
+    Exchange a refresh token for its successor.
+
+    Returns the user and the new refresh token, committed. Raises 401 for
+    unknown, expired or reused tokens; reuse also revokes the family.
+    """
+    stored = db.exec(
+        select(RefreshToken).where(RefreshToken.token_hash == _hash(token)).with_for_update()
+    ).first()
+    if not stored:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+
+    now = datetime.utcnow()
+    if stored.revoked_at is not None:
+        revoked = revoke_token_family(db, stored.family_id)
+        db.commit()
+        print(f" Refresh token reuse for user {stored.user_id}: revoked {revoked} tokens of family {stored.family_id}")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token was already used")
+
+    if stored.expires_at <= now:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token expired")
+
+    user = db.get(User, stored.user_id)
+    if not user or user.status != "active":
+        revoke_token_family(db, stored.family_id)
+        db.commit()
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Account is inactive")
+
+    stored.revoked_at = now
+    db.add(stored)
+    new_token = issue_refresh_token(db, stored.user_id, stored.family_id)
+    db.commit()
+    return user, new_token
+
+
+def prune_refresh_tokens(db: Session) -> int:
+    """Drop expired tokens"""
+    table = RefreshToken.__table__
+    result = db.execute(delete(table).where(table.c.expires_at < datetime.utcnow()))
+    db.commit()
+    return result.rowcount
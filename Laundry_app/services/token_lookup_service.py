@@ -0,0 +1,132 @@
+# services/token_lookup_service.py
+"""
+Token_no lookups for the counter.
+
+Exact and prefix matches go through the unique index on orders.Token_no.
+Partial tokens (any substring of 3+ characters) are matched through
+order_token_suffixes: every suffix of a token is stored once, so a
+substring is always the prefix of some suffix and `suffix LIKE 'abc%'`
+stays an index range scan instead of a full table scan.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, insert, or_
+from sqlmodel import Session, select
+
+from models.order import Order
+from models.order_token_suffix import OrderTokenSuffix
+
+MIN_PARTIAL_LENGTH = 3
+BACKFILL_BATCH_SIZE = 1000
+
+
+def normalize_token_query(query: Optional[str]) -> str:
+    return (query or "").strip().upper()
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def token_suffixes(token_no: str) -> List[str]:
+    """All proper suffixes of a token that are long enough to search by"""
+    token_no = normalize_token_query(token_no)
+    return [token_no[start:] for start in range(1, len(token_no) - MIN_PARTIAL_LENGTH + 1)]
+
+
+def index_tokens(db: Session, orders: Iterable[Tuple[int, str]]) -> int:
+    """Add suffix rows for (order_id, Token_no) pairs (not committed)"""
+    rows = [
+        {"suffix": suffix, "order_id": order_id}
+        for order_id, token_no in orders
+        if token_no
+        for suffix in token_suffixes(token_no)
+    ]
+    if rows:
+        db.execute(insert(OrderTokenSuffix.__table__), rows)
+    return len(rows)
+
+
+def token_search_ids(query: str, limit: Optional[int] = None):
+    """Subquery of order ids whose Token_no contains the query"""
+    statement = (
+        select(OrderTokenSuffix.order_id)
+        .where(OrderTokenSuffix.suffix.like(f"{escape_like(query)}%", escape="\\"))
+        .distinct()
+    )
+    if limit:
+        statement = statement.limit(limit)
+    return statement
+
+
+def token_search_filter(query: str):
+    """WHERE clause for orders whose Token_no contains the query"""
+    # Only proper suffixes are indexed, so whole tokens and prefixes are
+    # matched on Token_no itself
+    return or_(
+        Order.Token_no.like(f"{escape_like(query)}%", escape="\\"),
+        Order.order_id.in_(token_search_ids(query))
+    )
+
+
+def lookup_token(db: Session, query: str, limit: int = 20) -> Tuple[str, List[Order]]:
+    """
+    Find orders for a scanned or typed token.
+
+    Returns the match type ("exact", "prefix", "partial" or "none") and the
+    orders, newest first.
+    """
+    query = normalize_token_query(query)
+    if not query:
+        return "none", []
+
+    order = db.exec(select(Order).where(Order.Token_no == query)).first()
+    if order:
+        return "exact", [order]
+
+    orders = db.exec(
+        select(Order)
+        .where(Order.Token_no.like(f"{escape_like(query)}%", escape="\\"))
+        .order_by(Order.Token_no.desc())
+        .limit(limit)
+    ).all()
+    if orders:
+        return "prefix", orders
+
+    if len(query) < MIN_PARTIAL_LENGTH:
+        return "none", []
+
+    order_ids = db.exec(token_search_ids(query, limit)).all()
+    if not order_ids:
+        return "none", []
+
+    orders = db.exec(
+        select(Order).where(Order.order_id.in_(order_ids)).order_by(Order.created_at.desc())
+    ).all()
+    return ("partial" if orders else "none"), orders
+
+
+def backfill_token_index(db: Session) -> int:
+    """Index tokens of existing orders when the side table is still empty"""
+    if db.exec(select(func.count()).select_from(OrderTokenSuffix)).one():
+        return 0
+
+    indexed = 0
+    last_id = 0
+    while True:
+        batch = db.exec(
+            select(Order.order_id, Order.Token_no)
+            .where(Order.order_id > last_id)
+            .order_by(Order.order_id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not batch:
+            break
+        index_tokens(db, batch)
+        db.commit()
+        indexed += len(batch)
+        last_id = batch[-1][0]
+
+    if indexed:
+        print(f" Indexed Token_no suffixes for {indexed} existing orders")
+    return indexed
@@ -0,0 +1,123 @@
+# services/token_service.py
+"""
+Collision-free Token_no allocation.
+
+Every day has a counter row in order_token_counters. A worker reserves a block
+of sequence numbers with one short transaction on its own connection and hands
+them out from memory, so creating an order never reads the orders table and
+two counters can never receive the same token.
+
+Tokens keep the existing ORD<YYYYMMDD>-<6 chars> format. The sequence number is
+passed through a keyed permutation of the 6-char base36 space (a Feistel
+network with HMAC-SHA256 rounds, keyed by SECRET_KEY and the day), so tokens
+stay unique but cannot be predicted from other tokens: Token_no alone opens
+the public /track endpoint.
+"""
+import hashlib
+import hmac
+import string
+import threading
+from datetime import datetime
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from core.config import settings
+from models.order_token_counter import OrderTokenCounter
+
+TOKEN_ALPHABET = string.digits + string.ascii_uppercase
+TOKEN_LENGTH = 6
+TOKEN_SPACE = len(TOKEN_ALPHABET) ** TOKEN_LENGTH
+
+# The Feistel network permutes 32-bit values; values outside TOKEN_SPACE
+# (about half) are fed through again until they land inside it, which keeps
+# the mapping a bijection on TOKEN_SPACE
+_HALF_BITS = 16
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_ROUNDS = 4
+
+DEFAULT_BLOCK_SIZE = 20
+
+
+def _round_keys(day: str):
+    key = hmac.new(settings.SECRET_KEY.encode("utf-8"), f"token_no:{day}".encode("utf-8"), hashlib.sha256).digest()
+    return [key + bytes([number]) for number in range(_ROUNDS)]
+
+
+def _permute(value: int, round_keys) -> int:
+    left, right = value >> _HALF_BITS, value & _HALF_MASK
+    for round_key in round_keys:
+        mixed = int.from_bytes(hashlib.sha256(round_key + right.to_bytes(2, "big")).digest()[:2], "big")
+        left, right = right, left ^ mixed
+    return (left << _HALF_BITS) | right
+
+
+def encode_sequence(sequence: int, day: str = "") -> str:
+    """Encode a per-day sequence number as 6 base36 characters"""
+    round_keys = _round_keys(day)
+    value = _permute(sequence % TOKEN_SPACE, round_keys)
+    while value >= TOKEN_SPACE:
+        value = _permute(value, round_keys)
+    chars = []
+    for _ in range(TOKEN_LENGTH):
+        value, remainder = divmod(value, len(TOKEN_ALPHABET))
+        chars.append(TOKEN_ALPHABET[remainder])
+    return "".join(reversed(chars))
+
+
+def format_token(day: str, sequence: int) -> str:
+    return f"ORD{day}-{encode_sequence(sequence, day)}"
+
+
+class TokenAllocator:
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._day = None
+        self._next = 0
+        self._end = 0  # last sequence number in the reserved block
+
+    def _reserve_block(self, bind, day: str) -> int:
+        """Add block_size to the day's counter and return the new last value"""
+        table = OrderTokenCounter.__table__
+        bump = (
+            update(table)
+            .where(table.c.day == day)
+            .values(last_value=table.c.last_value + self.block_size)
+        )
+
+        with bind.begin() as conn:
+            if conn.execute(bump).rowcount == 0:
+                try:
+                    with conn.begin_nested():
+                        conn.execute(insert(table).values(day=day, last_value=self.block_size))
+                except IntegrityError:
+                    # Another worker created today's row first
+                    conn.execute(bump)
+            return conn.execute(select(table.c.last_value).where(table.c.day == day)).scalar_one()
+
+    def next_token(self, db: Session) -> str:
+        """Return the next unused Token_no for today"""
+        day = datetime.now().strftime("%Y%m%d")
+
+        with self._lock:
+            if self._day != day or self._next > self._end:
+                end = self._reserve_block(db.get_bind(), day)
+                self._day = day
+                self._next = end - self.block_size + 1
+                self._end = end
+                print(f" Reserved token block {self._next}-{self._end} for {day}")
+
+            sequence = self._next
+            self._next += 1
+
+        return format_token(day, sequence)
+
+
+token_allocator = TokenAllocator()
+
+
+def generate_token_no(db: Session) -> str:
+    """Allocate a unique Token_no without querying the orders table"""
+    return token_allocator.next_token(db)
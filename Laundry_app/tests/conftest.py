@@ -0,0 +1,43 @@
+# tests/conftest.py
+"""
+Fixtures for the test suite: an in-memory SQLite database with the app's
+tables and session listeners, and a counter of the statements sent to it.
+Both come from the benchmark harness (benchmarks/_harness.py).
+
+Run from Laundry_app/: `python -m pytest tests`.
+"""
+import os
+import sys
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from benchmarks._harness import make_database
+
+
+@pytest.fixture
+def database():
+    """(engine, sessionmaker, counter) as make_database() returns them"""
+    engine, Local, counter = make_database()
+    yield engine, Local, counter
+    engine.dispose()
+
+
+@pytest.fixture
+def engine(database):
+    return database[0]
+
+
+@pytest.fixture
+def db(database):
+    """A session configured like SessionLocal (expire_on_commit=False)"""
+    with database[1]() as session:
+        yield session
+
+
+@pytest.fixture
+def statements(database):
+    return database[2]
@@ -0,0 +1,78 @@
+# tests/test_customer_summaries.py
+"""
+Customer summaries are updated with deltas in the writing transaction and
+always match a full recompute.
+"""
+import contextlib
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from models.address import Address
+from models.customer_order_summary import CustomerOrderSummary
+from models.order import Order
+from models.user import User
+from services.customer_summary_service import compute_summaries
+from services.order_item_service import build_items, insert_items
+from services.order_transition_service import apply_transitions
+
+
+@pytest.fixture
+def customer(db):
+    user = User(name="Customer", email="customer@example.com", mobile_no="9000000003", password="x", status="active")
+    db.add(user)
+    db.flush()
+    db.add(Address(user_id=user.user_id, name="Home", mobile_no="9000000003", address_line1="1 Main Road",
+                   city="Chennai", state="TN", pincode="600001"))
+    db.commit()
+    return user
+
+
+def add_order(db, customer, token_no, quantities):
+    order = Order(user_id=customer.user_id, address_id=1, Token_no=token_no, service="wash_iron",
+                  status="pending", created_by="test")
+    db.add(order)
+    db.flush()
+    items = [
+        {"category_name": "Men", "product_name": f"Shirt {n}", "quantity": quantity, "service": "wash_iron",
+         "unit_price": 10.0}
+        for n, quantity in enumerate(quantities)
+    ]
+    insert_items(db, order.order_id, build_items(items, "test"))
+    db.commit()
+    return order
+
+
+def assert_summary_matches(db, customer):
+    stored = db.get(CustomerOrderSummary, customer.user_id)
+    db.refresh(stored)
+    expected = compute_summaries(db, [customer.user_id])[customer.user_id]
+    assert {field: getattr(stored, field) for field in expected} == expected
+
+
+def test_summary_follows_creates_edits_and_transitions(db, customer):
+    first = add_order(db, customer, "TK0001", [1, 2])
+    second = add_order(db, customer, "TK0002", [3])
+    assert_summary_matches(db, customer)
+    assert db.get(CustomerOrderSummary, customer.user_id).lifetime_spend == 60.0
+
+    second.status = "cancelled"
+    db.commit()
+    assert_summary_matches(db, customer)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        apply_transitions(db, [SimpleNamespace(order_id=first.order_id, Token_no=None, status="confirmed")], "test")
+    db.commit()
+    assert_summary_matches(db, customer)
+    assert db.get(CustomerOrderSummary, customer.user_id).status_counts == {"confirmed": 1, "cancelled": 1}
+
+
+def test_summary_update_is_two_reads_and_one_write(db, customer, statements):
+    order = add_order(db, customer, "TK0001", [1])
+    statements.reset()
+    order.status = "confirmed"
+    db.commit()
+
+    summary_statements = [statement for statement in statements.statements if "customer_order_summaries" in statement]
+    assert [statement.split(None, 1)[0] for statement in summary_statements] == ["SELECT", "SELECT", "UPDATE"]
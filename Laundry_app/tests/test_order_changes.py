@@ -0,0 +1,50 @@
+# tests/test_order_changes.py
+"""
+The delta-sync change log records ORM writes as well as Core statements.
+"""
+import pytest
+from sqlmodel import select
+
+from models.address import Address
+from models.order import Order
+from models.order_change import OrderChange
+from models.user import User
+from services.order_change_service import _COMMITTED_KEY, UPSERT, _write_order_changes, ensure_change_counter
+
+
+@pytest.fixture
+def order(db):
+    user = User(name="Customer", email="customer@example.com", mobile_no="9000000004", password="x", status="active")
+    db.add(user)
+    db.flush()
+    address = Address(user_id=user.user_id, name="Home", mobile_no="9000000004", address_line1="1 Main Road",
+                      city="Chennai", state="TN", pincode="600001")
+    db.add(address)
+    db.flush()
+    order = Order(user_id=user.user_id, address_id=address.address_id, Token_no="TK0001", service="wash_iron",
+                  status="pending", created_by="test")
+    db.add(order)
+    ensure_change_counter(db)
+    db.commit()
+    return order
+
+
+def changes(db):
+    return db.exec(select(OrderChange.change_id, OrderChange.order_id, OrderChange.op).order_by(OrderChange.change_id)).all()
+
+
+def test_orm_status_change_is_logged(db, order):
+    logged = len(changes(db))
+    order.status = "confirmed"
+    db.commit()
+
+    assert changes(db)[logged:] == [(logged + 1, order.order_id, UPSERT)]
+
+
+def test_change_log_writer_flushes_pending_changes(db, order):
+    # Not flushed yet: the writer must not rely on another listener's flush
+    order.status = "confirmed"
+    _write_order_changes(db)
+
+    assert db.info[_COMMITTED_KEY] == {order.order_id}
+    db.commit()
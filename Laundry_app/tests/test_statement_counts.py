@@ -0,0 +1,84 @@
+# tests/test_statement_counts.py
+"""
+Statement budgets of the write paths that no longer reload after commit.
+
+Counts are for SQLite, which sends one INSERT per row for ORM objects; the
+point is that no SELECT creeps back in after the commit or per item.
+"""
+import contextlib
+import io
+
+import pytest
+
+from api.address import create_bulk_addresses_for_user
+from api.pricing import create_bulk_pricing
+from crud.crud_service import ServiceCRUD
+from models.user import User
+from schemas.address import AddressCreate
+from schemas.pricing import PricingBulkCreate, PricingCreate
+
+
+@pytest.fixture
+def admin(db):
+    user = User(name="Admin", email="admin@example.com", mobile_no="9000000001", password="x", role="admin", status="active")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def quiet():
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def test_create_service_inserts_only(db, statements):
+    categories = [
+        {"name": f"category {c}", "products": [{"name": f"product {c}{p}", "price": 10.0} for p in range(5)]}
+        for c in range(3)
+    ]
+    statements.reset()
+    with quiet():
+        service = ServiceCRUD.create_service_with_categories_and_products(db, {"name": "Wash"}, categories)
+        assert service.id and service.name == "Wash"
+
+    # 1 service + 3 categories + 15 products, one commit, no reloads
+    assert statements.count == 19
+    assert set(statements.verbs()) == {"INSERT"}
+
+
+def test_update_service(db, statements):
+    with quiet():
+        service = ServiceCRUD.create_service_with_categories_and_products(db, {"name": "Wash"}, [])
+    statements.reset()
+    with quiet():
+        updated = ServiceCRUD.update_service(db, service.id, {"description": "Washed and folded"})
+        assert updated.description == "Washed and folded" and updated.name == "Wash"
+
+    assert statements.verbs() == ["SELECT", "UPDATE"]
+
+
+def test_bulk_addresses_check_duplicates_once(db, statements, admin):
+    addresses = [
+        AddressCreate(name="Home", address_line1=f"{n} Main Road", city="Chennai", state="TN",
+                      pincode="600001", mobile_no="9876543210")
+        for n in range(10)
+    ]
+    statements.reset()
+    with quiet():
+        created = create_bulk_addresses_for_user(admin.user_id, addresses, db, admin)
+        assert len({address.address_id for address in created}) == 10
+
+    # user lookup, one duplicate check for the batch, 10 inserts
+    assert statements.count == 12
+    assert statements.verbs().count("SELECT") == 2
+
+
+def test_bulk_pricing_checks_duplicates_once(db, statements, admin):
+    items = [PricingCreate(service_type="wash", category="men", product=f"product {n % 8}", price=10) for n in range(10)]
+    statements.reset()
+    with quiet():
+        created = create_bulk_pricing(PricingBulkCreate(items=items), db, admin)
+        assert len({pricing.id for pricing in created}) == 8
+
+    # one duplicate check for the batch, one insert per distinct product
+    assert statements.count == 9
+    assert statements.verbs() == ["SELECT"] + ["INSERT"] * 8
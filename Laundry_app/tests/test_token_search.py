@@ -0,0 +1,62 @@
+# tests/test_token_search.py
+"""
+Staff order search by Token_no: whole tokens, prefixes and partial tokens.
+"""
+import contextlib
+import io
+import json
+
+import pytest
+
+from api.staff import get_orders
+from models.address import Address
+from models.order import Order
+from models.user import User
+from services.token_lookup_service import index_tokens
+
+TOKENS = ("ORD20261019-BORL4U", "ORD20261019-MUYAWI", "ORD20261020-PG5KEO")
+
+
+@pytest.fixture
+def staff(db):
+    user = User(name="Staff", email="staff@example.com", mobile_no="9000000002", password="x", role="staff", status="active")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def orders(db, staff):
+    address = Address(user_id=staff.user_id, name="Home", mobile_no="9000000002", address_line1="1 Main Road",
+                      city="Chennai", state="TN", pincode="600001")
+    db.add(address)
+    db.flush()
+    orders = [
+        Order(user_id=staff.user_id, address_id=address.address_id, Token_no=token_no, service="wash_iron",
+              status="pending", created_by="test")
+        for token_no in TOKENS
+    ]
+    db.add_all(orders)
+    db.flush()
+    index_tokens(db, [(order.order_id, order.Token_no) for order in orders])
+    db.commit()
+    return orders
+
+
+def search(db, staff, query):
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = get_orders(skip=0, limit=100, status=None, search=query, db=db, current_user=staff)
+    return sorted(order["Token_no"] for order in json.loads(response.body))
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("ORD20261019-BORL4U", ["ORD20261019-BORL4U"]),
+    ("ord20261019-muyawi", ["ORD20261019-MUYAWI"]),
+    ("ORD2026", list(TOKENS)),
+    ("ORD20261019", ["ORD20261019-BORL4U", "ORD20261019-MUYAWI"]),
+    ("BORL", ["ORD20261019-BORL4U"]),
+    ("1020-PG5", ["ORD20261020-PG5KEO"]),
+    ("NOPE", []),
+])
+def test_search_matches_whole_prefix_and_partial_tokens(db, staff, orders, query, expected):
+    assert search(db, staff, query) == expected
@@ -0,0 +1,166 @@
+# utils/normalization.py
+"""
+Lookup tables for normalizing category, product, service and status values.
+
+All tables are built once at import (partly from the model enums) and exposed
+read-only, so converting a value is a single dict lookup instead of rebuilding
+a mapping literal on every call.
+"""
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping
+
+from models.order import OrderStatus, ServiceType
+from models.order_item import CategoryName, ProductName
+
+
+def _freeze(table: Dict[Any, Any]) -> Mapping[Any, Any]:
+    return MappingProxyType(table)
+
+
+def _enum_table(enum_cls) -> Mapping[str, str]:
+    """Map both enum member names (MENS_CLOTHING) and display values to the display value"""
+    table = {member.name: member.value for member in enum_cls}
+    table.update({member.value: member.value for member in enum_cls})
+    return _freeze(table)
+
+
+# ========== CATEGORY / PRODUCT ==========
+
+CATEGORY_NAMES = _enum_table(CategoryName)
+PRODUCT_NAMES = _enum_table(ProductName)
+
+DEFAULT_CATEGORY = CategoryName.OTHERS.value
+DEFAULT_PRODUCT = "Other"
+
+# ========== SERVICE TYPE ==========
+
+_service_types = dict(_enum_table(ServiceType))
+# Legacy rows stored the order status in the service column
+_service_types.update({"pending": ServiceType.WASH_IRON.value, "PENDING": ServiceType.WASH_IRON.value})
+SERVICE_TYPES = _freeze(_service_types)
+
+DEFAULT_SERVICE = ServiceType.WASH_IRON.value
+
+# ========== ORDER STATUS ==========
+
+_status_aliases = {
+    OrderStatus.PENDING: ["pending"],
+    OrderStatus.CONFIRMED: ["confirmed"],
+    OrderStatus.PROCESSED: ["processed", "in_progress"],
+    OrderStatus.PICKED_UP: ["picked_up", "picked"],
+    OrderStatus.COMPLETED: ["completed", "delivered"],
+    OrderStatus.CANCELLED: ["cancelled"],
+}
+
+_order_statuses = {}
+for _status, _aliases in _status_aliases.items():
+    for _alias in _aliases:
+        _order_statuses[_alias] = _status
+        _order_statuses[_alias.upper()] = _status
+ORDER_STATUSES = _freeze(_order_statuses)
+
+ORDER_STATUS_VALUES = _freeze({key: status.value for key, status in _order_statuses.items()})
+
+# Customer app status names <-> values stored in the orders table
+FRONTEND_TO_DB_ORDER_STATUS = _freeze({
+    "pending": "pending",
+    "confirmed": "confirmed",
+    "picked_up": "picked",
+    "completed": "ready",
+    "in_progress": "in_progress",
+    "delivered": "delivered",
+})
+
+DB_TO_FRONTEND_ORDER_STATUS = _freeze({
+    "pending": "pending",
+    "confirmed": "confirmed",
+    "picked": "picked_up",
+    "ready": "completed",
+    "in_progress": "in_progress",
+    "delivered": "delivered",
+    "cancelled": "cancelled",
+})
+
+DB_TO_FRONTEND_ITEM_STATUS = _freeze({
+    "pending": "pending",
+    "confirmed": "confirmed",
+    "processed": "processed",
+    "picked": "picked_up",
+    "ready": "completed",
+    "in_progress": "in_progress",
+    "delivered": "delivered",
+})
+
+
+# ========== SINGLE VALUE CONVERTERS ==========
+
+def normalize_category(category) -> str:
+    """Convert enum category names to display names"""
+    if not category:
+        return DEFAULT_CATEGORY
+    return CATEGORY_NAMES.get(category, DEFAULT_CATEGORY)
+
+
+def normalize_product(product) -> str:
+    """Convert enum product names to display names"""
+    if not product:
+        return DEFAULT_PRODUCT
+    return PRODUCT_NAMES.get(product, DEFAULT_PRODUCT)
+
+
+def normalize_service(service) -> str:
+    """Convert service type to a valid ServiceType value"""
+    if not service:
+        return DEFAULT_SERVICE
+    return SERVICE_TYPES.get(service, DEFAULT_SERVICE)
+
+
+def normalize_order_status(status) -> OrderStatus:
+    """Convert any known status spelling to an OrderStatus, defaulting to PENDING"""
+    if not status:
+        return OrderStatus.PENDING
+
+    found = ORDER_STATUSES.get(status)
+    if found is None:
+        found = ORDER_STATUSES.get(str(getattr(status, "value", status)).lower().strip(), OrderStatus.PENDING)
+    return found
+
+
+def normalize_order_status_value(status) -> str:
+    """Same as normalize_order_status but returns the plain string value"""
+    if not status:
+        return OrderStatus.PENDING.value
+
+    found = ORDER_STATUS_VALUES.get(status)
+    if found is None:
+        found = ORDER_STATUS_VALUES.get(str(getattr(status, "value", status)).lower().strip(), OrderStatus.PENDING.value)
+    return found
+
+
+# ========== LIST HELPERS ==========
+
+def normalize_items(items: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Build staff-facing item dicts with normalized names, service and status"""
+    categories = CATEGORY_NAMES
+    products = PRODUCT_NAMES
+    services = SERVICE_TYPES
+    statuses = ORDER_STATUS_VALUES
+
+    return [
+        {
+            "order_item_id": item.order_item_id,
+            "order_id": item.order_id,
+            "category_name": categories.get(item.category_name, DEFAULT_CATEGORY) if item.category_name else DEFAULT_CATEGORY,
+            "product_name": products.get(item.product_name, DEFAULT_PRODUCT) if item.product_name else DEFAULT_PRODUCT,
+            "quantity": item.quantity,
+            "service": services.get(item.service, DEFAULT_SERVICE) if item.service else DEFAULT_SERVICE,
+            "status": statuses.get(item.status) or normalize_order_status_value(item.status),
+            "created_at": item.created_at,
+            "updated_at": item.updated_at,
+            "created_by": item.created_by,
+            "updated_by": item.updated_by,
+            "version": getattr(item, "version", None),
+        }
+        for item in items
+    ]
+